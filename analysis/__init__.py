@@ -0,0 +1,22 @@
+from analysis.base import Candidate
+from analysis.enigma import crack_enigma
+from analysis.frequency import METRICS
+from analysis.shift import crack_affine, crack_caesar, crack_rot13
+from analysis.substitution import crack_substitution
+from analysis.vigenere import crack_vigenere
+from analysis.xor import crack_xor
+
+# Logic name -> cracker(path, top, metric, workers, ...) -> List[Candidate]
+CRACKERS = {
+    "caesar": crack_caesar,
+    "rot13": crack_rot13,
+    "affine": crack_affine,
+    "vigenere": crack_vigenere,
+    "substitution": crack_substitution,
+    "enigma": crack_enigma,
+    "xor": crack_xor,
+    "bitwise": crack_xor,
+}
+
+# Crackers that accept a crib (known plaintext fragment) keyword.
+CRIB_CRACKERS = {"enigma"}
@@ -0,0 +1,52 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional, Sequence
+
+# Bytes of the input decrypted for each reported candidate.
+PREVIEW_SIZE = 64
+
+
+class Candidate(NamedTuple):
+    """
+    One ranked key guess produced by a cracker.
+
+    Attributes:
+        key: Human-readable description of the key (and the password that
+            reproduces it with the matching logic, where there is one).
+        score: Value of the scoring metric; its direction depends on the
+            metric (see analysis.frequency.METRICS).
+        preview: The start of the input decrypted with this key.
+    """
+    key: str
+    score: float
+    preview: bytes
+
+
+def read_sample(path: str, size: int = PREVIEW_SIZE) -> bytes:
+    """Reads the first size bytes of a file."""
+    with open(path, 'rb') as f:
+        return f.read(size)
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Worker process count: the given number, else one per CPU."""
+    return workers or os.cpu_count() or 1
+
+
+def parallel_map(func, *iterables, workers: int = 1) -> list:
+    """map() over a process pool when workers > 1, in-process otherwise."""
+    if workers < 2:
+        return list(map(func, *iterables))
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(func, *iterables))
+
+
+def shortest_repeat(key: Sequence) -> Sequence:
+    """
+    The shortest prefix that key is a repetition of: a key solved at a
+    multiple of its real length repeats itself.
+    """
+    for length in range(1, len(key)):
+        if len(key) % length == 0 and key == key[:length] * (len(key) // length):
+            return key[:length]
+    return key
@@ -0,0 +1,107 @@
+import string
+from itertools import repeat
+from operator import itemgetter
+from typing import List, Optional, Tuple
+from analysis.base import Candidate, parallel_map, read_sample, resolve_workers
+from analysis.frequency import UPPERCASE, fold_letters, index_of_coincidence, iter_file_letters
+from logics.ciphers import ENIGMA_POSITIONS, EnigmaMachineLogic
+
+# Ciphertext letters decrypted for every start position.
+SAMPLE_LETTERS = 400
+# Start positions scanned per worker task.
+POSITIONS_PER_TASK = 1024
+
+
+def position_name(position: int) -> str:
+    """Rotor start position index as its three-letter password."""
+    letters = string.ascii_uppercase
+    return letters[position // 676] + letters[position // 26 % 26] + letters[position % 26]
+
+
+def crib_offsets(letters: bytes, crib: bytes) -> List[int]:
+    """
+    Offsets where the crib may sit in the ciphertext letters. Enigma never
+    encrypts a letter to itself, so any alignment with a letter in the same
+    place as its ciphertext is impossible for every key.
+    """
+    return [offset for offset in range(len(letters) - len(crib) + 1)
+            if all(p != c for p, c in zip(crib, letters[offset:offset + len(crib)]))]
+
+
+def _scan(states: bytes, letters: bytes, crib: bytes, offsets: List[int],
+          first: int, last: int) -> List[Tuple[float, int]]:
+    """
+    Tries start positions first..last-1 against the sample letters and
+    returns (IoC, position) for those consistent with the crib.
+
+    Letter i of a message started at position s is decrypted by the
+    permutation of position s + i + 1, i.e. by states[(s + 1) * 26 +
+    i * 26 + c_i]. The i * 26 + c_i part is fixed by the ciphertext, so one
+    itemgetter over a window of states decrypts the whole sample.
+    """
+    decrypt = itemgetter(*[i * 26 + c - ord('A') for i, c in enumerate(letters)])
+    checks = [(itemgetter(*[(offset + j) * 26 + letters[offset + j] - ord('A')
+                            for j in range(len(crib))]), offset * 26 + letters[offset] - ord('A'))
+              for offset in offsets]
+    crib_values = tuple(crib)
+    window = len(letters) * 26
+    states = memoryview(states)
+    survivors = []
+    for position in range(first, last):
+        base = (position + 1) * 26
+        view = states[base:base + window]
+        if crib:
+            # Cheap single-letter test first, the full crib only if it passes
+            if not any(view[first_index] == crib_values[0] and
+                       (len(crib) == 1 or check(view) == crib_values)
+                       for check, first_index in checks):
+                continue
+        plaintext = bytes(decrypt(view))
+        survivors.append((index_of_coincidence([plaintext.count(c) for c in UPPERCASE]), position))
+    return survivors
+
+
+def search_positions(letters: bytes, crib: bytes = b"", workers: Optional[int] = None
+                     ) -> List[Tuple[float, int]]:
+    """
+    Scans all 17,576 start positions for the folded ciphertext letters,
+    split into ranges over a process pool. Returns (IoC, position) of the
+    positions consistent with the crib, best first.
+    """
+    letters = letters[:SAMPLE_LETTERS]
+    crib = fold_letters(crib)
+    offsets = crib_offsets(letters, crib) if crib else []
+    if len(letters) < 2 or (crib and not offsets):
+        return []
+    # Positions wrap around, so the window read by the last position is
+    # taken from a copy of the table with its start appended.
+    table = EnigmaMachineLogic().states()
+    states = table + table[:(len(letters) + 1) * 26]
+
+    starts = range(0, ENIGMA_POSITIONS, POSITIONS_PER_TASK)
+    stops = [min(start + POSITIONS_PER_TASK, ENIGMA_POSITIONS) for start in starts]
+    parts = parallel_map(_scan, repeat(states), repeat(letters), repeat(crib), repeat(offsets),
+                         starts, stops, workers=resolve_workers(workers))
+    survivors = [entry for part in parts for entry in part]
+    survivors.sort(reverse=True)
+    return survivors
+
+
+def crack_enigma(path: str, top: int = 5, metric: str = "chi2",
+                 workers: Optional[int] = None, crib: str = "") -> List[Candidate]:
+    """
+    Recovers the Enigma start position (the password). Candidates are
+    ranked by the index of coincidence of their decrypted sample, so metric
+    is not used; a crib (known plaintext fragment) discards every position
+    that does not produce it somewhere in the sample.
+    """
+    letters = b""
+    for chunk in iter_file_letters(path):
+        letters += chunk
+        if len(letters) >= SAMPLE_LETTERS:
+            break
+    logic = EnigmaMachineLogic()
+    head = read_sample(path)
+    return [Candidate(f"{position_name(position)} (start position)", ioc,
+                      logic.decrypt(head, position_name(position)))
+            for ioc, position in search_positions(letters, crib.encode('utf-8'), workers)[:top]]
@@ -0,0 +1,132 @@
+import math
+import os
+import string
+from itertools import repeat
+from typing import List, Optional, Sequence
+from analysis.base import parallel_map, resolve_workers
+from logics.base import DEFAULT_CHUNK_SIZE
+
+try:
+    import numpy
+except ImportError:  # Optional: vectorises the column statistics
+    numpy = None
+
+# Relative frequencies of A-Z in English text.
+ENGLISH_FREQUENCIES = (
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015,
+    0.06094, 0.06966, 0.00153, 0.00772, 0.04025, 0.02406, 0.06749,
+    0.07507, 0.01929, 0.00095, 0.05987, 0.06327, 0.09056, 0.02758,
+    0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+)
+LOG_FREQUENCIES = tuple(math.log(f) for f in ENGLISH_FREQUENCIES)
+# Index of coincidence of English text and of uniformly random letters.
+ENGLISH_IOC = sum(f * f for f in ENGLISH_FREQUENCIES)
+RANDOM_IOC = 1 / 26
+
+UPPERCASE = string.ascii_uppercase.encode('ascii')
+LOWERCASE = string.ascii_lowercase.encode('ascii')
+
+# Folds lower case onto upper case; _NON_LETTERS is deleted alongside.
+_FOLD = bytes.maketrans(LOWERCASE, UPPERCASE)
+_NON_LETTERS = bytes(b for b in range(256) if b not in UPPERCASE + LOWERCASE)
+
+# Files smaller than this are counted in-process.
+PARALLEL_THRESHOLD = 16 << 20
+
+
+def fold_letters(data: bytes) -> bytes:
+    """The ASCII letters of data, upper-cased, with everything else removed."""
+    return data.translate(_FOLD, _NON_LETTERS)
+
+
+def letter_counts(data: bytes) -> List[int]:
+    """Case-insensitive A-Z histogram of data; other bytes are ignored."""
+    letters = fold_letters(data)
+    return [letters.count(c) for c in UPPERCASE]
+
+
+def column_counts(letters: bytes, period: int, phase: int = 0) -> List[List[int]]:
+    """
+    A-Z histograms of the period columns of folded letters, where
+    letters[0] falls in column phase. Uses one numpy.bincount pass when
+    NumPy is installed, otherwise one strided slice per column.
+    """
+    if numpy is not None and letters:
+        values = numpy.frombuffer(letters, dtype=numpy.uint8) - ord('A')
+        columns = numpy.arange(phase, phase + len(values)) % period
+        flat = numpy.bincount(columns * 26 + values, minlength=26 * period)
+        return flat.reshape(period, 26).tolist()
+    counts = []
+    for column in range(period):
+        strided = letters[(column - phase) % period::period]
+        counts.append([strided.count(c) for c in UPPERCASE])
+    return counts
+
+
+def iter_file_letters(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yields the folded letters of a file, one chunk at a time."""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield fold_letters(chunk)
+
+
+def _count_range(path: str, start: int, stop: int) -> List[int]:
+    counts = [0] * 26
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = f.read(min(DEFAULT_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            counts = [a + b for a, b in zip(counts, letter_counts(chunk))]
+    return counts
+
+
+def file_letter_counts(path: str, workers: Optional[int] = None) -> List[int]:
+    """
+    A-Z histogram of a file, read in chunks. Large files are split into
+    one byte range per worker process and the partial histograms summed.
+    """
+    size = os.path.getsize(path)
+    workers = resolve_workers(workers)
+    if workers < 2 or size < PARALLEL_THRESHOLD:
+        return _count_range(path, 0, size)
+    step = -(-size // workers)
+    starts = range(0, size, step)
+    parts = parallel_map(_count_range, repeat(path), starts, [s + step for s in starts],
+                         workers=workers)
+    return [sum(column) for column in zip(*parts)]
+
+
+def chi_squared(observed: Sequence[int]) -> float:
+    """Chi-squared distance of an A-Z histogram from English (lower is better)."""
+    total = sum(observed)
+    if not total:
+        return 0.0
+    return sum((count - total * f) ** 2 / (total * f)
+               for count, f in zip(observed, ENGLISH_FREQUENCIES))
+
+
+def index_of_coincidence(observed: Sequence[int]) -> float:
+    """Probability that two letters drawn from the histogram are equal."""
+    total = sum(observed)
+    if total < 2:
+        return 0.0
+    return sum(count * (count - 1) for count in observed) / (total * (total - 1))
+
+
+def log_likelihood(observed: Sequence[int]) -> float:
+    """Log-likelihood of an A-Z histogram under English (higher is better)."""
+    return sum(count * lf for count, lf in zip(observed, LOG_FREQUENCIES))
+
+
+# Metric name -> (scoring function, whether higher scores rank first)
+METRICS = {
+    "chi2": (chi_squared, False),
+    "loglik": (log_likelihood, True),
+}
@@ -0,0 +1,392 @@
+import math
+import os
+import re
+import string
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from analysis import CRACKERS
+from analysis.base import PREVIEW_SIZE
+from analysis.frequency import (
+    ENGLISH_FREQUENCIES, ENGLISH_IOC, RANDOM_IOC, chi_squared, column_counts, fold_letters,
+    index_of_coincidence, letter_counts
+)
+from analysis.shift import AFFINE_LOGIC_MULTIPLIER, AFFINE_MULTIPLIERS, rank_affine_keys
+from analysis.vigenere import rank_periods, solve_key as solve_vigenere_key
+from analysis.xor import MAX_KEY_LENGTH
+from logics.container import MAGIC as CONTAINER_MAGIC, AEAD_XCHACHA20_POLY1305, HEADER
+
+# Bytes read from each of the start, middle and end of the file.
+REGION_SIZE = 4096
+# Guesses below this confidence are not reported.
+MIN_CONFIDENCE = 0.2
+# Repeating-key XOR: bytes a key length (or a multiple) apart are equal this
+# many times more often than bytes at an average shift.
+MIN_PERIOD_SCORE = 1.6
+# Distinct bytes a printable sample needs before a period counts; small
+# alphabets (hex, Baudot, Bacon, Nihilist) repeat by nature.
+MIN_PERIODIC_CHARSET = 24
+
+WHITESPACE = b" \t\r\n\x0b\x0c"
+PRINTABLE = bytes(range(0x20, 0x7f)) + b"\t\r\n\x0b\x0c"
+HEX_DIGITS = string.hexdigits.encode('ascii')
+BASE64_ALPHABET = (string.ascii_letters + string.digits + "+/=").encode('ascii')
+BASE32_ALPHABET = (string.ascii_uppercase + "234567=").encode('ascii')
+ASCII85_ALPHABET = bytes(range(ord('!'), ord('u') + 1)) + b"z"
+NATO_WORDS = {
+    b"ALPHA", b"BRAVO", b"CHARLIE", b"DELTA", b"ECHO", b"FOXTROT", b"GOLF", b"HOTEL",
+    b"INDIA", b"JULIETT", b"JULIET", b"KILO", b"LIMA", b"MIKE", b"NOVEMBER", b"OSCAR",
+    b"PAPA", b"QUEBEC", b"ROMEO", b"SIERRA", b"TANGO", b"UNIFORM", b"VICTOR",
+    b"WHISKEY", b"XRAY", b"X-RAY", b"YANKEE", b"ZULU", b"/",
+}
+COMMON_WORDS = (b" the ", b" and ", b" of ", b" to ", b" is ", b" in ")
+# English prose has 30-50 of COMMON_WORDS per 1000 letters, terse
+# technical text still a few.
+WORDS_PER_1000_LETTERS = 2
+# A key explains the letter frequencies if its chi-squared is within this
+# factor (plus slack) of the best any letter permutation achieves.
+KEY_FIT_FACTOR = 10
+KEY_FIT_SLACK = 50
+# Logics whose decryption needs no password, or only the parameter that
+# identification recovers (Guess.password).
+KEYLESS_LOGICS = frozenset({
+    "a1z26", "ascii85", "bacon", "base32", "base64", "baudot", "bootstring", "case",
+    "hex", "integer", "morse", "nato", "numeral", "polybius", "punycode", "reverse",
+    "rot13", "tapcode", "unicode", "url",
+})
+# Crackers that only read a bounded sample from the start of the file, so
+# a trial decode can run them whatever the file size.
+SAMPLED_CRACKERS = frozenset({"bitwise", "enigma", "substitution", "xor"})
+
+
+class Guess(NamedTuple):
+    """
+    A likely logic for a file.
+
+    Attributes:
+        logic: Logic name.
+        confidence: 0..1, comparable between guesses for the same file.
+        reason: The features that matched.
+        password: Parameter for a trial decode of a keyless logic (e.g.
+            the numeral base), or "".
+    """
+    logic: str
+    confidence: float
+    reason: str
+    password: str = ""
+
+
+def _trim_partial(chunk: bytes, end: bool = True) -> bytes:
+    """Drops the (possibly cut) first and, if end, last tokens of a mid-file chunk."""
+    first = min((chunk.find(c) for c in b" \n" if c in chunk), default=-1)
+    last = max(chunk.rfind(b" "), chunk.rfind(b"\n")) if end else len(chunk) - 1
+    if first < 0 or last <= first:
+        return chunk
+    return chunk[first:last + 1]
+
+
+def read_regions(path: str, region_size: int = REGION_SIZE) -> List[bytes]:
+    """
+    The start, middle and end of a file (the whole file when it is small),
+    so the work done does not depend on the file size.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        if size <= 3 * region_size:
+            return [f.read()]
+        regions = [f.read(region_size)]
+        for offset, end in (((size - region_size) // 2, True), (size - region_size, False)):
+            f.seek(offset)
+            regions.append(_trim_partial(f.read(region_size), end))
+        return regions
+
+
+class Features:
+    """Cheap statistics of a file sample, computed once for all rules."""
+
+    def __init__(self, regions: List[bytes], file_size: int):
+        self.head = regions[0]
+        self.sample = b"\n".join(regions)
+        self.file_size = file_size
+        self.complete = len(regions) == 1
+        counts = Counter()
+        for region in regions:
+            counts.update(region)
+        self.charset = frozenset(counts)
+        total = sum(counts.values())
+        self.entropy = -sum(n / total * math.log2(n / total) for n in counts.values()) if total else 0.0
+        self.printable_ratio = sum(counts[b] for b in PRINTABLE) / total if total else 0.0
+        self.dense = self.sample.translate(None, WHITESPACE)
+        self.tokens = self.sample.split()
+        self.letters = fold_letters(self.sample)
+        self.letter_ratio = len(self.letters) / len(self.dense) if self.dense else 0.0
+        self.letter_counts = letter_counts(self.letters)
+        self.ioc = index_of_coincidence(self.letter_counts)
+        lower = sum(self.sample.count(c) for c in string.ascii_lowercase.encode('ascii'))
+        self.upper_ratio = (len(self.letters) - lower) / len(self.letters) if self.letters else 0.0
+
+    def only(self, allowed: bytes) -> bool:
+        """True if every byte of the sample is in allowed (or whitespace)."""
+        return bool(self.dense) and self.charset <= frozenset(allowed + WHITESPACE)
+
+    def ratio(self, allowed: bytes) -> float:
+        """Fraction of the non-whitespace bytes that are in allowed."""
+        if not self.dense:
+            return 0.0
+        return 1 - len(self.dense.translate(None, allowed)) / len(self.dense)
+
+    def token_ratio(self, predicate) -> float:
+        if not self.tokens:
+            return 0.0
+        return sum(1 for token in self.tokens if predicate(token)) / len(self.tokens)
+
+
+def _coincidence(data: bytes, shift: int) -> float:
+    """Fraction of positions where data equals itself shifted by shift."""
+    n = len(data) - shift
+    diff = int.from_bytes(data[:n], 'big') ^ int.from_bytes(data[shift:], 'big')
+    return diff.to_bytes(n, 'big').count(0) / n
+
+
+def repeating_key_period(data: bytes, max_key_length: int = MAX_KEY_LENGTH) -> Optional[int]:
+    """
+    Shortest key length at which data looks like repeating-key XOR, or
+    None. Bytes a key length apart share the key byte, so they coincide
+    as often as plaintext bytes do, more than at other shifts; multiples
+    of the length are averaged too, so a short sample still shows it.
+    """
+    shifts = min(3 * max_key_length, len(data) // 4)
+    if shifts < 4:
+        return None
+    rates = [_coincidence(data, shift) for shift in range(1, shifts + 1)]
+    average = sum(rates) / len(rates)
+    if not average:
+        return None
+    for period in range(2, min(max_key_length, shifts // 2) + 1):
+        multiples = rates[period - 1::period]
+        if sum(multiples) / len(multiples) >= MIN_PERIOD_SCORE * average:
+            return period
+    return None
+
+
+def _binary_guesses(f: Features) -> List[Guess]:
+    """Ciphertexts with arbitrary bytes."""
+    if f.head.startswith(CONTAINER_MAGIC):
+        # Any AEAD logic decrypts a container; name the one for its cipher
+        chacha = len(f.head) >= HEADER.size and f.head[5] == AEAD_XCHACHA20_POLY1305
+        return [Guess("chacha20" if chacha else "aes", 0.99, "CryptForge container header")]
+    guesses = []
+    alphanumeric = (string.ascii_letters + string.digits + "=").encode('ascii')
+    if f.charset and min(f.charset) >= 22 and max(f.charset) <= 110 and not f.only(alphanumeric):
+        guesses.append(Guess("nihilistpacked", 0.8, "byte values 22-110 (packed Polybius sums)"))
+    if f.printable_ratio > 0.95:
+        # XOR with a letter key mostly stays printable; only a period tells
+        if len(f.charset) >= MIN_PERIODIC_CHARSET and not f.only(BASE64_ALPHABET):
+            period = repeating_key_period(f.head)
+            if period:
+                reason = f"printable, repeats every {period} bytes (repeating key)"
+                guesses.append(Guess("xor", 0.7, reason))
+                guesses.append(Guess("bitwise", 0.65, reason))
+        return guesses
+    high = f.entropy > 7.0 or (len(f.sample) < 2048 and len(f.charset) > 0.6 * min(len(f.sample), 256))
+    if high:
+        blocks = f.file_size % 8 == 0 and f.file_size >= 16
+        if f.file_size >= 44:
+            guesses.append(Guess("aes", 0.65 if blocks else 0.75, "high entropy, room for salt + nonce + tag"))
+        if blocks:
+            guesses.append(Guess("blowfish", 0.7, "high entropy, IV + 8-byte blocks"))
+        guesses.append(Guess("rc4", 0.5, "high entropy stream"))
+    else:
+        reason = f"binary, entropy {f.entropy:.1f} bits/byte (repeating key)"
+        guesses.append(Guess("xor", 0.7, reason))
+        guesses.append(Guess("bitwise", 0.65, reason))
+    return guesses
+
+
+def _token_guesses(f: Features) -> List[Guess]:
+    """Codes made of a small symbol set or of delimited tokens."""
+    guesses = []
+    if f.ratio(b".-/") > 0.9 and b"-"[0] in f.charset:
+        guesses.append(Guess("morse", 0.95, "dots, dashes and slashes"))
+    if f.ratio(b"./") > 0.9 and b"-"[0] not in f.charset:
+        guesses.append(Guess("tapcode", 0.9, "only dot groups and slashes"))
+    if f.only(b"AB"):
+        guesses.append(Guess("bacon", 0.95, "only A/B"))
+    if f.only(b"ADFGX"):
+        guesses.append(Guess("adfgx", 0.9, "ADFGX letters only"))
+    if f.only(b"ADFGVX"):
+        guesses.append(Guess("adfgvx", 0.85 if b"V"[0] in f.charset else 0.6, "ADFGVX letters only"))
+    if f.only(b"01"):
+        widths = Counter(len(token) for token in f.tokens)
+        width = widths.most_common(1)[0][0] if widths else 0
+        if width == 5:
+            guesses.append(Guess("baudot", 0.95, "5-bit groups"))
+        elif width == 8:
+            guesses.append(Guess("numeral", 0.9, "8-bit groups", "2"))
+    if f.token_ratio(lambda t: t.upper() in NATO_WORDS) > 0.5:
+        guesses.append(Guess("nato", 0.95, "NATO phonetic words"))
+    if f.token_ratio(lambda t: t.startswith(b"U+")) > 0.8:
+        guesses.append(Guess("unicode", 0.95, "U+XXXX tokens"))
+    if f.only(string.digits.encode('ascii')):
+        values = [int(token) for token in f.tokens if token.isdigit()]
+        sums = bool(values) and min(values) >= 22 and max(values) <= 110
+        if values and max(values) <= 255:
+            guesses.append(Guess("integer", 0.6 if sums else 0.85, "decimal byte values"))
+        if sums:
+            guesses.append(Guess("nihilist", 0.85, "numbers 22-110 (Polybius sums)"))
+        if values and all(len(token) == 3 for token in f.tokens) and max(values) <= 377:
+            guesses.append(Guess("numeral", 0.6, "3-digit octal groups", "8"))
+    if f.token_ratio(lambda t: len(t) == 2 and t.isdigit() and b"1" <= t[:1] <= b"5" and b"1" <= t[1:] <= b"5") > 0.6:
+        guesses.append(Guess("polybius", 0.9, "digit pairs 11-55"))
+    if f.ratio(string.digits.encode('ascii') + b"-") > 0.8 and re.search(rb"\d+-\d+-\d+", f.sample):
+        guesses.append(Guess("a1z26", 0.9, "dash-separated numbers 1-26"))
+    if f.only(HEX_DIGITS):
+        # Decimal-only samples are the number logics above, unless tiny
+        letters = f.dense.translate(None, string.digits.encode('ascii'))
+        plausible = 0.9 if letters or len(f.dense) < 64 else 0.4
+        if f.token_ratio(lambda t: len(t) == 2) > 0.9 and len(f.tokens) > 1:
+            guesses.append(Guess("numeral", plausible - 0.05, "space-separated hex pairs", "16"))
+        guesses.append(Guess("hex", plausible if len(f.dense) % 2 == 0 or not f.complete else 0.3,
+                             "hexadecimal digits"))
+        if f.file_size == 64:
+            guesses.append(Guess("hash", 0.95, "64 hex digits (SHA-256 digest)"))
+            guesses.append(Guess("hmac", 0.9, "64 hex digits (HMAC-SHA256)"))
+    return guesses
+
+
+def _encoding_guesses(f: Features) -> List[Guess]:
+    """Printable binary-to-text encodings."""
+    guesses = []
+    aligned = lambda block: not f.complete or len(f.dense) % block == 0
+    mixed = f.entropy > 4.5 and f.letter_ratio < 0.95 or b"="[0] in f.charset
+    if f.only(BASE32_ALPHABET) and aligned(8) and mixed:
+        guesses.append(Guess("base32", 0.9, "Base32 alphabet, 8-character blocks"))
+    if f.only(BASE64_ALPHABET) and aligned(4) and mixed:
+        guesses.append(Guess("base64", 0.85, "Base64 alphabet, 4-character blocks"))
+    if f.only(ASCII85_ALPHABET) and f.entropy > 5.5 and b" "[0] not in f.charset:
+        guesses.append(Guess("ascii85", 0.7, "ASCII85 range, no spaces, high entropy"))
+    # Escapes cut at a region boundary are allowed for
+    escapes = len(re.findall(rb"%[0-9A-F]{2}", f.sample))
+    if escapes and escapes >= f.sample.count(b"%") - 4 and b" "[0] not in f.charset:
+        guesses.append(Guess("url", 0.8, "percent escapes, no spaces"))
+    # Segmented output ends its last line like a single Punycode string
+    if f.printable_ratio == 1.0 and re.search(rb"-[a-z0-9]+\n?\Z", f.sample):
+        guesses.append(Guess("punycode", 0.8, "ASCII text ending in encoded Punycode deltas"))
+        guesses.append(Guess("bootstring", 0.75, "ASCII text ending in encoded Bootstring deltas"))
+    elif f.printable_ratio == 1.0 and f.sample.rstrip(b"\n").endswith(b"-"):
+        guesses.append(Guess("punycode", 0.45, "ASCII text ending in a Punycode delimiter"))
+        guesses.append(Guess("bootstring", 0.4, "ASCII text ending in a Bootstring delimiter"))
+    return guesses
+
+
+def _length_password(shift: int) -> str:
+    """A password whose length gives the shift (caesar and affine use len(password) % 26)."""
+    return "x" * (shift or 26)
+
+
+def _best_permutation_chi2(counts: List[int]) -> float:
+    """Chi-squared of the frequency-rank letter permutation (a lower bound in practice)."""
+    ranked = sorted(range(26), key=lambda p: ENGLISH_FREQUENCIES[p], reverse=True)
+    observed = [0] * 26
+    for plain, count in zip(ranked, sorted(counts, reverse=True)):
+        observed[plain] = count
+    return chi_squared(observed)
+
+
+def _letter_guesses(f: Features) -> List[Guess]:
+    """Classical ciphers that keep text shaped like text."""
+    if len(f.letters) < 20 or f.letter_ratio < 0.5 or f.printable_ratio < 0.95:
+        return []
+    guesses = []
+    if f.only(string.ascii_uppercase.encode('ascii') + b"+") and len(f.tokens) <= 3:
+        if b"+"[0] in f.charset:
+            return [Guess("trifid", 0.85, "capitals and '+' (27-symbol cube)")]
+        reason = "one run of capitals (fractionated)"
+        return [Guess("bifid", 0.6 if b"J"[0] not in f.charset else 0.4, reason),
+                Guess("trifid", 0.5, reason)]
+    if b" "[0] not in f.charset:
+        return []
+
+    english = (f.ioc - RANDOM_IOC) / (ENGLISH_IOC - RANDOM_IOC)
+    if english > 0.75:
+        bound = _best_permutation_chi2(f.letter_counts) * KEY_FIT_FACTOR + KEY_FIT_SLACK
+        shift = rank_affine_keys(f.letter_counts, ((1, b) for b in range(26)))[0]
+        affine = rank_affine_keys(f.letter_counts, ((a, b) for a in AFFINE_MULTIPLIERS for b in range(26)))[0]
+        if shift[0] < bound and shift[2] == 0:
+            words = 1000 / len(f.letters)
+            forward = sum(f.sample.lower().count(w) for w in COMMON_WORDS) * words
+            backward = sum(f.sample.lower().count(w[::-1]) for w in COMMON_WORDS) * words
+            if backward > forward:
+                guesses.append(Guess("reverse", 0.85, "English words spelled backwards"))
+            if f.upper_ratio > 0.6:
+                guesses.append(Guess("case", 0.8, "English letters, mostly upper case"))
+            if max(forward, backward) < WORDS_PER_1000_LETTERS:
+                guesses.append(Guess("railfence", 0.7, "English letter frequencies, no English words"))
+        elif shift[0] < bound and shift[2] == 13:
+            guesses.append(Guess("rot13", 0.9, "English frequencies shifted by 13"))
+            guesses.append(Guess("caesar", 0.6, "English frequencies shifted by 13", _length_password(13)))
+        elif shift[0] < bound:
+            guesses.append(Guess("caesar", 0.85, f"English frequencies shifted by {shift[2]}",
+                                 _length_password(shift[2])))
+        elif affine[0] < bound and affine[1] == AFFINE_LOGIC_MULTIPLIER:
+            guesses.append(Guess("affine", 0.85, f"English frequencies under affine key b={affine[2]}",
+                                 _length_password(affine[2])))
+        else:
+            guesses.append(Guess("substitution", 0.8, "English IoC, permuted letter frequencies"))
+    elif english < 0.6:
+        if f.upper_ratio > 0.99:
+            guesses.append(Guess("enigma", 0.8, "upper-case letters with flat frequencies"))
+        else:
+            guesses.append(Guess("vigenere", 0.8, "letters with flattened frequencies"))
+    return guesses
+
+
+def identify_features(f: Features) -> List[Guess]:
+    """Ranked guesses for the given features, best first, one per logic."""
+    best: Dict[str, Guess] = {}
+    for rules in (_binary_guesses, _token_guesses, _encoding_guesses, _letter_guesses):
+        for guess in rules(f):
+            if guess.logic not in best or guess.confidence > best[guess.logic].confidence:
+                best[guess.logic] = guess
+    ranked = sorted(best.values(), key=lambda guess: guess.confidence, reverse=True)
+    return [guess for guess in ranked if guess.confidence >= MIN_CONFIDENCE]
+
+
+def identify_file(path: str, region_size: int = REGION_SIZE) -> List[Guess]:
+    """Ranked guesses for the logic that produced a file, from a fixed-size sample."""
+    return identify_features(Features(read_regions(path, region_size), os.path.getsize(path)))
+
+
+def trial_decode(path: str, guess: Guess, logic) -> Optional[Tuple[str, bytes]]:
+    """
+    Decodes the start of a file with a guessed logic (an EncryptionLogic
+    instance). Keyless logics decode the first region directly; Vigenère
+    keys are solved from the first region, and the other logics with a
+    cracker use its best key, found from the cracker's own bounded sample.
+    Returns (key description, preview), or None when the logic needs an
+    unknown password or the decode fails.
+    """
+    if guess.logic in KEYLESS_LOGICS or guess.password:
+        head = read_regions(path)[0]
+        # A region cut mid-token or mid-block may not decode; retry on a boundary
+        cut = max(head.rfind(b" "), head.rfind(b"\n"))
+        for attempt in (head, head[:cut], head[:len(head) // 40 * 40]):
+            try:
+                plain = logic.decrypt(attempt, guess.password)
+            except Exception:
+                continue
+            key = f"password {guess.password!r}" if guess.password else "no password"
+            return key, plain[:PREVIEW_SIZE]
+        return None
+    if guess.logic == "vigenere":
+        head = read_regions(path)[0]
+        letters = fold_letters(head)
+        if not letters:
+            return None
+        period, _ = rank_periods(letters, workers=1)[0]
+        key, _ = solve_vigenere_key(column_counts(letters, period))
+        return f"{key} (period {period})", logic.decrypt(head, key)[:PREVIEW_SIZE]
+    if guess.logic in SAMPLED_CRACKERS:
+        candidates = CRACKERS[guess.logic](path, top=1)
+        if candidates:
+            return candidates[0].key, candidates[0].preview
+    return None
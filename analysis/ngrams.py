@@ -0,0 +1,78 @@
+import array
+import math
+import mmap
+import os
+import sys
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, Optional
+from analysis.frequency import fold_letters
+from config import QUADGRAM_FILE
+
+# Quadgram table file: magic followed by 26**4 little-endian float32
+# log10 probabilities, indexed by a*17576 + b*676 + c*26 + d.
+QUADGRAM_MAGIC = b"CFQ1"
+QUADGRAMS = 26 ** 4
+# Probability given to quadgrams never seen in the corpus, in counts.
+UNSEEN_COUNT = 0.01
+
+
+def default_corpus() -> Iterable[bytes]:
+    """English text that ships with the standard library (pydoc topic help)."""
+    from pydoc_data.topics import topics
+    for text in topics.values():
+        yield text.encode('utf-8')
+
+
+def quadgram_counts(letters: bytes) -> Counter:
+    """Counts of each quadgram index in folded letters."""
+    values = [c - ord('A') for c in letters]
+    return Counter(a * 17576 + b * 676 + c * 26 + d
+                   for a, b, c, d in zip(values, values[1:], values[2:], values[3:]))
+
+
+def build_quadgram_table(path: str = QUADGRAM_FILE,
+                         corpus: Optional[Iterable[bytes]] = None) -> None:
+    """
+    Counts the quadgrams of a corpus (default: default_corpus()) and writes
+    their log10 probabilities to path. The file is replaced atomically, so
+    processes loading it concurrently see either the old or the new table.
+    """
+    counts = Counter()
+    for text in corpus if corpus is not None else default_corpus():
+        counts.update(quadgram_counts(fold_letters(text)))
+    total = sum(counts.values())
+    if not total:
+        raise ValueError("Quadgram corpus contains no letters.")
+    table = array.array('f', [math.log10(UNSEEN_COUNT / total)]) * QUADGRAMS
+    for index, count in counts.items():
+        table[index] = math.log10(count / total)
+    if sys.byteorder != 'little':
+        table.byteswap()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(QUADGRAM_MAGIC)
+        table.tofile(f)
+    os.replace(tmp_path, path)
+
+
+@lru_cache(maxsize=None)
+def load_quadgram_table(path: str = QUADGRAM_FILE):
+    """
+    Memory-maps the quadgram table, building it first if it does not exist.
+    Returns a read-only float sequence; the pages are shared by every
+    process that maps the file and loaded on first access.
+    """
+    if not os.path.exists(path):
+        build_quadgram_table(path)
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(QUADGRAM_MAGIC)] != QUADGRAM_MAGIC or \
+            len(mapped) != len(QUADGRAM_MAGIC) + QUADGRAMS * 4:
+        raise ValueError(f"Invalid quadgram table: {path}")
+    if sys.byteorder != 'little':
+        table = array.array('f', mapped[len(QUADGRAM_MAGIC):])
+        table.byteswap()
+        return table
+    return memoryview(mapped)[len(QUADGRAM_MAGIC):].cast('f')
@@ -0,0 +1,67 @@
+import math
+from typing import Iterable, List, Optional, Tuple
+from analysis.base import Candidate, read_sample
+from analysis.frequency import METRICS, file_letter_counts
+
+# Multipliers with an inverse mod 26; together with 26 offsets they give
+# the 312 affine keys.
+AFFINE_MULTIPLIERS = tuple(a for a in range(1, 26) if math.gcd(a, 26) == 1)
+# Multiplier used by the affine logic (its password only sets the offset).
+AFFINE_LOGIC_MULTIPLIER = 5
+
+
+def affine_decrypt_table(a: int, b: int) -> bytes:
+    """bytes.translate table undoing c = a*p + b (mod 26) on both cases."""
+    table = bytearray(range(256))
+    for p in range(26):
+        c = (a * p + b) % 26
+        table[ord('A') + c] = ord('A') + p
+        table[ord('a') + c] = ord('a') + p
+    return bytes(table)
+
+
+def rank_affine_keys(counts: List[int], keys: Iterable[Tuple[int, int]],
+                     metric: str = "chi2") -> List[Tuple[float, int, int]]:
+    """
+    Scores (a, b) keys from the ciphertext letter histogram alone: under a
+    key, plaintext letter p was written as (a*p + b) % 26, so its count is
+    read straight out of counts. Returns (score, a, b), best first.
+    """
+    score, higher_first = METRICS[metric]
+    scored = [(score([counts[(a * p + b) % 26] for p in range(26)]), a, b)
+              for a, b in keys]
+    scored.sort(key=lambda entry: entry[0], reverse=higher_first)
+    return scored
+
+
+def _crack(path: str, keys: Iterable[Tuple[int, int]], describe, top: int,
+           metric: str, workers: Optional[int]) -> List[Candidate]:
+    counts = file_letter_counts(path, workers)
+    sample = read_sample(path)
+    return [Candidate(describe(a, b), score, sample.translate(affine_decrypt_table(a, b)))
+            for score, a, b in rank_affine_keys(counts, keys, metric)[:top]]
+
+
+def crack_caesar(path: str, top: int = 5, metric: str = "chi2",
+                 workers: Optional[int] = None) -> List[Candidate]:
+    """Ranks all 26 Caesar shifts (the logic shifts by the password length)."""
+    return _crack(path, ((1, b) for b in range(26)),
+                  lambda a, b: f"shift {b} (password length {b} mod 26)",
+                  top, metric, workers)
+
+
+def crack_rot13(path: str, top: int = 5, metric: str = "chi2",
+                workers: Optional[int] = None) -> List[Candidate]:
+    """Scores the single ROT13 key, so the result shows how English it reads."""
+    return _crack(path, [(1, 13)], lambda a, b: "rot13", top, metric, workers)
+
+
+def crack_affine(path: str, top: int = 5, metric: str = "chi2",
+                 workers: Optional[int] = None) -> List[Candidate]:
+    """Ranks all 312 affine keys, not just those the affine logic produces."""
+    def describe(a, b):
+        if a == AFFINE_LOGIC_MULTIPLIER:
+            return f"a={a} b={b} (password length {b} mod 26)"
+        return f"a={a} b={b}"
+    keys = [(a, b) for a in AFFINE_MULTIPLIERS for b in range(26)]
+    return _crack(path, keys, describe, top, metric, workers)
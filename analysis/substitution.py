@@ -0,0 +1,144 @@
+import random
+import string
+from itertools import repeat
+from typing import List, Optional, Sequence, Tuple
+from analysis.base import Candidate, parallel_map, read_sample, resolve_workers
+from analysis.frequency import ENGLISH_FREQUENCIES, iter_file_letters, letter_counts
+from analysis.ngrams import load_quadgram_table, quadgram_counts
+from config import QUADGRAM_FILE
+
+# Ciphertext letters the solver works on.
+SAMPLE_LETTERS = 2000
+# Independent hill climbs; the best result wins.
+RESTARTS = 12
+
+
+class _QuadgramScorer:
+    """
+    Quadgram log-probability of a decryption, kept up to date under letter
+    swaps. The ciphertext is reduced to its distinct quadgrams and their
+    counts; swapping two key letters only rescores the quadgrams that
+    contain either cipher letter.
+    """
+
+    def __init__(self, letters: bytes, table):
+        self.table = table
+        self.quads = [(i, index // 17576, index // 676 % 26, index // 26 % 26, index % 26, n)
+                      for i, (index, n) in enumerate(quadgram_counts(letters).items())]
+        containing = [set() for _ in range(26)]
+        for quad in self.quads:
+            for letter in quad[1:5]:
+                containing[letter].add(quad)
+        # Quadgrams touched by swapping each pair of cipher letters
+        self.affected = {(x, y): list(containing[x] | containing[y])
+                         for x in range(26) for y in range(x + 1, 26)}
+        self.values = []
+
+    @staticmethod
+    def _rescore(quads, table, key) -> list:
+        return [(i, n * table[key[a] * 17576 + key[b] * 676 + key[c] * 26 + key[d]])
+                for i, a, b, c, d, n in quads]
+
+    def reset(self, key: Sequence[int]) -> float:
+        """Scores key from scratch and caches the per-quadgram values."""
+        self.values = [value for _, value in self._rescore(self.quads, self.table, key)]
+        return sum(self.values)
+
+    def swap_delta(self, key: List[int], x: int, y: int) -> Tuple[float, list]:
+        """
+        Score change from swapping the plain letters of cipher letters x <
+        y. Returns the delta and the rescored (index, value) pairs for
+        commit(); key is left unchanged.
+        """
+        key[x], key[y] = key[y], key[x]
+        rescored = self._rescore(self.affected[x, y], self.table, key)
+        key[x], key[y] = key[y], key[x]
+        values = self.values
+        return sum(value for _, value in rescored) - sum(values[i] for i, _ in rescored), rescored
+
+    def commit(self, rescored: list) -> None:
+        values = self.values
+        for i, value in rescored:
+            values[i] = value
+
+
+def frequency_key(letters: bytes) -> List[int]:
+    """Starting key pairing cipher letters with plain letters by frequency rank."""
+    counts = letter_counts(letters)
+    cipher_order = sorted(range(26), key=lambda c: counts[c], reverse=True)
+    plain_order = sorted(range(26), key=lambda p: ENGLISH_FREQUENCIES[p], reverse=True)
+    key = [0] * 26
+    for c, p in zip(cipher_order, plain_order):
+        key[c] = p
+    return key
+
+
+def hill_climb(letters: bytes, seed: int, table_path: str = QUADGRAM_FILE) -> Tuple[float, List[int]]:
+    """
+    One restart of the solver over decryption keys (cipher letter -> plain
+    letter): keep any letter swap that raises the quadgram score until
+    none does. Seed 0 starts from the frequency-rank key, other seeds from
+    a random permutation. Returns (score, key).
+    """
+    scorer = _QuadgramScorer(letters, load_quadgram_table(table_path))
+    key = frequency_key(letters)
+    if seed:
+        random.Random(seed).shuffle(key)
+    score = scorer.reset(key)
+    improved = True
+    while improved:
+        improved = False
+        for x in range(26):
+            for y in range(x + 1, 26):
+                delta, rescored = scorer.swap_delta(key, x, y)
+                if delta > 1e-9:
+                    key[x], key[y] = key[y], key[x]
+                    scorer.commit(rescored)
+                    score += delta
+                    improved = True
+    return score, key
+
+
+def key_password(key: Sequence[int]) -> str:
+    """
+    The substitution logic's password for a decryption key: its cipher
+    alphabet, i.e. the cipher letter of each plain letter A..Z.
+    """
+    alphabet = [''] * 26
+    for cipher, plain in enumerate(key):
+        alphabet[plain] = string.ascii_uppercase[cipher]
+    return ''.join(alphabet)
+
+
+def crack_substitution(path: str, top: int = 5, metric: str = "chi2",
+                       workers: Optional[int] = None,
+                       restarts: int = RESTARTS) -> List[Candidate]:
+    """
+    Solves a monoalphabetic substitution by quadgram hill climbing, with
+    restarts spread over a process pool that shares the memory-mapped
+    quadgram table. Keys are ranked by log10 probability per quadgram;
+    metric is not used.
+    """
+    letters = b""
+    for chunk in iter_file_letters(path):
+        letters += chunk
+        if len(letters) >= SAMPLE_LETTERS:
+            break
+    letters = letters[:SAMPLE_LETTERS]
+    if len(letters) < 4:
+        return []
+    # Build the table before forking so workers only map it
+    load_quadgram_table(QUADGRAM_FILE)
+    workers = min(resolve_workers(workers), restarts)
+    results = parallel_map(hill_climb, repeat(letters), range(restarts), workers=workers)
+
+    ranked = {}
+    for score, key in results:
+        ranked[key_password(key)] = score / (len(letters) - 3)
+    head = read_sample(path)
+    candidates = []
+    for password, score in sorted(ranked.items(), key=lambda entry: entry[1], reverse=True)[:top]:
+        table = bytes.maketrans((password + password.lower()).encode('ascii'),
+                                (string.ascii_uppercase + string.ascii_lowercase).encode('ascii'))
+        candidates.append(Candidate(f"password {password}", score, head.translate(table)))
+    return candidates
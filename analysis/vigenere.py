@@ -0,0 +1,112 @@
+import string
+from itertools import repeat
+from typing import List, Optional, Sequence, Tuple
+from analysis.base import Candidate, parallel_map, read_sample, resolve_workers, shortest_repeat
+from analysis.frequency import (
+    ENGLISH_IOC, METRICS, RANDOM_IOC, column_counts, index_of_coincidence, iter_file_letters
+)
+from analysis.shift import rank_affine_keys
+from logics.ciphers import VigenereCipherLogic
+
+# Longest key length considered.
+MAX_PERIOD = 20
+# Letters from the start of the file used to estimate the key length.
+SAMPLE_LETTERS = 1 << 18
+# Periods within this fraction of the best IoC (or of English IoC, for
+# short texts whose long periods have noisy columns) are preferred by
+# length, so multiples of the real key length do not win.
+IOC_TOLERANCE = 0.9
+# Samples shorter than this are scored in-process.
+PARALLEL_SAMPLE = 1 << 16
+
+
+def period_ioc(letters: bytes, period: int) -> float:
+    """Mean index of coincidence of the columns of letters for a key length."""
+    columns = column_counts(letters, period)
+    return sum(map(index_of_coincidence, columns)) / period
+
+
+def rank_periods(letters: bytes, max_period: int = MAX_PERIOD,
+                 workers: Optional[int] = None) -> List[Tuple[int, float]]:
+    """
+    Scores key lengths 1..max_period by column IoC, spreading the lengths
+    over a process pool for large samples. Returns (period, ioc), most
+    likely first: the shortest period close to the best IoC, then the rest
+    by IoC.
+    """
+    periods = range(1, min(max_period, max(len(letters) // 2, 1)) + 1)
+    workers = resolve_workers(workers) if len(letters) >= PARALLEL_SAMPLE else 1
+    iocs = parallel_map(period_ioc, repeat(letters), periods, workers=min(workers, len(periods)))
+    ranked = sorted(zip(periods, iocs), key=lambda entry: entry[1], reverse=True)
+    threshold = min(ranked[0][1], ENGLISH_IOC) * IOC_TOLERANCE
+    best = min(entry for entry in ranked if entry[1] >= threshold)
+    ranked.remove(best)
+    return [best] + ranked
+
+
+def solve_key(columns: Sequence[List[int]], metric: str = "chi2") -> Tuple[str, float]:
+    """
+    Solves each column histogram as a Caesar shift. Returns the key and
+    the summed column scores.
+    """
+    best = [rank_affine_keys(counts, ((1, b) for b in range(26)), metric)[0]
+            for counts in columns]
+    key = ''.join(string.ascii_uppercase[shift] for _, _, shift in best)
+    score = sum(column_score for column_score, _, _ in best)
+    # A key found at a multiple of the real length repeats itself
+    return shortest_repeat(key), score
+
+
+def confidence(ioc: float) -> float:
+    """Maps a column IoC onto 0 (random letters) .. 1 (English)."""
+    return min(max((ioc - RANDOM_IOC) / (ENGLISH_IOC - RANDOM_IOC), 0.0), 1.0)
+
+
+def column_totals(path: str, periods: Sequence[int]) -> dict:
+    """Per-column letter counts of the whole file for each key length, in one pass."""
+    totals = {period: [[0] * 26 for _ in range(period)] for period in periods}
+    position = 0
+    for letters in iter_file_letters(path):
+        for period, columns in totals.items():
+            chunk_columns = column_counts(letters, period, position % period)
+            for column, counts in zip(columns, chunk_columns):
+                column[:] = [a + b for a, b in zip(column, counts)]
+        position += len(letters)
+    return totals
+
+
+def crack_vigenere(path: str, top: int = 5, metric: str = "chi2",
+                   workers: Optional[int] = None) -> List[Candidate]:
+    """
+    Estimates the key length from a sample of the file, then solves the
+    best key lengths from per-column histograms gathered in a streaming
+    pass over the whole file. Multiples of a key length give the same
+    key, so keys are deduplicated (keeping the better score) and further
+    lengths are solved until there are top distinct keys.
+    """
+    sample = bytearray()
+    for letters in iter_file_letters(path):
+        sample += letters
+        if len(sample) >= SAMPLE_LETTERS:
+            break
+    if not sample:
+        return []
+    ranked = rank_periods(bytes(sample[:SAMPLE_LETTERS]), workers=workers)
+    _, higher_first = METRICS[metric]
+
+    logic = VigenereCipherLogic()
+    head = read_sample(path)
+    found = {}  # key -> (period, ioc, score), in rank order
+    while ranked and len(found) < top:
+        periods, ranked = ranked[:top - len(found)], ranked[top - len(found):]
+        totals = column_totals(path, [period for period, _ in periods])
+        for period, ioc in periods:
+            key, score = solve_key(totals[period], metric)
+            if key in found:
+                best = found[key][2]
+                if not (score > best if higher_first else score < best):
+                    continue
+            found[key] = (period, ioc, score)
+    return [Candidate(f"{key} (period {period}, confidence {confidence(ioc):.0%})",
+                      score, logic.decrypt(head, key))
+            for key, (period, ioc, score) in found.items()]
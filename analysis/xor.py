@@ -0,0 +1,123 @@
+import math
+from collections import Counter
+from itertools import repeat
+from operator import mul
+from typing import List, Optional, Tuple
+from analysis.base import (
+    PREVIEW_SIZE, Candidate, parallel_map, read_sample, resolve_workers, shortest_repeat
+)
+from analysis.frequency import ENGLISH_FREQUENCIES, numpy
+
+# Longest key length considered.
+MAX_KEY_LENGTH = 40
+# Bytes from the start of the file used to recover the key. Each column of
+# a 40-byte key still holds thousands of bytes, so larger inputs cost the
+# same.
+SAMPLE_BYTES = 1 << 18
+# Bytes compared when measuring Hamming distances.
+HAMMING_BYTES = 1 << 16
+# Key lengths (by Hamming distance) solved before ranking by plaintext.
+SOLVED_LENGTHS = 8
+
+
+def _byte_log_frequencies() -> List[float]:
+    """Log-probability of each byte value in English plain text."""
+    weights = [1e-6] * 256
+    for b in range(0x20, 0x7f):
+        weights[b] = 5e-4
+    for b in b"0123456789.,;:!?'\"-()\n":
+        weights[b] = 5e-3
+    weights[ord(' ')] = 0.15
+    for i, f in enumerate(ENGLISH_FREQUENCIES):
+        weights[ord('a') + i] = f * 0.6
+        weights[ord('A') + i] = f * 0.04
+    return [math.log(w) for w in weights]
+
+
+BYTE_LOG_FREQUENCIES = _byte_log_frequencies()
+# Row k: log-frequency of the plaintext byte b ^ k for each ciphertext byte b.
+XOR_LOG_FREQUENCIES = [[BYTE_LOG_FREQUENCIES[b ^ k] for b in range(256)] for k in range(256)]
+_XOR_MATRIX = numpy.array(XOR_LOG_FREQUENCIES) if numpy is not None else None
+
+
+def hamming_distance(data: bytes, key_length: int) -> float:
+    """
+    Mean differing bits per byte between data and data shifted by
+    key_length. Bytes a key length apart share a key byte, which cancels in
+    their XOR, so the right length (and its multiples) looks like plain
+    text (~2-3 bits) rather than noise (~4 bits).
+    """
+    n = len(data) - key_length
+    if n <= 0:
+        return 8.0
+    a = int.from_bytes(data[:n], 'big')
+    b = int.from_bytes(data[key_length:key_length + n], 'big')
+    return bin(a ^ b).count('1') / n
+
+
+def solve_column(column: bytes) -> Tuple[int, float]:
+    """
+    Key byte maximising the English log-likelihood of column ^ key, from
+    the column's byte histogram alone. Returns (key byte, log-likelihood).
+    """
+    if numpy is not None:
+        counts = numpy.bincount(numpy.frombuffer(column, dtype=numpy.uint8), minlength=256)
+        scores = _XOR_MATRIX @ counts
+        best = int(scores.argmax())
+        return best, float(scores[best])
+    histogram = Counter(column)
+    counts = [histogram.get(b, 0) for b in range(256)]
+    scores = [sum(map(mul, counts, row)) for row in XOR_LOG_FREQUENCIES]
+    best = max(range(256), key=scores.__getitem__)
+    return best, scores[best]
+
+
+def solve_key(data: bytes, key_length: int) -> Tuple[bytes, float]:
+    """Solves every strided column data[i::key_length]; returns (key, log-likelihood per byte)."""
+    solved = [solve_column(data[i::key_length]) for i in range(key_length)]
+    key = bytes(key_byte for key_byte, _ in solved)
+    return key, sum(score for _, score in solved) / max(len(data), 1)
+
+
+def rank_key_lengths(data: bytes, max_length: int = MAX_KEY_LENGTH,
+                     workers: int = 1) -> List[Tuple[float, int]]:
+    """(Hamming distance, key length) for lengths 1..max_length, closest first."""
+    lengths = range(1, min(max_length, max(len(data) // 2, 1)) + 1)
+    sample = data[:HAMMING_BYTES]
+    distances = parallel_map(hamming_distance, repeat(sample), lengths, workers=workers)
+    return sorted(zip(distances, lengths))
+
+
+def describe_key(key: bytes) -> str:
+    """The key as a password when it is valid UTF-8, otherwise as hex."""
+    try:
+        return f"password {key.decode('utf-8')!r}"
+    except UnicodeDecodeError:
+        return f"key 0x{key.hex()}"
+
+
+def crack_xor(path: str, top: int = 5, metric: str = "chi2",
+              workers: Optional[int] = None) -> List[Candidate]:
+    """
+    Recovers a repeating XOR key (xor and bitwise logics). The likeliest
+    key lengths by normalized Hamming distance are solved in parallel, one
+    process per length, and the keys ranked by the log-likelihood per byte
+    of their plain text; metric is not used.
+    """
+    sample = read_sample(path, SAMPLE_BYTES)
+    if not sample:
+        return []
+    workers = resolve_workers(workers)
+    lengths = [length for _, length in rank_key_lengths(sample, workers=workers)[:SOLVED_LENGTHS]]
+    solved = parallel_map(solve_key, repeat(sample), lengths, workers=min(workers, len(lengths)))
+
+    ranked = {}
+    for key, score in solved:
+        key = shortest_repeat(key)
+        ranked[key] = max(score, ranked.get(key, score))
+    head = sample[:PREVIEW_SIZE]
+    candidates = []
+    for key, score in sorted(ranked.items(), key=lambda entry: entry[1], reverse=True)[:top]:
+        preview = bytes(b ^ key[i % len(key)] for i, b in enumerate(head))
+        candidates.append(Candidate(f"{describe_key(key)} (length {len(key)})", score, preview))
+    return candidates
@@ -3,9 +3,10 @@ import sys
 import os
 from utils.plugin_loader import load_logics
 from utils.security import get_secure_password
-from utils.file_ops import read_file, write_file
+from utils.file_ops import decrypt_range, process_file, update_file
 from utils.logging import setup_logging, log_operation
 from utils.history import save_history_entry, get_recent_history
+from utils.daemon import forward_file, ping, run_server
 
 BANNER = r"""
    ______                      __ ______                      
@@ -16,12 +17,47 @@ BANNER = r"""
                /_/                         /____/       
 """
 
+def parse_range(text: str):
+    """'START:END' (either side may be empty) -> (start, end or None)."""
+    start, sep, end = text.partition(":")
+    try:
+        if not sep:
+            raise ValueError
+        bounds = int(start or 0), int(end) if end else None
+    except ValueError:
+        raise ValueError(f"Invalid range '{text}' (use START:END)") from None
+    if bounds[0] < 0 or (bounds[1] is not None and bounds[1] < bounds[0]):
+        raise ValueError(f"Invalid range '{text}' (use START:END)")
+    return bounds
+
+def parse_size(text: str) -> int:
+    """'65536', '64K', '4M' or '1G' -> bytes (argparse type)."""
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    number, unit = (text[:-1], units[text[-1].upper()]) if text[-1:].upper() in units else (text, 1)
+    try:
+        size = int(number) * unit
+    except ValueError:
+        size = 0
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"invalid size '{text}' (e.g. 65536, 64K, 4M)")
+    return size
+
+def pipeline_options(args) -> dict:
+    """process_file() keyword arguments for --buffers and --chunk-size."""
+    options = {}
+    if args.buffers is not None:
+        if args.buffers < 0:
+            raise ValueError("--buffers cannot be negative.")
+        options["buffers"] = args.buffers
+    if args.chunk_size is not None:
+        options["chunk_size"] = args.chunk_size
+    return options
+
 def run():
     """
     Main CLI execution function.
     """
     setup_logging()
-    available_logics = load_logics()
     
     parser = argparse.ArgumentParser(
         description="CryptForge: Modular Encryption & Decryption CLI Tool"
@@ -33,11 +69,82 @@ def run():
     encrypt_parser = subparsers.add_parser("encrypt", help="Encrypt a file")
     encrypt_parser.add_argument("file", help="Path to the file to encrypt")
     encrypt_parser.add_argument("--logic", help="Encryption logic to use (default: aes)", default="aes")
+    encrypt_parser.add_argument("--local", action="store_true",
+                                help="Run in this process even if a daemon is listening")
+    encrypt_parser.add_argument("--compress", choices=["zlib", "lzma", "zstd"],
+                                help="Compress before encrypting (aes, chacha20, auto; implies --local)")
+    encrypt_parser.add_argument("--wrap", type=int, metavar="WIDTH",
+                                help="Wrap the encoded output into lines of WIDTH characters "
+                                     "(base64, base32, ascii85, hex; implies --local)")
+    encrypt_parser.add_argument("--update", nargs="?", const="", metavar="ENC_FILE",
+                                help="Update an encrypted copy in place, rewriting only changed segments "
+                                     "(default: FILE.enc; aes, chacha20, auto; implies --local)")
+    encrypt_parser.add_argument("--buffers", type=int, metavar="N",
+                                help="Chunks in flight between the reader, cipher and writer threads "
+                                     "(default: 4; 0 = one thread; implies --local)")
+    encrypt_parser.add_argument("--chunk-size", type=parse_size, metavar="S",
+                                help="Bytes per read, e.g. 4M (default: 1M; implies --local)")
     
     # Decrypt Command
     decrypt_parser = subparsers.add_parser("decrypt", help="Decrypt a file")
     decrypt_parser.add_argument("file", help="Path to the file to decrypt")
     decrypt_parser.add_argument("--logic", help="Decryption logic to use (default: aes)", default="aes")
+    decrypt_parser.add_argument("--local", action="store_true",
+                                help="Run in this process even if a daemon is listening")
+    decrypt_parser.add_argument("--range", metavar="START:END",
+                                help="Decrypt only bytes START to END of the content, reading only the "
+                                     "segments that hold them (aes, chacha20, auto; implies --local)")
+    decrypt_parser.add_argument("--buffers", type=int, metavar="N",
+                                help="Chunks in flight between the reader, cipher and writer threads "
+                                     "(default: 4; 0 = one thread; implies --local)")
+    decrypt_parser.add_argument("--chunk-size", type=parse_size, metavar="S",
+                                help="Bytes per read, e.g. 4M (default: 1M; implies --local)")
+    
+    # Crack Command
+    crack_parser = subparsers.add_parser("crack", help="Recover the key of a classical cipher")
+    crack_parser.add_argument("file", help="Path to the encrypted file")
+    # Choices are checked when the command runs, so other commands (and the
+    # daemon client) start without importing the analysis package
+    crack_parser.add_argument("--logic", help="Cipher to attack (default: caesar)", default="caesar")
+    crack_parser.add_argument("--top", type=int, help="Show the N best keys", default=5)
+    crack_parser.add_argument("--score", help="Scoring metric (default: chi2)", default="chi2")
+    crack_parser.add_argument("--crib", help="Known plaintext fragment (enigma only)")
+    
+    # Identify Command
+    identify_parser = subparsers.add_parser("identify", help="Guess which logic produced a file")
+    identify_parser.add_argument("file", help="Path to the encrypted file")
+    identify_parser.add_argument("--top", type=int, help="Show the N likeliest logics", default=5)
+    
+    # Inspect Command
+    inspect_parser = subparsers.add_parser("inspect", help="Show the header of an encrypted file (no password)")
+    inspect_parser.add_argument("file", help="Path to the encrypted file")
+    
+    # Verify Command
+    verify_parser = subparsers.add_parser("verify", help="Authenticate encrypted files without writing plaintext")
+    verify_parser.add_argument("files", nargs="+", help="Paths to the encrypted files")
+    verify_parser.add_argument("--logic", help="Logic that produced the files (default: aes)", default="aes")
+    verify_parser.add_argument("--workers", type=int, help="Threads authenticating segments (default: one per CPU)")
+    
+    # Serve Command
+    serve_parser = subparsers.add_parser("serve", help="Run a daemon that keeps logics and keys warm")
+    serve_parser.add_argument("--socket", help="Unix socket path (default: cache/cryptforge.sock)")
+    serve_parser.add_argument("--workers", type=int, help="Worker threads (default: one per CPU)")
+    
+    # Store Command
+    store_parser = subparsers.add_parser("store", help="Deduplicating encrypted snapshots of files and directories")
+    store_commands = store_parser.add_subparsers(dest="store_command", required=True)
+    store_save = store_commands.add_parser("save", help="Save a file or directory as a new snapshot")
+    store_save.add_argument("source", help="File or directory to save")
+    store_save.add_argument("--store", required=True, help="Store directory (created on first use)")
+    store_save.add_argument("--name", help="Snapshot name (default: the time of the save)")
+    store_save.add_argument("--compress", choices=["zlib", "lzma", "zstd"],
+                            help="Compress chunks (set when the store is created)")
+    store_list = store_commands.add_parser("list", help="List the snapshots in a store")
+    store_list.add_argument("--store", required=True, help="Store directory")
+    store_restore = store_commands.add_parser("restore", help="Restore a snapshot into a directory")
+    store_restore.add_argument("dest", help="Directory to restore into")
+    store_restore.add_argument("--store", required=True, help="Store directory")
+    store_restore.add_argument("--snapshot", help="Snapshot id or name (default: the latest)")
     
     # History Command
     history_parser = subparsers.add_parser("history", help="View operation history")
@@ -55,28 +162,57 @@ def run():
         parser.print_help()
         sys.exit(0)
 
+    # Encrypt/decrypt forward to a running daemon, which has the logics
+    # loaded already; everything else loads them here.
+    daemon_logics = None
+    # Compression, wrapping and I/O tuning are settings of this process, so it runs here
+    if args.command in ("encrypt", "decrypt") and not args.local and not getattr(args, "compress", None) \
+            and getattr(args, "wrap", None) is None and getattr(args, "update", None) is None \
+            and not getattr(args, "range", None) and args.buffers is None and args.chunk_size is None:
+        daemon_logics = ping()
+    available_logics = load_logics() if daemon_logics is None else {}
+
     # Dispatch commands
     if args.command == "encrypt":
         try:
-            logic_cls = available_logics.get(args.logic)
-            if not logic_cls:
+            if args.logic not in (daemon_logics if daemon_logics is not None else available_logics):
                 print(f"Error: Logic '{args.logic}' not found.")
                 sys.exit(1)
             
-            logic = logic_cls()
-            print(f"Encrypting '{args.file}' using {logic.name}...")
-            
-            data = read_file(args.file)
-            password = get_secure_password("Enter encryption password: ", confirm=True)
+            print(f"Encrypting '{args.file}' using {args.logic}...")
             
-            encrypted_data = logic.encrypt(data, password)
+            if not os.path.exists(args.file):
+                raise FileNotFoundError(f"File not found: {args.file}")
+            options = pipeline_options(args)
+            output_path = args.update or f"{args.file}.enc"
+            # An update checks the password against the existing file instead
+            updating = args.update is not None and os.path.exists(output_path)
+            password = get_secure_password("Enter encryption password: ", confirm=not updating)
             
-            output_path = f"{args.file}.enc"
-            write_file(output_path, encrypted_data, overwrite=False)
+            if daemon_logics is not None:
+                forward_file("encrypt", args.logic, args.file, output_path, password)
+            else:
+                logic = available_logics[args.logic]()
+                if args.compress:
+                    if args.update is not None:
+                        raise ValueError("--compress cannot be combined with --update.")
+                    if not hasattr(logic, "compression"):
+                        raise ValueError(f"--compress is not supported for '{args.logic}'.")
+                    logic.compression = args.compress
+                if args.wrap is not None:
+                    if not hasattr(logic, "line_width"):
+                        raise ValueError(f"--wrap is not supported for '{args.logic}'.")
+                    if args.wrap < 1:
+                        raise ValueError("--wrap needs a positive line width.")
+                    logic.line_width = args.wrap
+                if args.update is not None:
+                    update_file(logic, args.file, output_path, password)
+                else:
+                    process_file(logic, "encrypt", args.file, output_path, password, **options)
             print(f"Success! Encrypted file saved to: {output_path}")
             
-            log_operation("encrypt", args.file, logic.name, "success")
-            save_history_entry("encrypt", args.file, logic.name, "success")
+            log_operation("encrypt", args.file, args.logic, "success")
+            save_history_entry("encrypt", args.file, args.logic, "success")
             
         except (ValueError, FileNotFoundError, FileExistsError, IOError) as e:
             print(f"Error: {e}")
@@ -86,36 +222,190 @@ def run():
             
     elif args.command == "decrypt":
         try:
-            logic_cls = available_logics.get(args.logic)
-            if not logic_cls:
+            if args.logic not in (daemon_logics if daemon_logics is not None else available_logics):
                 print(f"Error: Logic '{args.logic}' not found.")
                 sys.exit(1)
             
-            logic = logic_cls()
-            print(f"Decrypting '{args.file}' using {logic.name}...")
+            print(f"Decrypting '{args.file}' using {args.logic}...")
             
-            data = read_file(args.file)
+            if not os.path.exists(args.file):
+                raise FileNotFoundError(f"File not found: {args.file}")
+            byte_range = parse_range(args.range) if args.range else None
+            options = pipeline_options(args)
             password = get_secure_password("Enter decryption password: ", confirm=False)
             
-            decrypted_data = logic.decrypt(data, password)
-            
             # Remove .enc extension if present, otherwise append .dec
             if args.file.endswith(".enc"):
                 output_path = args.file[:-4]
             else:
                 output_path = f"{args.file}.dec"
                 
-            write_file(output_path, decrypted_data, overwrite=False)
+            if args.range:
+                start, end = byte_range
+                output_path = f"{output_path}.{start}-{end if end is not None else 'end'}"
+                decrypt_range(available_logics[args.logic](), args.file, output_path, password, start, end)
+            elif daemon_logics is not None:
+                forward_file("decrypt", args.logic, args.file, output_path, password)
+            else:
+                process_file(available_logics[args.logic](), "decrypt", args.file, output_path, password,
+                             **options)
             print(f"Success! Decrypted file saved to: {output_path}")
             
-            log_operation("decrypt", args.file, logic.name, "success")
-            save_history_entry("decrypt", args.file, logic.name, "success")
+            log_operation("decrypt", args.file, args.logic, "success")
+            save_history_entry("decrypt", args.file, args.logic, "success")
             
         except (ValueError, FileNotFoundError, FileExistsError, IOError) as e:
             print(f"Error: {e}")
             log_operation("decrypt", args.file, args.logic, "failure", str(e))
             save_history_entry("decrypt", args.file, args.logic, "failure")
             sys.exit(1)
+    elif args.command == "crack":
+        from analysis import CRACKERS, CRIB_CRACKERS, METRICS
+        try:
+            if args.logic not in CRACKERS:
+                raise ValueError(f"Cannot crack '{args.logic}' (choose from {', '.join(sorted(CRACKERS))}).")
+            if args.score not in METRICS:
+                raise ValueError(f"Unknown metric '{args.score}' (choose from {', '.join(sorted(METRICS))}).")
+            if not os.path.exists(args.file):
+                raise FileNotFoundError(f"File not found: {args.file}")
+            options = {}
+            if args.crib:
+                if args.logic not in CRIB_CRACKERS:
+                    raise ValueError(f"--crib is not supported for '{args.logic}'.")
+                options["crib"] = args.crib
+            candidates = CRACKERS[args.logic](args.file, top=args.top, metric=args.score, **options)
+            print(f"Top {len(candidates)} keys for '{args.file}' ({args.logic}, {args.score}):")
+            print("-" * 60)
+            print(f"{'Rank':<4} | {'Score':>12} | {'Key'}")
+            print("-" * 60)
+            for rank, candidate in enumerate(candidates, 1):
+                preview = candidate.preview.decode('utf-8', errors='replace')
+                print(f"{rank:<4} | {candidate.score:>12.4f} | {candidate.key}")
+                print(f"{'':<4} | {'':>12} | {preview!r}")
+            log_operation("crack", args.file, args.logic, "success")
+        except (ValueError, FileNotFoundError, IOError) as e:
+            print(f"Error: {e}")
+            log_operation("crack", args.file, args.logic, "failure", str(e))
+            sys.exit(1)
+    elif args.command == "identify":
+        from analysis.identify import identify_file, trial_decode
+        try:
+            if not os.path.exists(args.file):
+                raise FileNotFoundError(f"File not found: {args.file}")
+            guesses = identify_file(args.file)[:args.top]
+            if not guesses:
+                print(f"No logic recognised for '{args.file}'.")
+                log_operation("identify", args.file, "-", "success")
+                return
+            print(f"Likely logics for '{args.file}':")
+            print("-" * 60)
+            print(f"{'Rank':<4} | {'Conf':>5} | {'Logic':<14} | {'Reason'}")
+            print("-" * 60)
+            for rank, guess in enumerate(guesses, 1):
+                print(f"{rank:<4} | {guess.confidence:>5.2f} | {guess.logic:<14} | {guess.reason}")
+            best = guesses[0]
+            decoded = trial_decode(args.file, best, available_logics[best.logic]())
+            print("-" * 60)
+            if decoded:
+                key, preview = decoded
+                print(f"Trial decode with {best.logic} ({key}):")
+                print(repr(preview.decode('utf-8', errors='replace')))
+            else:
+                print(f"No trial decode: {best.logic} needs the password.")
+            log_operation("identify", args.file, best.logic, "success")
+        except (ValueError, FileNotFoundError, IOError) as e:
+            print(f"Error: {e}")
+            log_operation("identify", args.file, "-", "failure", str(e))
+            sys.exit(1)
+    elif args.command == "inspect":
+        from logics.container import AEADS, CODECS, KDFS, read_info
+        try:
+            if not os.path.exists(args.file):
+                raise FileNotFoundError(f"File not found: {args.file}")
+            with open(args.file, 'rb') as f:
+                info = read_info(f)
+            header = info.header
+            print(f"Header of '{args.file}':")
+            print("-" * 60)
+            print(f"{'Format':<14} | CryptForge container v{header.version}")
+            print(f"{'Cipher':<14} | {AEADS[header.aead].name}")
+            print(f"{'KDF':<14} | {KDFS[header.kdf]}, {header.iterations} iterations")
+            print(f"{'Salt':<14} | {header.salt.hex()}")
+            print(f"{'Compression':<14} | {CODECS[header.compression].name}")
+            print(f"{'Segment size':<14} | {header.segment_size} bytes")
+            print(f"{'Segments':<14} | {info.segments}")
+            print(f"{'Plaintext':<14} | {info.total} bytes (unverified; see verify)")
+            print(f"{'File size':<14} | {info.file_size} bytes")
+            log_operation("inspect", args.file, "-", "success")
+        except (ValueError, FileNotFoundError, IOError) as e:
+            print(f"Error: {e}")
+            log_operation("inspect", args.file, "-", "failure", str(e))
+            sys.exit(1)
+    elif args.command == "verify":
+        logic = available_logics.get(args.logic)
+        if logic is None or not hasattr(logic, "verify_stream"):
+            print(f"Error: verify is not supported for '{args.logic}'.")
+            sys.exit(1)
+        logic = logic()
+        password = get_secure_password("Enter decryption password: ", confirm=False)
+        failures = 0
+        for path in args.files:
+            try:
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"File not found: {path}")
+                with open(path, 'rb') as f:
+                    info = logic.verify_stream(f, password, args.workers)
+                detail = "single message" if info is None else f"{info.segments} segments, {info.total} bytes"
+                print(f"OK      {path} ({detail})")
+                log_operation("verify", path, args.logic, "success")
+            except (ValueError, FileNotFoundError, IOError) as e:
+                failures += 1
+                print(f"FAILED  {path}: {e}")
+                log_operation("verify", path, args.logic, "failure", str(e))
+        if failures:
+            print(f"{failures} of {len(args.files)} files failed verification.")
+            sys.exit(1)
+    elif args.command == "serve":
+        try:
+            options = {"workers": args.workers}
+            if args.socket:
+                options["socket_path"] = args.socket
+            print("CryptForge daemon listening (Ctrl+C to stop)...")
+            run_server(**options)
+        except (ValueError, OSError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    elif args.command == "store":
+        from utils.store import ChunkStore
+        target = args.source if args.store_command == "save" else args.store
+        try:
+            new_store = not os.path.exists(os.path.join(args.store, "store.json"))
+            if args.store_command != "save" and new_store:
+                raise FileNotFoundError(f"Store not found: {args.store}")
+            password = get_secure_password("Enter store password: ", confirm=new_store)
+            with ChunkStore(args.store, password, getattr(args, "compress", None)) as store:
+                if args.store_command == "save":
+                    print(f"Saving '{args.source}' to {args.store}...")
+                    stats = store.save(args.source, args.name)
+                    print(f"Success! Snapshot {stats.snapshot}: {stats.files} files, {stats.size} bytes "
+                          f"in {stats.chunks} chunks ({stats.new_chunks} new, {stats.new_size} bytes written)")
+                elif args.store_command == "list":
+                    print(f"{'Id':<6} | {'Created':<20} | {'Name'}")
+                    print("-" * 60)
+                    for snapshot in store.snapshots():
+                        print(f"{snapshot.id:<6} | {snapshot.created:<20} | {snapshot.name}")
+                else:
+                    count = store.restore(args.dest, args.snapshot)
+                    print(f"Success! Restored {count} files to: {args.dest}")
+            log_operation(f"store {args.store_command}", target, "aes", "success")
+            if args.store_command != "list":
+                save_history_entry(f"store {args.store_command}", target, "aes", "success")
+        except (ValueError, FileNotFoundError, FileExistsError, IOError) as e:
+            print(f"Error: {e}")
+            log_operation(f"store {args.store_command}", target, "aes", "failure", str(e))
+            if args.store_command != "list":
+                save_history_entry(f"store {args.store_command}", target, "aes", "failure")
+            sys.exit(1)
     elif args.command == "history":
         history = get_recent_history(args.last)
         print(f"Last {len(history)} Operations:")
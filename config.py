@@ -7,11 +7,16 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 LOGICS_DIR = os.path.join(BASE_DIR, 'logics')
 HISTORY_DIR = os.path.join(BASE_DIR, 'history')
 LOGS_DIR = os.path.join(BASE_DIR, 'logs')
+CACHE_DIR = os.path.join(BASE_DIR, 'cache')
 
 # File paths
 HISTORY_FILE = os.path.join(HISTORY_DIR, 'operations.json')
 AUDIT_LOG_FILE = os.path.join(LOGS_DIR, 'audit.log')
+QUADGRAM_FILE = os.path.join(CACHE_DIR, 'quadgrams.bin')
+# Unix socket of the `serve` daemon (overridable, e.g. for a shorter path)
+DAEMON_SOCKET = os.environ.get('CRYPTFORGE_SOCKET', os.path.join(CACHE_DIR, 'cryptforge.sock'))
 
 # Ensure directories exist
 os.makedirs(HISTORY_DIR, exist_ok=True)
 os.makedirs(LOGS_DIR, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
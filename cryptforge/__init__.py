@@ -0,0 +1,16 @@
+"""
+Embeddable CryptForge API: the logics of the CLI as plain functions, with
+a cached registry, shared logic instances, batch operations and
+asyncio variants.
+"""
+from cryptforge.aio import (AsyncRunner, adecrypt_bytes, adecrypt_file, aencrypt_bytes,
+                            aencrypt_file)
+from cryptforge.api import (available_logics, decrypt, decrypt_many, encrypt, encrypt_many,
+                            get_logic, registry)
+from cryptforge.files import SeekableDecryptedReader, open_encrypted
+
+__all__ = [
+    "AsyncRunner", "SeekableDecryptedReader", "adecrypt_bytes", "adecrypt_file", "aencrypt_bytes", "aencrypt_file",
+    "available_logics", "decrypt", "decrypt_many", "encrypt", "encrypt_many",
+    "get_logic", "open_encrypted", "registry",
+]
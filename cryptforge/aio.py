@@ -0,0 +1,149 @@
+import asyncio
+import os
+import threading
+import weakref
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+from cryptforge.api import get_logic
+from utils.file_ops import process_file
+
+# Operations a runner admits at once per event loop; the rest wait.
+DEFAULT_CONCURRENCY_PER_WORKER = 2
+
+
+def _bytes_job(operation: str, logic: str, data: bytes, password: str) -> bytes:
+    instance = get_logic(logic)
+    return instance.encrypt(data, password) if operation == "encrypt" else instance.decrypt(data, password)
+
+
+def _file_job(operation: str, logic: str, src_path: str, dst_path: str, password: str,
+              overwrite: bool, cancelled: Optional[threading.Event]) -> None:
+    process_file(get_logic(logic), operation, src_path, dst_path, password, overwrite, cancelled)
+
+
+def _discard_output(future: Future, dst_path: str) -> None:
+    """Done callback of a cancelled file job that still ran to completion."""
+    if not future.cancelled() and future.exception() is None:
+        try:
+            os.remove(dst_path)
+        except FileNotFoundError:
+            pass
+
+
+class AsyncRunner:
+    """
+    Runs CryptForge operations for asyncio code. All file I/O, key
+    derivation and cipher work happens in an executor, so the event loop
+    only awaits futures.
+
+    executor is a ThreadPoolExecutor (the default, with `workers` threads)
+    or a ProcessPoolExecutor (processes=True), which side-steps the GIL for
+    the pure-Python ciphers; jobs are passed by logic name, so workers use
+    their own cached logic instances. At most max_concurrency operations
+    run at once, which bounds the executor queue and the memory held by
+    in-flight data; further calls wait (backpressure).
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, workers: Optional[int] = None,
+                 processes: bool = False, max_concurrency: Optional[int] = None):
+        workers = workers or os.cpu_count() or 1
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = (ProcessPoolExecutor(workers) if processes else
+                        ThreadPoolExecutor(workers, thread_name_prefix="cryptforge-aio"))
+        self.executor = executor
+        self.max_concurrency = max_concurrency or workers * DEFAULT_CONCURRENCY_PER_WORKER
+        # asyncio primitives belong to one loop; a runner may serve several
+        self._limits = weakref.WeakKeyDictionary()
+
+    def _limit(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        limit = self._limits.get(loop)
+        if limit is None:
+            limit = self._limits[loop] = asyncio.Semaphore(self.max_concurrency)
+        return limit
+
+    async def _bytes(self, operation: str, data: bytes, logic: str, password: str) -> bytes:
+        async with self._limit():
+            return await asyncio.wrap_future(
+                self.executor.submit(_bytes_job, operation, logic, data, password))
+
+    async def encrypt_bytes(self, data: bytes, logic: str = "aes", password: str = "") -> bytes:
+        return await self._bytes("encrypt", data, logic, password)
+
+    async def decrypt_bytes(self, data: bytes, logic: str = "aes", password: str = "") -> bytes:
+        return await self._bytes("decrypt", data, logic, password)
+
+    async def _file(self, operation: str, src_path: str, dst_path: str, logic: str,
+                    password: str, overwrite: bool) -> None:
+        async with self._limit():
+            # Thread workers poll the event between chunks; an Event cannot
+            # cross into a worker process, which finishes its job instead.
+            cancelled = None if isinstance(self.executor, ProcessPoolExecutor) else threading.Event()
+            future = self.executor.submit(_file_job, operation, logic, src_path, dst_path,
+                                          password, overwrite, cancelled)
+            try:
+                await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                # A job that had not started is simply dropped. A running one
+                # removes its own output when it stops early; if it completes
+                # anyway, the callback removes the output it wrote.
+                if cancelled is not None:
+                    cancelled.set()
+                if not future.cancel():
+                    future.add_done_callback(lambda done: _discard_output(done, dst_path))
+                raise
+
+    async def encrypt_file(self, src_path: str, dst_path: str, logic: str = "aes",
+                           password: str = "", overwrite: bool = False) -> None:
+        """process_file() without blocking the loop; cancelling leaves no output."""
+        await self._file("encrypt", src_path, dst_path, logic, password, overwrite)
+
+    async def decrypt_file(self, src_path: str, dst_path: str, logic: str = "aes",
+                           password: str = "", overwrite: bool = False) -> None:
+        await self._file("decrypt", src_path, dst_path, logic, password, overwrite)
+
+    def close(self, wait: bool = True) -> None:
+        """Shuts down the executor if the runner created it."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=wait)
+
+    async def __aenter__(self) -> "AsyncRunner":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        # Waiting for the workers must not block the loop either
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+_default_runner: Optional[AsyncRunner] = None
+_default_lock = threading.Lock()
+
+
+def default_runner() -> AsyncRunner:
+    """The process-wide thread runner used when no runner is passed."""
+    global _default_runner
+    with _default_lock:
+        if _default_runner is None:
+            _default_runner = AsyncRunner()
+        return _default_runner
+
+
+async def aencrypt_bytes(data: bytes, logic: str = "aes", password: str = "",
+                         runner: Optional[AsyncRunner] = None) -> bytes:
+    return await (runner or default_runner()).encrypt_bytes(data, logic, password)
+
+
+async def adecrypt_bytes(data: bytes, logic: str = "aes", password: str = "",
+                         runner: Optional[AsyncRunner] = None) -> bytes:
+    return await (runner or default_runner()).decrypt_bytes(data, logic, password)
+
+
+async def aencrypt_file(src_path: str, dst_path: str, logic: str = "aes", password: str = "",
+                        overwrite: bool = False, runner: Optional[AsyncRunner] = None) -> None:
+    await (runner or default_runner()).encrypt_file(src_path, dst_path, logic, password, overwrite)
+
+
+async def adecrypt_file(src_path: str, dst_path: str, logic: str = "aes", password: str = "",
+                        overwrite: bool = False, runner: Optional[AsyncRunner] = None) -> None:
+    await (runner or default_runner()).decrypt_file(src_path, dst_path, logic, password, overwrite)
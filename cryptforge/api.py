@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Type
+from logics.aead import KeyCache
+from logics.base import EncryptionLogic
+from utils.plugin_loader import load_logics
+
+# Batches smaller than this run on the calling thread.
+MIN_PARALLEL_BATCH = 64
+
+_instances: Dict[str, EncryptionLogic] = {}
+_instances_lock = threading.Lock()
+# Derived keys shared by every cached AEAD logic instance of this process
+_key_cache = KeyCache()
+
+
+@lru_cache(maxsize=None)
+def registry() -> Dict[str, Type[EncryptionLogic]]:
+    """Logic name -> class, discovered once per process."""
+    return load_logics()
+
+
+def available_logics() -> List[str]:
+    return sorted(registry())
+
+
+def get_logic(name: str) -> EncryptionLogic:
+    """
+    The shared instance of a logic. Logic instances hold no per-call
+    state, so one instance serves every thread; the AEAD logics also
+    share a KeyCache, so each password's key is derived once per process.
+    """
+    logic = _instances.get(name)
+    if logic is not None:
+        return logic
+    logic_cls = registry().get(name)
+    if logic_cls is None:
+        raise ValueError(f"Logic '{name}' not found.")
+    with _instances_lock:
+        if name not in _instances:
+            logic = logic_cls()
+            if hasattr(logic, 'key_cache'):
+                logic.key_cache = _key_cache
+            _instances[name] = logic
+        return _instances[name]
+
+
+def encrypt(data: bytes, logic: str = "aes", password: str = "") -> bytes:
+    return get_logic(logic).encrypt(data, password)
+
+
+def decrypt(data: bytes, logic: str = "aes", password: str = "") -> bytes:
+    return get_logic(logic).decrypt(data, password)
+
+
+def _run_batch(func, buffers: Iterable[bytes], workers: Optional[int]) -> List[bytes]:
+    """
+    Maps func over buffers. Large batches are split into one contiguous
+    slice per worker thread, so the pool costs one task per thread rather
+    than per item.
+    """
+    items = list(buffers)
+    workers = workers or 1
+    if workers < 2 or len(items) < MIN_PARALLEL_BATCH:
+        return list(map(func, items))
+    size = -(-len(items) // workers)
+    slices = [items[start:start + size] for start in range(0, len(items), size)]
+    with ThreadPoolExecutor(len(slices)) as pool:
+        results = pool.map(lambda part: list(map(func, part)), slices)
+        return list(chain.from_iterable(results))
+
+
+def encrypt_many(buffers: Iterable[bytes], logic: str = "aes", password: str = "",
+                 workers: Optional[int] = None) -> List[bytes]:
+    """
+    Encrypts independent messages with one password, in order. The key
+    is set up once for the batch (see EncryptionLogic.batch_encryptor), so
+    each message only pays for the cipher itself. workers > 1 spreads the
+    batch over a thread pool, which helps for logics that release the GIL
+    (AES on large buffers).
+    """
+    return _run_batch(get_logic(logic).batch_encryptor(password), buffers, workers)
+
+
+def decrypt_many(buffers: Iterable[bytes], logic: str = "aes", password: str = "",
+                 workers: Optional[int] = None) -> List[bytes]:
+    """Decrypts independent messages with one password (see encrypt_many)."""
+    return _run_batch(get_logic(logic).batch_decryptor(password), buffers, workers)
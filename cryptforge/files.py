@@ -0,0 +1,206 @@
+import io
+import os
+from collections import OrderedDict
+from typing import BinaryIO, Union
+from logics.base import DEFAULT_CHUNK_SIZE, StreamTransform
+from cryptforge.api import get_logic
+
+
+class EncryptedReader(io.RawIOBase):
+    """Raw reader returning the decryption of an encrypted file, chunk by chunk."""
+
+    def __init__(self, path: str, transform: StreamTransform, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._file = open(path, 'rb')
+        self._transform = transform
+        self._chunk_size = chunk_size
+        self._pending = memoryview(b"")
+        self._finished = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self._finished:
+            chunk = self._file.read(self._chunk_size)
+            if chunk:
+                self._pending = memoryview(self._transform.update(chunk))
+            else:
+                self._pending = memoryview(self._transform.finalize())
+                self._finished = True
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+# Decrypted segments a SeekableDecryptedReader keeps (64 KiB each by default).
+DEFAULT_CACHE_SEGMENTS = 16
+
+
+class SeekableDecryptedReader(io.RawIOBase):
+    """
+    Seekable raw reader of a segmented encrypted file (the AES container).
+    A read maps its byte range to segments and reads and authenticates
+    only those, so reading 1 MB from the middle of a huge file touches
+    about 1 MB of it. The last cache_segments decrypted segments are kept
+    (LRU) for nearby reads. file is a path or a seekable binary file
+    object (left open on close()).
+    """
+
+    def __init__(self, file: Union[str, BinaryIO], logic: str = "aes", password: str = "",
+                 cache_segments: int = DEFAULT_CACHE_SEGMENTS):
+        instance = get_logic(logic)
+        if not hasattr(instance, "random_access"):
+            raise ValueError(f"Random access is not supported for '{logic}'.")
+        self._owned = isinstance(file, str)
+        self._file = open(file, 'rb') if self._owned else file
+        try:
+            self._segments = instance.random_access(self._file, password)
+        except BaseException:
+            if self._owned:
+                self._file.close()
+            raise
+        self._cache = OrderedDict()
+        self._cache_segments = max(1, cache_segments)
+        self._position = 0
+
+    @property
+    def size(self) -> int:
+        """Length of the decrypted content."""
+        return self._segments.size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"Invalid whence ({whence})")
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+        self._position = offset
+        return offset
+
+    def _segment(self, index: int) -> bytes:
+        data = self._cache.get(index)
+        if data is not None:
+            self._cache.move_to_end(index)
+            return data
+        data = self._cache[index] = self._segments.segment(index)
+        if len(self._cache) > self._cache_segments:
+            self._cache.popitem(last=False)
+        return data
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast('B')
+        size = self._segments.segment_size
+        done = 0
+        while done < len(view) and self._position < self.size:
+            index, skip = divmod(self._position, size)
+            data = self._segment(index)[skip:skip + len(view) - done]
+            view[done:done + len(data)] = data
+            done += len(data)
+            self._position += len(data)
+        return done
+
+    def readall(self) -> bytes:
+        return self.read(max(0, self.size - self._position))
+
+    def close(self) -> None:
+        if not self.closed:
+            self._cache.clear()
+            if self._owned:
+                self._file.close()
+        super().close()
+
+
+class EncryptedWriter(io.RawIOBase):
+    """
+    Raw writer encrypting everything written into a file. close() flushes
+    the cipher; abort() discards the file instead.
+    """
+
+    def __init__(self, path: str, transform: StreamTransform, exclusive: bool = False):
+        self._path = path
+        self._file = open(path, 'xb' if exclusive else 'wb')
+        self._transform = transform
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._file.write(self._transform.update(bytes(data)))
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            try:
+                self._file.write(self._transform.finalize())
+            except BaseException:
+                self.abort()
+                raise
+            finally:
+                self._file.close()
+        super().close()
+
+    def abort(self) -> None:
+        """Closes and removes the partially written file."""
+        if not self.closed:
+            self._file.close()
+            os.remove(self._path)
+            super().close()
+
+
+class _AbortOnError:
+    """Context manager behaviour: leave no partial file when the block raises."""
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            raw = self.buffer.raw if isinstance(self, io.TextIOWrapper) else self.raw
+            raw.abort()
+        return super().__exit__(exc_type, exc, tb)
+
+
+class _BufferedEncryptedWriter(_AbortOnError, io.BufferedWriter):
+    pass
+
+
+class _TextEncryptedWriter(_AbortOnError, io.TextIOWrapper):
+    pass
+
+
+def open_encrypted(path: str, mode: str = "rb", logic: str = "aes", password: str = "",
+                   encoding: str = "utf-8", chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Opens an encrypted file like open(): reading ('r', 'rb') yields the
+    decrypted content, writing ('w', 'wb', or 'x'/'xb' to refuse an
+    existing file) encrypts what is written. Data is streamed through the
+    logic's encryptor/decryptor. A writer used as a context manager
+    removes its file if the block raises.
+    """
+    if mode not in ("r", "rb", "w", "wb", "x", "xb"):
+        raise ValueError(f"Unsupported mode '{mode}' (use r, rb, w, wb, x or xb)")
+    instance = get_logic(logic)
+    binary = mode.endswith("b")
+    if mode[0] == "r":
+        reader = io.BufferedReader(EncryptedReader(path, instance.decryptor(password), chunk_size),
+                                   chunk_size)
+        return reader if binary else io.TextIOWrapper(reader, encoding=encoding)
+    raw = EncryptedWriter(path, instance.encryptor(password), exclusive=mode[0] == "x")
+    if binary:
+        return _BufferedEncryptedWriter(raw, chunk_size)
+    return _TextEncryptedWriter(io.BufferedWriter(raw, chunk_size), encoding=encoding)
@@ -0,0 +1,313 @@
+from logics.base import EncryptionLogic, BufferedTransform, StreamTransform
+from logics.container import (
+    MAGIC, AEADS, KDF_PBKDF2_SHA256, PBKDF2_ITERATIONS, DEFAULT_SEGMENT_SIZE, ERROR_MESSAGE,
+    ContainerInfo, Header, SegmentedFile, SegmentEncryptor, SegmentDecryptor, compression_id,
+    update_container, verify_container
+)
+from config import CACHE_DIR
+from abc import abstractmethod
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Optional
+import hashlib
+import hmac
+import json
+import os
+import platform
+import threading
+import time
+import cryptography
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+# Passwords (and salts per password) remembered by a KeyCache.
+KEY_CACHE_SIZE = 256
+
+# Result of the auto logic's AEAD micro-benchmark, per machine.
+AEAD_BENCHMARK_FILE = os.path.join(CACHE_DIR, 'aead-benchmark.json')
+# Seconds spent sealing segments with each AEAD.
+BENCHMARK_SECONDS = 0.05
+
+
+class KeyCache:
+    """
+    Thread-safe LRU of derived keys for long-lived processes (the daemon),
+    so PBKDF2 runs once per password and salt. Passwords are held only as
+    HMAC digests under a per-process random secret. Each password also
+    gets one session salt per scope that encryption reuses; every message
+    still gets a fresh random nonce.
+    """
+
+    def __init__(self, size: int = KEY_CACHE_SIZE):
+        self._size = size
+        self._secret = os.urandom(32)
+        self._keys = OrderedDict()
+        self._salts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _id(self, password: str) -> bytes:
+        return hmac.new(self._secret, password.encode('utf-8'), hashlib.sha256).digest()
+
+    @staticmethod
+    def _remember(entries: OrderedDict, key, value, size: int) -> None:
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > size:
+            entries.popitem(last=False)
+
+    def salt(self, password: str, scope=None) -> bytes:
+        """
+        The session salt for password (created on first use). Callers using
+        the key with different ciphers pass different scopes, so no key is
+        shared between them.
+        """
+        entry = (self._id(password), scope)
+        with self._lock:
+            salt = self._salts.get(entry)
+            if salt is None:
+                salt = os.urandom(16)
+            self._remember(self._salts, entry, salt, self._size)
+            return salt
+
+    def key(self, password: str, salt: bytes, derive) -> bytes:
+        """The key for (password, salt), calling derive(password, salt) on a miss."""
+        entry = (self._id(password), bytes(salt))
+        with self._lock:
+            key = self._keys.get(entry)
+            if key is not None:
+                self._keys.move_to_end(entry)
+                return key
+        # Derive outside the lock; a concurrent miss derives the same key
+        key = derive(password, salt)
+        with self._lock:
+            self._remember(self._keys, entry, key, self._size)
+        return key
+
+
+class AeadLogic(EncryptionLogic):
+    """
+    Password-based encryption with one of the AEADs of logics/container.py.
+    Streams and files use the segmented container, whose header records
+    the AEAD, so any AEAD logic decrypts, verifies and updates any
+    container; only the compact message format of batch_encryptor (salt +
+    nonce + ciphertext) is specific to the subclass's aead.
+    """
+    # Optional KeyCache shared by this instance; None derives every time
+    key_cache = None
+    # Codec compressing each segment before encryption ('zlib', 'lzma',
+    # 'zstd'), or None; see logics/container.py
+    compression = None
+    segment_size = DEFAULT_SEGMENT_SIZE
+
+    @property
+    @abstractmethod
+    def aead(self) -> int:
+        """AEAD id (see container.AEADS) used for new files and messages."""
+        pass
+
+    def _derive_key(self, password: str, salt: bytes, iterations: int = PBKDF2_ITERATIONS) -> bytes:
+        """Derives a 256-bit key from the password using PBKDF2."""
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=iterations,
+        )
+        return kdf.derive(password.encode('utf-8'))
+
+    def _key(self, password: str, salt: bytes, iterations: int = PBKDF2_ITERATIONS) -> bytes:
+        # The cache only holds keys derived with the default iteration count
+        if self.key_cache is None or iterations != PBKDF2_ITERATIONS:
+            return self._derive_key(password, salt, iterations)
+        return self.key_cache.key(password, salt, self._derive_key)
+
+    def _header_key(self, password: str):
+        return lambda header: self._key(password, header.salt, header.iterations)
+
+    def _salt(self, password: str, aead: int) -> bytes:
+        # A random salt, or the cached session salt of this AEAD
+        return self.key_cache.salt(password, aead) if self.key_cache is not None else os.urandom(16)
+
+    def encryptor(self, password: str) -> StreamTransform:
+        aead = self.aead
+        header = Header(aead, compression_id(self.compression), KDF_PBKDF2_SHA256,
+                        PBKDF2_ITERATIONS, self._salt(password, aead), self.segment_size)
+        return SegmentEncryptor(header, self._key(password, header.salt, header.iterations))
+
+    def decryptor(self, password: str) -> StreamTransform:
+        # Files from before the container are one message of the batch format
+        legacy = BufferedTransform(lambda data, pw: self._decrypt_message(data, pw), password)
+        return SegmentDecryptor(self._header_key(password), legacy)
+
+    def verify_stream(self, src: BinaryIO, password: str,
+                      workers: Optional[int] = None) -> Optional[ContainerInfo]:
+        """
+        Authenticates everything in src without writing plaintext; raises
+        ValueError if any segment fails. Returns the container's info, or
+        None for a file in the single-message format (checked whole).
+        """
+        head = src.read(len(MAGIC))
+        if head != MAGIC:
+            self._decrypt_message(head + src.read(), password)
+            return None
+        src.seek(0)
+        return verify_container(src, self._header_key(password), workers)
+
+    def random_access(self, src: BinaryIO, password: str) -> SegmentedFile:
+        """Segment-level random access to a container in the seekable file src."""
+        return SegmentedFile(src, self._header_key(password))
+
+    def update_stream(self, src: BinaryIO, dst: BinaryIO, password: str,
+                      index: Optional[bytes] = None) -> bytes:
+        """
+        Updates dst (opened 'r+b'; empty to start a new file) in place to
+        the encryption of src, rewriting only changed segments (see
+        container.update_container). Returns the index to pass next time.
+        """
+        if self.compression is not None:
+            raise ValueError("In-place updates need an uncompressed file")
+        if dst.seek(0, os.SEEK_END) == 0:
+            dst.write(self.encrypt(b"", password))
+        dst.seek(0)
+        return update_container(src, dst, self._header_key(password), index)
+
+    def batch_encryptor(self, password: str):
+        # Independent messages keep the compact format (no header, no
+        # compression): salt + nonce + ciphertext
+        aead = AEADS[self.aead]
+        salt = self._salt(password, self.aead)
+        # Derive key once for every message of the batch
+        cipher = aead.factory(self._key(password, salt))
+
+        def encrypt(data: bytes) -> bytes:
+            # A random nonce per message; the salt lets decryption derive the key
+            nonce = os.urandom(aead.nonce_size)
+            return salt + nonce + cipher.encrypt(nonce, data, None)
+
+        return encrypt
+
+    def batch_decryptor(self, password: str):
+        aead = AEADS[self.aead]
+        # One cipher per distinct salt; a batch from batch_encryptor shares one
+        ciphers = {}
+
+        def decrypt(data: bytes) -> bytes:
+            if data[:len(MAGIC)] == MAGIC:
+                return self.decrypt(data, password)
+            try:
+                if len(data) < 16 + aead.nonce_size:
+                    raise ValueError("Invalid encrypted data format")
+
+                salt = bytes(data[:16])
+                nonce = data[16:16 + aead.nonce_size]
+                ciphertext = data[16 + aead.nonce_size:]
+
+                cipher = ciphers.get(salt)
+                if cipher is None:
+                    cipher = ciphers[salt] = aead.factory(self._key(password, salt))
+                return cipher.decrypt(nonce, ciphertext, None)
+            except Exception as e:
+                raise ValueError(ERROR_MESSAGE) from e
+
+        return decrypt
+
+    def _decrypt_message(self, data: bytes, password: str) -> bytes:
+        return self.batch_decryptor(password)(data)
+
+    def encrypt(self, data: bytes, password: str) -> bytes:
+        encryptor = self.encryptor(password)
+        return encryptor.update(data) + encryptor.finalize()
+
+    def decrypt(self, data: bytes, password: str) -> bytes:
+        if data[:len(MAGIC)] != MAGIC:
+            return self._decrypt_message(data, password)
+        decryptor = self.decryptor(password)
+        return decryptor.update(data) + decryptor.finalize()
+
+
+def benchmark_aeads(seconds: float = BENCHMARK_SECONDS,
+                    size: int = DEFAULT_SEGMENT_SIZE) -> Dict[int, float]:
+    """Throughput in MB/s of sealing size-byte segments with each AEAD."""
+    data, key = bytes(size), os.urandom(32)
+    results = {}
+    for aead_id, aead in AEADS.items():
+        cipher, nonce = aead.factory(key), bytes(aead.nonce_size)
+        cipher.encrypt(nonce, data, None)
+        count, start = 0, time.perf_counter()
+        while True:
+            cipher.encrypt(nonce, data, None)
+            count += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= seconds:
+                break
+        results[aead_id] = count * size / elapsed / 1e6
+    return results
+
+
+def _machine_id() -> str:
+    # Results are kept per host, CPU and library build: a shared checkout
+    # may be used from machines with and without AES instructions
+    return f"{platform.node()} {platform.machine()} cryptography-{cryptography.__version__}"
+
+
+_fastest: Dict[str, int] = {}
+_fastest_lock = threading.Lock()
+
+
+def fastest_aead(path: str = AEAD_BENCHMARK_FILE) -> int:
+    """
+    Id of the fastest AEAD on this machine. The benchmark runs once per
+    machine; its results are kept in path and, after the first call, in
+    memory for the rest of the process.
+    """
+    with _fastest_lock:
+        if path in _fastest:
+            return _fastest[path]
+        machine = _machine_id()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                machines = json.load(f)
+            results = {int(aead_id): speed for aead_id, speed in machines[machine].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            machines, results = None, {}
+        if set(results) != set(AEADS):
+            results = benchmark_aeads()
+            if not isinstance(machines, dict):
+                machines = {}
+            machines[machine] = {str(aead_id): round(speed, 1) for aead_id, speed in results.items()}
+            # Atomic, like the other cache files
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(machines, f, indent=2)
+            os.replace(tmp_path, path)
+        _fastest[path] = max(results, key=results.get)
+        return _fastest[path]
+
+
+class AutoLogic(AeadLogic):
+    """
+    The fastest AEAD of the machine it runs on (see fastest_aead), recorded
+    in each file's header. Messages from batch_encryptor are containers
+    too, as the compact format does not say which AEAD made them.
+    """
+
+    @property
+    def name(self) -> str:
+        return "auto"
+
+    @property
+    def description(self) -> str:
+        return "Fastest AEAD on this machine (AES-256-GCM or XChaCha20-Poly1305)"
+
+    @property
+    def aead(self) -> int:
+        return fastest_aead()
+
+    def batch_encryptor(self, password: str):
+        return lambda data: self.encrypt(data, password)
+
+    def batch_decryptor(self, password: str):
+        return lambda data: self.decrypt(data, password)
+
+    def _decrypt_message(self, data: bytes, password: str) -> bytes:
+        raise ValueError(ERROR_MESSAGE)
@@ -1,4 +1,4 @@
-from logics.base import EncryptionLogic
+from logics.tokens import TokenCodec, TokenCodecLogic
 
 MORSE_CODE = {
     'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..', 'E': '.', 'F': '..-.',
@@ -16,7 +16,10 @@ MORSE_CODE = {
 MORSE_DECODE = {v: k for k, v in MORSE_CODE.items()}
 
 
-class MorseCodeLogic(EncryptionLogic):
+class MorseCodeLogic(TokenCodecLogic):
+    # Unknown characters and tokens pass through unchanged
+    CODEC = TokenCodec(MORSE_CODE, encode_unknown=str, decode_unknown=bytes)
+
     @property
     def name(self) -> str:
         return "morse"
@@ -25,16 +28,6 @@ class MorseCodeLogic(EncryptionLogic):
     def description(self) -> str:
         return "Morse code encoding"
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace').upper()
-        encoded = ' '.join(MORSE_CODE.get(c, c) for c in text)
-        return encoded.encode('utf-8')
-
-    def decrypt(self, data: bytes, password: str) -> bytes:
-        morse = data.decode('utf-8', errors='replace')
-        decoded = ''.join(MORSE_DECODE.get(c, c) for c in morse.split(' '))
-        return decoded.encode('utf-8')
-
 
 NATO_ALPHABET = {
     'A': 'Alpha', 'B': 'Bravo', 'C': 'Charlie', 'D': 'Delta', 'E': 'Echo',
@@ -49,7 +42,16 @@ NATO_ALPHABET = {
 NATO_DECODE = {v.upper(): k for k, v in NATO_ALPHABET.items()}
 
 
-class SpellingAlphabetLogic(EncryptionLogic):
+def _keep_single_char(token: bytes) -> bytes:
+    """Unknown NATO tokens are kept if they are a single character, else skipped."""
+    return token if len(token.decode('utf-8', errors='replace')) == 1 else b''
+
+
+class SpellingAlphabetLogic(TokenCodecLogic):
+    # Decoding splits on any whitespace and ignores the case of code words
+    CODEC = TokenCodec(NATO_ALPHABET, encode_unknown=str, delimiter=None,
+                       fold_tokens=True, decode_unknown=_keep_single_char)
+
     @property
     def name(self) -> str:
         return "nato"
@@ -57,24 +59,3 @@ class SpellingAlphabetLogic(EncryptionLogic):
     @property
     def description(self) -> str:
         return "NATO phonetic alphabet"
-
-    def encrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace').upper()
-        encoded = ' '.join(NATO_ALPHABET.get(c, c) for c in text)
-        return encoded.encode('utf-8')
-
-    def decrypt(self, data: bytes, password: str) -> bytes:
-        # Split by spaces but handle multiple spaces
-        parts = data.decode('utf-8', errors='replace').split()
-        result = []
-        for p in parts:
-            val = NATO_DECODE.get(p.upper())
-            if val:
-                result.append(val)
-            else:
-                # If not in dictionary, keep original if single char or skip
-                if len(p) == 1:
-                    result.append(p)
-                elif p == '/':
-                    result.append(' ')
-        return ''.join(result).encode('utf-8')
@@ -1,4 +1,64 @@
 from abc import ABC, abstractmethod
+from typing import BinaryIO, Callable
+
+# Default read size used when streaming files through a logic.
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class StreamTransform:
+    """
+    Incremental transformation of a byte stream.
+
+    Chunks are fed to update() in order and finalize() is called once at
+    the end. The concatenation of everything returned equals the one-shot
+    result of encrypt/decrypt on the whole input, however it was chunked.
+    """
+    # True if update() also takes a memoryview of a buffer that is reused
+    # once it returns (it keeps no reference to the chunk); see
+    # utils/pipeline.py. Otherwise chunks are always bytes.
+    accepts_views = False
+
+    def update(self, chunk: bytes) -> bytes:
+        """Consumes the next chunk and returns any output it completes."""
+        raise NotImplementedError
+
+    def finalize(self) -> bytes:
+        """Flushes any buffered state and returns the remaining output."""
+        return b""
+
+
+class BufferedTransform(StreamTransform):
+    """
+    Fallback transform for logics without a streaming implementation:
+    collects the whole input and applies the one-shot function at the end.
+    """
+    accepts_views = True
+
+    def __init__(self, func: Callable[[bytes, str], bytes], password: str):
+        self._func = func
+        self._password = password
+        self._chunks = []
+
+    def update(self, chunk: bytes) -> bytes:
+        self._chunks.append(bytes(chunk))
+        return b""
+
+    def finalize(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return self._func(data, self._password)
+
+
+def pump(transform: StreamTransform, src: BinaryIO, dst: BinaryIO,
+         chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Feeds src through transform in chunks, writing the output to dst."""
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            break
+        dst.write(transform.update(chunk))
+    dst.write(transform.finalize())
+
 
 class EncryptionLogic(ABC):
     """
@@ -46,3 +106,38 @@ class EncryptionLogic(ABC):
             bytes: The decrypted data.
         """
         pass
+
+    def encryptor(self, password: str) -> StreamTransform:
+        """
+        Returns a StreamTransform that encrypts incrementally.
+        Logics that can process data in chunks override this; the default
+        buffers the whole input and calls encrypt() once.
+        """
+        return BufferedTransform(self.encrypt, password)
+
+    def decryptor(self, password: str) -> StreamTransform:
+        """Returns a StreamTransform that decrypts incrementally (see encryptor)."""
+        return BufferedTransform(self.decrypt, password)
+
+    def batch_encryptor(self, password: str) -> Callable[[bytes], bytes]:
+        """
+        Returns a function that encrypts independent messages with one
+        password. Logics with expensive key setup (e.g. AES) override this
+        to do that setup once for the whole batch; the function must be
+        safe to call from several threads.
+        """
+        return lambda data: self.encrypt(data, password)
+
+    def batch_decryptor(self, password: str) -> Callable[[bytes], bytes]:
+        """Returns a function that decrypts independent messages (see batch_encryptor)."""
+        return lambda data: self.decrypt(data, password)
+
+    def encrypt_stream(self, src: BinaryIO, dst: BinaryIO, password: str,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """Encrypts everything readable from src into dst (binary file objects)."""
+        pump(self.encryptor(password), src, dst, chunk_size)
+
+    def decrypt_stream(self, src: BinaryIO, dst: BinaryIO, password: str,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """Decrypts everything readable from src into dst (binary file objects)."""
+        pump(self.decryptor(password), src, dst, chunk_size)
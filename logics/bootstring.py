@@ -0,0 +1,246 @@
+import codecs
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+from logics.base import StreamTransform
+
+# RFC 3492 parameters for Punycode.
+BASE, TMIN, TMAX, SKEW, DAMP = 36, 1, 26, 38, 700
+INITIAL_BIAS, INITIAL_N = 72, 128
+DIGITS = b"abcdefghijklmnopqrstuvwxyz0123456789"
+
+# Longest run of characters encoded as one Bootstring string. Lines are
+# segments of their own; longer lines are cut at a label boundary ('.' or
+# whitespace) and the encoded pieces end with CONTINUATION. An encoded
+# segment ends in '-' or a digit, so the marker is unambiguous.
+SEGMENT_CHARS = 256
+CONTINUATION = b"+"
+# First line of output with more than one segment. Earlier versions
+# encoded the whole input as one string, with its newlines in the basic
+# part; a segment is never a lone '-', so the marker tells the formats
+# apart before anything is decoded. Single-segment output has no marker
+# and is the plain codec output in both.
+SEGMENTED_MARKER = b"-\n"
+# Segments per chunk before encoding is spread over worker processes.
+MIN_PARALLEL_SEGMENTS = 1024
+
+_LABEL_BOUNDARY = re.compile(r"[.\s][^.\s]*\Z")
+
+
+def _adapt(delta: int, points: int, first: bool) -> int:
+    delta = delta // DAMP if first else delta // 2
+    delta += delta // points
+    k = 0
+    while delta > ((BASE - TMIN) * TMAX) // 2:
+        delta //= BASE - TMIN
+        k += BASE
+    return k + (BASE - TMIN + 1) * delta // (delta + SKEW)
+
+
+def encode(text: str) -> bytes:
+    """
+    Bootstring/Punycode encoding of text, identical to the 'punycode'
+    codec. The codec rescans the whole string for every distinct code
+    point; here the characters below the current code point are counted
+    with a Fenwick tree over positions, so encoding is O(n log n).
+    """
+    basic = text.encode('ascii', 'ignore')
+    if len(basic) == len(text):
+        return basic + b"-" if basic else b""
+    out = bytearray(basic)
+    if basic:
+        out.append(0x2D)
+    size = len(text)
+    # tree counts, per position, the characters already below n
+    tree = [0] * (size + 1)
+    extended = []
+    for pos, c in enumerate(text):
+        cp = ord(c)
+        if cp < INITIAL_N:
+            tree[pos + 1] = 1
+        else:
+            extended.append((cp, pos))
+    for i in range(1, size + 1):
+        j = i + (i & -i)
+        if j <= size:
+            tree[j] += tree[i]
+    extended.sort()
+
+    n, bias, delta, h = INITIAL_N, INITIAL_BIAS, 0, len(basic)
+    i, count = 0, len(extended)
+    while i < count:
+        m = extended[i][0]
+        delta += (m - n) * (h + 1)
+        start, below, prev = i, h, 0
+        # One RFC scan for code point m: each occurrence's delta counts the
+        # smaller characters since the previous occurrence
+        while i < count and extended[i][0] == m:
+            p, k = 0, extended[i][1]
+            while k:
+                p += tree[k]
+                k &= k - 1
+            delta += p - prev
+            prev = p
+            q, k = delta, BASE
+            while True:
+                t = TMIN if k <= bias else TMAX if k >= bias + TMAX else k - bias
+                if q < t:
+                    break
+                out.append(DIGITS[t + (q - t) % (BASE - t)])
+                q = (q - t) // (BASE - t)
+                k += BASE
+            out.append(DIGITS[q])
+            bias = _adapt(delta, h + 1, h == len(basic))
+            delta = 0
+            h += 1
+            i += 1
+        delta += below - prev + 1
+        n = m + 1
+        for j in range(start, i):
+            k = extended[j][1] + 1
+            while k <= size:
+                tree[k] += 1
+                k += k & -k
+    return bytes(out)
+
+
+def _split_line(line: str) -> List[str]:
+    """Cuts a line into pieces of at most SEGMENT_CHARS, after a label boundary where possible."""
+    pieces = []
+    while len(line) > SEGMENT_CHARS:
+        match = _LABEL_BOUNDARY.search(line, 0, SEGMENT_CHARS)
+        cut = match.start() + 1 if match else SEGMENT_CHARS
+        pieces.append(line[:cut])
+        line = line[cut:]
+    pieces.append(line)
+    return pieces
+
+
+def _encode_segments(segments: List[str]) -> List[bytes]:
+    return [encode(segment) for segment in segments]
+
+
+class SegmentedEncoder(StreamTransform):
+    """
+    Encodes UTF-8 input line by line (see SEGMENT_CHARS), so the work per
+    segment is bounded and total time linear in the input. Chunks with
+    many segments are encoded in worker processes.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._carry = ""
+        self._marked = False
+        self._workers = os.cpu_count() or 1
+        self._pool = None
+
+    def _encode_all(self, segments: List[str]) -> List[bytes]:
+        # Daemonic processes (e.g. multiprocessing.Pool workers) cannot fork
+        if (len(segments) < MIN_PARALLEL_SEGMENTS or self._workers < 2
+                or multiprocessing.current_process().daemon):
+            return _encode_segments(segments)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self._workers)
+        size = -(-len(segments) // self._workers)
+        parts = self._pool.map(_encode_segments, [segments[i:i + size]
+                                                  for i in range(0, len(segments), size)])
+        return [encoded for part in parts for encoded in part]
+
+    def _encode(self, text: str, final: bool) -> bytes:
+        lines = text.split("\n")
+        self._carry = "" if final else lines.pop()
+        segments, ends = [], []
+        for index, line in enumerate(lines):
+            pieces = _split_line(line)
+            segments += pieces
+            ends += [CONTINUATION + b"\n"] * (len(pieces) - 1)
+            ends.append(b"" if final and index == len(lines) - 1 else b"\n")
+        # A long unfinished line: its leading pieces are already fixed
+        if len(self._carry) > SEGMENT_CHARS:
+            pieces = _split_line(self._carry)
+            self._carry = pieces.pop()
+            segments += pieces
+            ends += [CONTINUATION + b"\n"] * len(pieces)
+        encoded = self._encode_all(segments)
+        out = b"".join(part for pair in zip(encoded, ends) for part in pair)
+        if not self._marked and any(ends):
+            self._marked = True
+            out = SEGMENTED_MARKER + out
+        return out
+
+    def update(self, chunk: bytes) -> bytes:
+        try:
+            text = self._decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            self.close()
+            raise ValueError(f"Punycode input must be UTF-8 text: {e}") from e
+        return self._encode(self._carry + text, final=False)
+
+    def finalize(self) -> bytes:
+        try:
+            text = self._carry + self._decoder.decode(b"", final=True)
+            return self._encode(text, final=True)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Punycode input must be UTF-8 text: {e}") from e
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class SegmentedDecoder(StreamTransform):
+    """
+    Decodes the output of SegmentedEncoder line by line. Input without
+    SEGMENTED_MARKER is a single Punycode string (from one segment, or
+    from earlier versions) and is decoded whole.
+    """
+
+    def __init__(self):
+        self._carry = b""
+        self._line = 0
+        # None until the first line shows the format
+        self._segmented = None
+
+    def _decode(self, segment: bytes) -> bytes:
+        self._line += 1
+        try:
+            return codecs.decode(segment, 'punycode').encode('utf-8')
+        except (ValueError, IndexError, OverflowError) as e:
+            raise ValueError(f"Invalid Punycode on line {self._line}: {e}") from e
+
+    def update(self, chunk: bytes) -> bytes:
+        if self._segmented is False:
+            self._carry += chunk
+            return b""
+        data = self._carry + chunk
+        if self._segmented is None:
+            if len(data) < len(SEGMENTED_MARKER) and SEGMENTED_MARKER.startswith(data):
+                self._carry = data
+                return b""
+            self._segmented = data.startswith(SEGMENTED_MARKER)
+            if self._segmented:
+                data = data[len(SEGMENTED_MARKER):]
+        if not self._segmented:
+            self._carry = bytearray(data)
+            return b""
+        lines = data.split(b"\n")
+        self._carry = lines.pop()
+        out = []
+        for line in lines:
+            if line.endswith(CONTINUATION):
+                out.append(self._decode(line[:-1]))
+            else:
+                out.append(self._decode(line))
+                out.append(b"\n")
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        carry, self._carry = bytes(self._carry), b""
+        if self._segmented and carry.endswith(CONTINUATION):
+            carry = carry[:-1]
+        return self._decode(carry)
@@ -0,0 +1,16 @@
+from logics.aead import AeadLogic
+from logics.container import AEAD_XCHACHA20_POLY1305
+
+
+class ChaCha20Logic(AeadLogic):
+    # Extended 24-byte nonces (XChaCha20) in containers and messages alike,
+    # so random nonces never need counting
+    aead = AEAD_XCHACHA20_POLY1305
+
+    @property
+    def name(self) -> str:
+        return "chacha20"
+
+    @property
+    def description(self) -> str:
+        return "XChaCha20-Poly1305 (fast without AES hardware)"
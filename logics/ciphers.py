@@ -1,6 +1,57 @@
-from logics.base import EncryptionLogic
+from logics.base import EncryptionLogic, StreamTransform
+from logics.tokens import TokenCodec, TokenCodecLogic
+from functools import lru_cache
+from itertools import accumulate
+import re
 import string
 
+# Number of Enigma rotor positions (AAA..ZZZ).
+ENIGMA_POSITIONS = 26 ** 3
+
+UPPERCASE = string.ascii_uppercase.encode('ascii')
+LOWERCASE = string.ascii_lowercase.encode('ascii')
+# Every byte that is not an ASCII letter; the ciphers pass these through.
+NON_LETTERS = bytes(b for b in range(256) if b not in UPPERCASE + LOWERCASE)
+_NON_LETTER_RUNS = re.compile(rb'([^A-Za-z]+)')
+
+
+@lru_cache(maxsize=None)
+def _affine_table(a: int, b: int) -> bytes:
+    """
+    Translation table mapping each ASCII letter x (0-25, case kept) to
+    (a * x + b) % 26. All other bytes map to themselves.
+    """
+    table = bytearray(range(256))
+    for x in range(26):
+        y = (a * x + b) % 26
+        table[UPPERCASE[x]] = UPPERCASE[y]
+        table[LOWERCASE[x]] = LOWERCASE[y]
+    return bytes(table)
+
+
+class _TranslateTransform(StreamTransform):
+    """Streams a byte-for-byte cipher: each chunk is one bytes.translate."""
+
+    def __init__(self, table: bytes):
+        self._table = table
+
+    def update(self, chunk: bytes) -> bytes:
+        return bytes(chunk).translate(self._table)
+
+
+def _map_letters(data: bytes, func) -> bytes:
+    """
+    Applies func to the ASCII letters of data as one run (func must keep
+    the length) and puts the result back between the untouched non-letters.
+    """
+    runs = _NON_LETTER_RUNS.split(bytes(data))
+    words = runs[0::2]
+    letters = func(b''.join(words))
+    ends = list(accumulate(map(len, words)))
+    runs[0::2] = map(letters.__getitem__, map(slice, [0] + ends[:-1], ends))
+    return b''.join(runs)
+
+
 class CaesarCipherLogic(EncryptionLogic):
     @property
     def name(self) -> str:
@@ -10,23 +61,21 @@ class CaesarCipherLogic(EncryptionLogic):
     def description(self) -> str:
         return "Caesar cipher (shift from password length)"
 
-    def _shift(self, text: str, shift: int) -> str:
-        result = []
-        for c in text:
-            if c.isalpha():
-                base = ord('A') if c.isupper() else ord('a')
-                result.append(chr((ord(c) - base + shift) % 26 + base))
-            else:
-                result.append(c)
-        return ''.join(result)
+    def _table(self, password: str, decrypt: bool = False) -> bytes:
+        shift = len(password) % 26
+        return _affine_table(1, -shift % 26 if decrypt else shift)
 
     def encrypt(self, data: bytes, password: str) -> bytes:
-        shift = len(password) % 26
-        return self._shift(data.decode('utf-8', errors='replace'), shift).encode('utf-8')
+        return bytes(data).translate(self._table(password))
 
     def decrypt(self, data: bytes, password: str) -> bytes:
-        shift = len(password) % 26
-        return self._shift(data.decode('utf-8', errors='replace'), -shift).encode('utf-8')
+        return bytes(data).translate(self._table(password, decrypt=True))
+
+    def encryptor(self, password: str) -> StreamTransform:
+        return _TranslateTransform(self._table(password))
+
+    def decryptor(self, password: str) -> StreamTransform:
+        return _TranslateTransform(self._table(password, decrypt=True))
 
 
 class ROT13Logic(EncryptionLogic):
@@ -38,18 +87,23 @@ class ROT13Logic(EncryptionLogic):
     def description(self) -> str:
         return "ROT13 cipher (ignores password)"
 
-    def _rot13(self, text: str) -> str:
-        return text.translate(str.maketrans(
-            'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz',
-            'NOPQRSTUVWXYZABCDEFGHIJKLMnopqrstuvwxyzabcdefghijklm'
-        ))
-
     def encrypt(self, data: bytes, password: str) -> bytes:
-        return self._rot13(data.decode('utf-8', errors='replace')).encode('utf-8')
+        return bytes(data).translate(_affine_table(1, 13))
 
     def decrypt(self, data: bytes, password: str) -> bytes:
         return self.encrypt(data, password)  # ROT13 is symmetric
 
+    def encryptor(self, password: str) -> StreamTransform:
+        return _TranslateTransform(_affine_table(1, 13))
+
+    def decryptor(self, password: str) -> StreamTransform:
+        return self.encryptor(password)
+
+
+# A1Z26 tokens: letters become their alphabet position, other bytes stay
+A1Z26_TOKENS = tuple(b'%d' % (b - 64) if 65 <= b <= 90 else bytes([b]) for b in range(256))
+A1Z26_LETTERS = {b'%d' % (i + 1): UPPERCASE[i:i + 1] for i in range(26)}
+
 
 class A1Z26Logic(EncryptionLogic):
     @property
@@ -61,24 +115,41 @@ class A1Z26Logic(EncryptionLogic):
         return "A=1, B=2, ..., Z=26 encoding"
 
     def encrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace').upper()
-        result = []
-        for c in text:
-            if c.isalpha():
-                result.append(str(ord(c) - ord('A') + 1))
-            else:
-                result.append(c)
-        return '-'.join(result).encode('utf-8')
+        return b'-'.join(map(A1Z26_TOKENS.__getitem__, bytes(data).upper()))
 
     def decrypt(self, data: bytes, password: str) -> bytes:
-        parts = data.decode('utf-8', errors='replace').split('-')
-        result = []
-        for p in parts:
-            if p.isdigit() and 1 <= int(p) <= 26:
-                result.append(chr(int(p) + ord('A') - 1))
-            else:
-                result.append(p)
-        return ''.join(result).encode('utf-8')
+        parts = bytes(data).split(b'-')
+        result = [A1Z26_LETTERS.get(p, p) for p in parts]
+        for i, p in enumerate(parts):
+            # Non-canonical numbers such as '01'
+            if p.isdigit() and p not in A1Z26_LETTERS and 1 <= int(p) <= 26:
+                result[i] = UPPERCASE[int(p) - 1:int(p)]
+        return b''.join(result)
+
+
+class _VigenereTransform(StreamTransform):
+    """
+    Vigenère over a stream. Only letters advance the key, so the key
+    position carries over from one chunk to the next.
+    """
+
+    def __init__(self, tables):
+        self._tables = tables
+        self._offset = 0
+
+    def _apply(self, letters: bytes) -> bytes:
+        # Letter i uses key position (offset + i) % period: one translate
+        # per key position over the matching strided slice.
+        period = len(self._tables)
+        out = bytearray(letters)
+        for i in range(min(period, len(letters))):
+            table = self._tables[(self._offset + i) % period]
+            out[i::period] = letters[i::period].translate(table)
+        self._offset = (self._offset + len(letters)) % period
+        return out
+
+    def update(self, chunk: bytes) -> bytes:
+        return _map_letters(chunk, self._apply)
 
 
 class VigenereCipherLogic(EncryptionLogic):
@@ -90,39 +161,23 @@ class VigenereCipherLogic(EncryptionLogic):
     def description(self) -> str:
         return "Vigenère cipher (uses password as key)"
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
+    def _transform(self, password: str, sign: int) -> _VigenereTransform:
         if not password:
             raise ValueError("Password cannot be empty for Vigenère cipher.")
-        text = data.decode('utf-8', errors='replace')
-        key = password.upper()
-        result = []
-        key_idx = 0
-        for c in text:
-            if c.isalpha():
-                base = ord('A') if c.isupper() else ord('a')
-                shift = ord(key[key_idx % len(key)]) - ord('A')
-                result.append(chr((ord(c) - base + shift) % 26 + base))
-                key_idx += 1
-            else:
-                result.append(c)
-        return ''.join(result).encode('utf-8')
+        shifts = [ord(c) - ord('A') for c in password.upper()]
+        return _VigenereTransform([_affine_table(1, sign * shift % 26) for shift in shifts])
+
+    def encrypt(self, data: bytes, password: str) -> bytes:
+        return self._transform(password, 1).update(data)
 
     def decrypt(self, data: bytes, password: str) -> bytes:
-        if not password:
-            raise ValueError("Password cannot be empty for Vigenère cipher.")
-        text = data.decode('utf-8', errors='replace')
-        key = password.upper()
-        result = []
-        key_idx = 0
-        for c in text:
-            if c.isalpha():
-                base = ord('A') if c.isupper() else ord('a')
-                shift = ord(key[key_idx % len(key)]) - ord('A')
-                result.append(chr((ord(c) - base - shift) % 26 + base))
-                key_idx += 1
-            else:
-                result.append(c)
-        return ''.join(result).encode('utf-8')
+        return self._transform(password, -1).update(data)
+
+    def encryptor(self, password: str) -> StreamTransform:
+        return self._transform(password, 1)
+
+    def decryptor(self, password: str) -> StreamTransform:
+        return self._transform(password, -1)
 
 
 class AffineCipherLogic(EncryptionLogic):
@@ -140,32 +195,25 @@ class AffineCipherLogic(EncryptionLogic):
                 return x
         return 1
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
+    def _table(self, password: str, decrypt: bool = False) -> bytes:
         a, b = 5, len(password) % 26
-        text = data.decode('utf-8', errors='replace')
-        result = []
-        for c in text:
-            if c.isalpha():
-                base = ord('A') if c.isupper() else ord('a')
-                x = ord(c) - base
-                result.append(chr((a * x + b) % 26 + base))
-            else:
-                result.append(c)
-        return ''.join(result).encode('utf-8')
+        if decrypt:
+            # x = a^-1 * (y - b)
+            a_inv = self._mod_inverse(a, 26)
+            return _affine_table(a_inv, -a_inv * b % 26)
+        return _affine_table(a, b)
+
+    def encrypt(self, data: bytes, password: str) -> bytes:
+        return bytes(data).translate(self._table(password))
 
     def decrypt(self, data: bytes, password: str) -> bytes:
-        a, b = 5, len(password) % 26
-        a_inv = self._mod_inverse(a, 26)
-        text = data.decode('utf-8', errors='replace')
-        result = []
-        for c in text:
-            if c.isalpha():
-                base = ord('A') if c.isupper() else ord('a')
-                y = ord(c) - base
-                result.append(chr((a_inv * (y - b)) % 26 + base))
-            else:
-                result.append(c)
-        return ''.join(result).encode('utf-8')
+        return bytes(data).translate(self._table(password, decrypt=True))
+
+    def encryptor(self, password: str) -> StreamTransform:
+        return _TranslateTransform(self._table(password))
+
+    def decryptor(self, password: str) -> StreamTransform:
+        return _TranslateTransform(self._table(password, decrypt=True))
 
 
 class RailFenceCipherLogic(EncryptionLogic):
@@ -177,44 +225,42 @@ class RailFenceCipherLogic(EncryptionLogic):
     def description(self) -> str:
         return "Rail fence cipher (rails = password length)"
 
+    def _rails(self, password: str) -> int:
+        return max(2, len(password) % 10 + 2)
+
     def encrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace')
-        rails = max(2, len(password) % 10 + 2)
-        fence = [[] for _ in range(rails)]
-        rail, direction = 0, 1
-        for c in text:
-            fence[rail].append(c)
-            rail += direction
-            if rail == 0 or rail == rails - 1:
-                direction = -direction
-        return ''.join(''.join(r) for r in fence).encode('utf-8')
+        # The zigzag visits rail r at positions r and cycle - r of every
+        # cycle, so each rail is one or two interleaved strided slices.
+        data = bytes(data)
+        rails = self._rails(password)
+        cycle = 2 * (rails - 1)
+        fence = [data[0::cycle]]
+        for r in range(1, rails - 1):
+            down, up = data[r::cycle], data[cycle - r::cycle]
+            rail = bytearray(len(down) + len(up))
+            rail[0::2] = down
+            rail[1::2] = up
+            fence.append(rail)
+        fence.append(data[rails - 1::cycle])
+        return b''.join(fence)
 
     def decrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace')
-        rails = max(2, len(password) % 10 + 2)
-        n = len(text)
-        # Calculate the length of each rail
-        pattern = list(range(rails)) + list(range(rails - 2, 0, -1))
-        lengths = [0] * rails
-        for i in range(n):
-            lengths[pattern[i % len(pattern)]] += 1
-        # Split ciphertext into rails
-        fence = []
-        idx = 0
-        for length in lengths:
-            fence.append(list(text[idx:idx + length]))
-            idx += length
-        # Read off the rails
-        result = []
-        indices = [0] * rails
-        rail, direction = 0, 1
-        for _ in range(n):
-            result.append(fence[rail][indices[rail]])
-            indices[rail] += 1
-            rail += direction
-            if rail == 0 or rail == rails - 1:
-                direction = -direction
-        return ''.join(result).encode('utf-8')
+        data = bytes(data)
+        rails = self._rails(password)
+        cycle = 2 * (rails - 1)
+        n = len(data)
+        result = bytearray(n)
+        pos = 0
+        for r in range(rails):
+            # Each rail is the reverse of the slices encrypt() took
+            down = len(range(r, n, cycle))
+            up = len(range(cycle - r, n, cycle)) if 0 < r < rails - 1 else 0
+            rail = data[pos:pos + down + up]
+            pos += down + up
+            result[r::cycle] = rail[0::2] if up else rail
+            if up:
+                result[cycle - r::cycle] = rail[1::2]
+        return bytes(result)
 
 
 class SubstitutionCipherLogic(EncryptionLogic):
@@ -231,7 +277,7 @@ class SubstitutionCipherLogic(EncryptionLogic):
         seen = set()
         key = []
         for c in password.upper():
-            if c.isalpha() and c not in seen:
+            if c in string.ascii_uppercase and c not in seen:
                 key.append(c)
                 seen.add(c)
         for c in string.ascii_uppercase:
@@ -239,22 +285,26 @@ class SubstitutionCipherLogic(EncryptionLogic):
                 key.append(c)
         return ''.join(key)
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace')
+    def _table(self, password: str, decrypt: bool = False) -> bytes:
         key = self._get_alphabet(password)
-        table = str.maketrans(string.ascii_uppercase + string.ascii_lowercase,
-                              key + key.lower())
-        return text.translate(table).encode('utf-8')
+        cipher = (key + key.lower()).encode('ascii')
+        plain = UPPERCASE + LOWERCASE
+        return bytes.maketrans(cipher, plain) if decrypt else bytes.maketrans(plain, cipher)
+
+    def encrypt(self, data: bytes, password: str) -> bytes:
+        return bytes(data).translate(self._table(password))
 
     def decrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace')
-        key = self._get_alphabet(password)
-        table = str.maketrans(key + key.lower(),
-                              string.ascii_uppercase + string.ascii_lowercase)
-        return text.translate(table).encode('utf-8')
+        return bytes(data).translate(self._table(password, decrypt=True))
 
+    def encryptor(self, password: str) -> StreamTransform:
+        return _TranslateTransform(self._table(password))
 
-class BaconCipherLogic(EncryptionLogic):
+    def decryptor(self, password: str) -> StreamTransform:
+        return _TranslateTransform(self._table(password, decrypt=True))
+
+
+class BaconCipherLogic(TokenCodecLogic):
     # 26-letter encoding (distinct I/J, U/V)
     ALPHABET = {
         'A': 'AAAAA', 'B': 'AAAAB', 'C': 'AAABA', 'D': 'AAABB', 'E': 'AABAA',
@@ -265,6 +315,9 @@ class BaconCipherLogic(EncryptionLogic):
         'Z': 'BBAAB'
     }
     REVERSE = {v: k for k, v in ALPHABET.items()}
+    # Non-letters are dropped: here we just output the code. Decoding reads
+    # groups of 5 regardless of spacing.
+    CODEC = TokenCodec(ALPHABET, width=5, decode_unknown=lambda group: b'?')
 
     @property
     def name(self) -> str:
@@ -274,28 +327,6 @@ class BaconCipherLogic(EncryptionLogic):
     def description(self) -> str:
         return "Bacon's cipher (binary replacement with A/B)"
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace').upper()
-        res = []
-        for c in text:
-            if c in self.ALPHABET:
-                res.append(self.ALPHABET[c])
-            else:
-                 # Ignore or keep? Usually Bacon hides msg in text.
-                 # Here we just output the code.
-                 pass
-        return ' '.join(res).encode('utf-8')
-
-    def decrypt(self, data: bytes, password: str) -> bytes:
-        # Expecting groups of 5
-        text = data.decode('utf-8', errors='replace').replace(' ', '')
-        res = []
-        for i in range(0, len(text), 5):
-            chunk = text[i:i+5]
-            if len(chunk) == 5:
-                res.append(self.REVERSE.get(chunk, '?'))
-        return ''.join(res).encode('utf-8')
-
 
 class EnigmaMachineLogic(EncryptionLogic):
     """Enigma M3 cipher simulation with Rotors I, II, III and Reflector B."""
@@ -313,60 +344,104 @@ class EnigmaMachineLogic(EncryptionLogic):
         return "Enigma M3 (Rotors I-II-III, Reflector B). Password=Start Pos (e.g. AAA)"
 
     @staticmethod
-    def _pass_rotor(idx: int, rotor_str: str, offset: int) -> int:
-        """Forward pass through a rotor."""
-        shifted = (idx + offset) % 26
-        mapped = ord(rotor_str[shifted]) - ord('A')
-        return (mapped - offset) % 26
-
-    @staticmethod
-    def _pass_rotor_rev(idx: int, rotor_str: str, offset: int) -> int:
-        """Reverse pass through a rotor."""
-        target = (idx + offset) % 26
-        found_at = rotor_str.index(chr(target + ord('A')))
-        return (found_at - offset) % 26
-
-    def encrypt(self, data: bytes, password: str) -> bytes:
-        # Parse start position from password (default AAA)
+    def _parse_position(password: str) -> int:
+        """Start position (default AAA) as the index r1*676 + r2*26 + r3."""
         start_pos = (password.upper() + "AAA")[:3]
         if not all(c in string.ascii_uppercase for c in start_pos):
             start_pos = "AAA"
-
         r1_pos, r2_pos, r3_pos = [ord(c) - ord('A') for c in start_pos]
-        ciphertext = []
-        text = data.decode('utf-8', errors='replace').upper()
-
-        for c in text:
-            if not c.isalpha():
-                ciphertext.append(c)
-                continue
-
-            # Simplified odometer stepping: R3 always steps, cascade on wrap
-            r3_pos = (r3_pos + 1) % 26
-            if r3_pos == 0:
-                r2_pos = (r2_pos + 1) % 26
-                if r2_pos == 0:
-                    r1_pos = (r1_pos + 1) % 26
-
-            # Forward pass: R3 -> R2 -> R1 -> Reflector
-            idx = ord(c) - ord('A')
-            c1 = self._pass_rotor(idx, self.ROTOR_III, r3_pos)
-            c2 = self._pass_rotor(c1, self.ROTOR_II, r2_pos)
-            c3 = self._pass_rotor(c2, self.ROTOR_I, r1_pos)
+        return r1_pos * 676 + r2_pos * 26 + r3_pos
 
-            # Reflector
-            refl = ord(self.REFLECTOR_B[c3]) - ord('A')
+    def states(self) -> bytes:
+        """Letter permutations for every rotor position (see _enigma_states)."""
+        return _enigma_states(self.ROTOR_I, self.ROTOR_II, self.ROTOR_III, self.REFLECTOR_B)
 
-            # Backward pass: R1 -> R2 -> R3
-            c4 = self._pass_rotor_rev(refl, self.ROTOR_I, r1_pos)
-            c5 = self._pass_rotor_rev(c4, self.ROTOR_II, r2_pos)
-            c6 = self._pass_rotor_rev(c5, self.ROTOR_III, r3_pos)
-
-            ciphertext.append(chr(c6 + ord('A')))
-
-        return ''.join(ciphertext).encode('utf-8')
+    def encrypt(self, data: bytes, password: str) -> bytes:
+        return _EnigmaTransform(self.states(), self._parse_position(password)).update(data)
 
     def decrypt(self, data: bytes, password: str) -> bytes:
         # Enigma is symmetric (reciprocal)
         return self.encrypt(data, password)
 
+    def encryptor(self, password: str) -> StreamTransform:
+        return _EnigmaTransform(self.states(), self._parse_position(password))
+
+    def decryptor(self, password: str) -> StreamTransform:
+        return self.encryptor(password)
+
+
+class _EnigmaTransform(StreamTransform):
+    """
+    Enigma over a stream. Letters are upper-cased and encrypted, each one
+    stepping the rotors first; other bytes pass through.
+    """
+
+    def __init__(self, states: bytes, position: int):
+        self._tables = _enigma_tables(states)
+        self._position = position
+
+    def _apply(self, letters: bytes) -> bytes:
+        # Simplified odometer stepping (R3 always steps, cascading on
+        # wrap) is a plain increment of the position index, so letter i
+        # uses the permutation at position + i + 1. Letters a full cycle
+        # apart share a position: one translate per strided slice.
+        letters = letters.upper()
+        out = bytearray(letters)
+        for i in range(min(ENIGMA_POSITIONS, len(letters))):
+            table = self._tables[(self._position + i + 1) % ENIGMA_POSITIONS]
+            out[i::ENIGMA_POSITIONS] = letters[i::ENIGMA_POSITIONS].translate(table)
+        self._position = (self._position + len(letters)) % ENIGMA_POSITIONS
+        return out
+
+    def update(self, chunk: bytes) -> bytes:
+        return _map_letters(chunk, self._apply)
+
+
+@lru_cache(maxsize=None)
+def _enigma_tables(states: bytes) -> tuple:
+    """Upper-case letter translation table of each rotor position."""
+    return tuple(bytes.maketrans(UPPERCASE, states[p * 26:p * 26 + 26])
+                 for p in range(ENIGMA_POSITIONS))
+
+
+@lru_cache(maxsize=None)
+def _enigma_states(left: str, middle: str, right: str, reflector: str) -> bytes:
+    """
+    Concatenated 26-letter output alphabets of the machine for every rotor
+    position r1*676 + r2*26 + r3: entry [position * 26 + i] is the letter
+    that input letter i encrypts to. Each permutation is composed from
+    per-offset rotor tables with bytes.translate, so the 17,576 positions
+    are built once instead of walking the rotors for every letter.
+    """
+    identity = bytes(range(26))
+    padding = bytes(range(26, 256))
+
+    def rotor_tables(wiring):
+        forward, backward = [], []
+        for offset in range(26):
+            fwd = bytearray(range(256))
+            bwd = bytearray(range(256))
+            for x in range(26):
+                y = (ord(wiring[(x + offset) % 26]) - ord('A') - offset) % 26
+                fwd[x] = y
+                bwd[y] = x
+            forward.append(bytes(fwd))
+            backward.append(bytes(bwd))
+        return forward, backward
+
+    l_fwd, l_bwd = rotor_tables(left)
+    m_fwd, m_bwd = rotor_tables(middle)
+    r_fwd, r_bwd = rotor_tables(right)
+    reflect = bytes(ord(c) - ord('A') for c in reflector) + padding
+    to_letters = bytes.maketrans(identity, UPPERCASE)
+
+    states = []
+    for r1 in range(26):
+        # Left rotor, reflector and back through the left rotor
+        inner = identity.translate(l_fwd[r1]).translate(reflect).translate(l_bwd[r1]) + padding
+        for r2 in range(26):
+            middle_perm = identity.translate(m_fwd[r2]).translate(inner).translate(m_bwd[r2]) + padding
+            for r3 in range(26):
+                perm = identity.translate(r_fwd[r3]).translate(middle_perm).translate(r_bwd[r3])
+                states.append(perm.translate(to_letters))
+    return b''.join(states)
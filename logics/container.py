@@ -0,0 +1,694 @@
+import hashlib
+import hmac
+import lzma
+import math
+import os
+import struct
+import zlib
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from logics.base import DEFAULT_CHUNK_SIZE, StreamTransform
+
+try:  # Optional: zstd compression (stdlib from Python 3.14, else the zstandard package)
+    from compression import zstd as _zstd
+    _zstd_compress, _zstd_decompress = _zstd.compress, _zstd.decompress
+except ImportError:
+    try:
+        import zstandard as _zstd
+        _zstd_compress = lambda data: _zstd.ZstdCompressor().compress(data)
+        _zstd_decompress = lambda data: _zstd.ZstdDecompressor().decompress(data)
+    except ImportError:
+        _zstd = None
+
+# Segmented container written by the AEAD logics:
+#
+#   header   magic, format version, AEAD id, compression id, KDF id,
+#            KDF iterations, salt, plaintext bytes per segment
+#   records  4-byte length (top bit set on the final record), nonce,
+#            ciphertext and tag of one segment
+#   trailer  8-byte total plaintext length, after the final record
+#
+# Each record is authenticated with the header, its index and its final
+# flag (plus the trailer on the final record) as associated data, so
+# segments cannot be reordered, dropped, truncated or moved between files.
+# Files without the magic are single messages of the original AES format.
+MAGIC = b"CFAE"
+FORMAT_VERSION = 1
+HEADER = struct.Struct(">4sBBBBI16sI")
+RECORD = struct.Struct(">I")
+FINAL_FLAG = 1 << 31
+TRAILER = struct.Struct(">Q")
+_POSITION = struct.Struct(">QB")
+
+DEFAULT_SEGMENT_SIZE = 64 << 10
+MAX_SEGMENT_SIZE = 64 << 20
+KDF_PBKDF2_SHA256 = 1
+KDFS = {KDF_PBKDF2_SHA256: "PBKDF2-SHA256"}
+PBKDF2_ITERATIONS = 100000
+# Headers asking for more are rejected rather than run.
+MAX_ITERATIONS = 10_000_000
+TAG_SIZE = 16
+
+# Segment payload marker when the file uses compression.
+STORED, COMPRESSED = 0, 1
+# Bytes sampled per segment by the entropy check.
+ENTROPY_SAMPLE = 1024
+# Samples above this many bits per byte are not worth compressing.
+MAX_COMPRESSIBLE_ENTROPY = 7.5
+
+ERROR_MESSAGE = "Decryption failed. Wrong password or corrupted file."
+
+# Ciphertext bytes authenticated per verify_container job.
+VERIFY_BATCH = 4 << 20
+
+# Segment index kept beside a file for in-place updates: the total length
+# and, per segment, a keyed digest of the plaintext and the tag of the
+# record holding it, sealed with the file key. An entry is only trusted
+# while the file still holds that record, so a stale index (the file was
+# rolled back or restored from a backup) is never believed.
+INDEX_MAGIC = b"CFX2"
+DIGEST_SIZE = 16
+INDEX_ENTRY_SIZE = DIGEST_SIZE + TAG_SIZE
+
+
+class Aead(NamedTuple):
+    name: str
+    factory: Callable
+    nonce_size: int
+
+
+class Codec(NamedTuple):
+    name: str
+    compress: Optional[Callable[[bytes], bytes]]
+    decompress: Optional[Callable[[bytes], bytes]]
+
+
+_CHACHA_CONSTANTS = b"expand 32-byte k"
+_CHACHA_STATE = struct.Struct("<16I")
+
+
+def hchacha20(key: bytes, nonce: bytes) -> bytes:
+    """
+    HChaCha20 subkey for a 32-byte key and 16-byte nonce. The ChaCha20
+    block function is not exposed, but its first keystream block with
+    nonce as the 16-byte counter + nonce is the permuted state plus the
+    initial state; subtracting the latter from the words HChaCha20 keeps
+    (0-3 and 12-15) gives the subkey.
+    """
+    block = Cipher(algorithms.ChaCha20(key, nonce), mode=None).encryptor().update(bytes(64))
+    state = _CHACHA_STATE.unpack(block)
+    initial = _CHACHA_STATE.unpack(_CHACHA_CONSTANTS + key + nonce)
+    return struct.pack("<8I", *((state[i] - initial[i]) & 0xFFFFFFFF
+                                for i in (0, 1, 2, 3, 12, 13, 14, 15)))
+
+
+class XChaCha20Poly1305:
+    """
+    XChaCha20-Poly1305 with the interface of the cryptography AEADs: a
+    24-byte nonce, long enough to pick at random for every segment
+    without tracking counters. The first 16 bytes and the key give an
+    HChaCha20 subkey for ChaCha20-Poly1305 with the last 8 as its nonce.
+    """
+
+    NONCE_SIZE = 24
+
+    def __init__(self, key: bytes):
+        if len(key) != 32:
+            raise ValueError("XChaCha20-Poly1305 key must be 32 bytes")
+        self._key = bytes(key)
+
+    def _cipher(self, nonce: bytes):
+        if len(nonce) != self.NONCE_SIZE:
+            raise ValueError("Nonce must be 24 bytes")
+        nonce = bytes(nonce)
+        return ChaCha20Poly1305(hchacha20(self._key, nonce[:16])), b"\0\0\0\0" + nonce[16:]
+
+    def encrypt(self, nonce: bytes, data: bytes, associated_data: Optional[bytes]) -> bytes:
+        cipher, inner = self._cipher(nonce)
+        return cipher.encrypt(inner, data, associated_data)
+
+    def decrypt(self, nonce: bytes, data: bytes, associated_data: Optional[bytes]) -> bytes:
+        cipher, inner = self._cipher(nonce)
+        return cipher.decrypt(inner, data, associated_data)
+
+
+AEAD_AES_GCM = 1
+AEAD_XCHACHA20_POLY1305 = 2
+AEADS: Dict[int, Aead] = {
+    AEAD_AES_GCM: Aead("AES-256-GCM", AESGCM, 12),
+    AEAD_XCHACHA20_POLY1305: Aead("XChaCha20-Poly1305", XChaCha20Poly1305, XChaCha20Poly1305.NONCE_SIZE),
+}
+
+COMPRESSION_NONE = 0
+CODECS: Dict[int, Codec] = {
+    COMPRESSION_NONE: Codec("none", None, None),
+    1: Codec("zlib", lambda data: zlib.compress(data, 6), zlib.decompress),
+    2: Codec("lzma", lambda data: lzma.compress(data, preset=1), lzma.decompress),
+    3: Codec("zstd", _zstd_compress if _zstd else None, _zstd_decompress if _zstd else None),
+}
+
+
+def compression_id(name: Optional[str]) -> int:
+    """Codec id for a compression name (None or 'none' for no compression)."""
+    for codec_id, codec in CODECS.items():
+        if codec.name == (name or "none"):
+            if codec.compress is None and codec_id != COMPRESSION_NONE:
+                raise ValueError(f"{codec.name} compression needs the 'zstandard' package")
+            return codec_id
+    raise ValueError(f"Unknown compression '{name}' "
+                     f"(choose from {', '.join(c.name for c in CODECS.values())})")
+
+
+def sample_entropy(data, size: int = ENTROPY_SAMPLE) -> float:
+    """Shannon entropy in bits per byte of size bytes sampled across data."""
+    if len(data) > size:
+        step, piece = len(data) // 4, size // 4
+        data = b"".join(bytes(data[i:i + piece]) for i in range(0, 4 * step, step))
+    if not data:
+        return 0.0
+    total = len(data)
+    return -sum(n / total * math.log2(n / total) for n in Counter(bytes(data)).values())
+
+
+class Header(NamedTuple):
+    aead: int
+    compression: int
+    kdf: int
+    iterations: int
+    salt: bytes
+    segment_size: int
+    version: int = FORMAT_VERSION
+
+    def pack(self) -> bytes:
+        return HEADER.pack(MAGIC, self.version, self.aead, self.compression, self.kdf,
+                           self.iterations, self.salt, self.segment_size)
+
+    @classmethod
+    def parse(cls, data: bytes) -> "Header":
+        """Parses and validates HEADER.size bytes; raises ValueError."""
+        if len(data) < HEADER.size:
+            raise ValueError("Truncated header")
+        magic, version, aead, compression, kdf, iterations, salt, segment_size = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a CryptForge container")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported container version {version}")
+        if aead not in AEADS:
+            raise ValueError(f"Unknown AEAD id {aead}")
+        if compression not in CODECS:
+            raise ValueError(f"Unknown compression id {compression}")
+        if kdf not in KDFS or not 0 < iterations <= MAX_ITERATIONS:
+            raise ValueError("Unsupported key derivation parameters")
+        if not 0 < segment_size <= MAX_SEGMENT_SIZE:
+            raise ValueError(f"Invalid segment size {segment_size}")
+        return cls(aead, compression, kdf, iterations, salt, segment_size, version)
+
+    def record_size(self) -> int:
+        """Bytes of a full segment's record when the file is uncompressed."""
+        return RECORD.size + AEADS[self.aead].nonce_size + self.segment_size + TAG_SIZE
+
+
+def associated_data(header: bytes, index: int, final: bool, total: int = 0) -> bytes:
+    aad = header + _POSITION.pack(index, final)
+    return aad + TRAILER.pack(total) if final else aad
+
+
+class SegmentCipher:
+    """Seals and opens single segments of one file (thread-safe)."""
+
+    def __init__(self, header: Header, key: bytes):
+        self.header = header
+        self.header_bytes = header.pack()
+        self._aead = AEADS[header.aead].factory(key)
+        self._nonce_size = AEADS[header.aead].nonce_size
+        self._codec = CODECS[header.compression]
+        self._digest_key = hmac.new(key, b"segment digest", hashlib.sha256).digest()
+
+    def seal(self, plaintext, index: int, final: bool, total: int = 0) -> bytes:
+        """The record (length prefix, nonce, ciphertext) of one segment."""
+        payload = plaintext
+        if self._codec.compress is not None:
+            payload = bytes([STORED]) + bytes(plaintext)
+            if sample_entropy(plaintext) <= MAX_COMPRESSIBLE_ENTROPY:
+                packed = self._codec.compress(bytes(plaintext))
+                if len(packed) + 1 < len(payload):
+                    payload = bytes([COMPRESSED]) + packed
+        nonce = os.urandom(self._nonce_size)
+        sealed = self._aead.encrypt(nonce, payload,
+                                    associated_data(self.header_bytes, index, final, total))
+        length = len(nonce) + len(sealed)
+        return RECORD.pack(length | FINAL_FLAG if final else length) + nonce + sealed
+
+    def open(self, record, index: int, final: bool, total: int = 0) -> bytes:
+        """Plaintext of a record's body (nonce and ciphertext); raises ValueError."""
+        record = memoryview(record)
+        try:
+            payload = self._aead.decrypt(record[:self._nonce_size], record[self._nonce_size:],
+                                         associated_data(self.header_bytes, index, final, total))
+        except InvalidTag as e:
+            raise ValueError(ERROR_MESSAGE) from e
+        if self.header.compression == COMPRESSION_NONE:
+            plaintext = payload
+        elif self._codec.decompress is None:
+            raise ValueError(f"{self._codec.name} compression needs the 'zstandard' package")
+        elif payload[:1] == bytes([COMPRESSED]):
+            plaintext = self._codec.decompress(payload[1:])
+        else:
+            plaintext = payload[1:]
+        # Every segment but the last is full; the last one ends at total
+        expected = total - index * self.header.segment_size if final else self.header.segment_size
+        if len(plaintext) != expected:
+            raise ValueError(ERROR_MESSAGE)
+        return plaintext
+
+    def digest(self, plaintext) -> bytes:
+        """Keyed digest of a segment's plaintext (reveals nothing without the key)."""
+        return hashlib.blake2b(plaintext, digest_size=DIGEST_SIZE, key=self._digest_key).digest()
+
+    def seal_index(self, entries: bytes, total: int) -> bytes:
+        """Seals INDEX_ENTRY_SIZE (digest, record tag) entries per segment."""
+        nonce = os.urandom(self._nonce_size)
+        body = self._aead.encrypt(nonce, TRAILER.pack(total) + entries, self.header_bytes + INDEX_MAGIC)
+        return INDEX_MAGIC + nonce + body
+
+    def open_index(self, data: bytes):
+        """(total, entries) of a sealed index, or None if it is not this file's."""
+        if not data.startswith(INDEX_MAGIC):
+            return None
+        nonce = data[len(INDEX_MAGIC):len(INDEX_MAGIC) + self._nonce_size]
+        try:
+            plain = self._aead.decrypt(nonce, data[len(INDEX_MAGIC) + self._nonce_size:],
+                                       self.header_bytes + INDEX_MAGIC)
+        except InvalidTag:
+            return None
+        return TRAILER.unpack_from(plain)[0], plain[TRAILER.size:]
+
+
+class SegmentEncryptor(StreamTransform):
+    """
+    Writes the container: the input is cut into segment_size segments,
+    each sealed (and compressed, if the header names a codec) on its own.
+    The compression decision is made on the first chunk: a sample that
+    looks incompressible switches the file to no compression.
+    """
+    accepts_views = True
+
+    def __init__(self, header: Header, key: bytes):
+        self._header = header
+        self._key = key
+        self._cipher = None
+        self._carry = b""
+        self._index = 0
+        self._total = 0
+
+    def _start(self, sample) -> bytes:
+        header = self._header
+        if header.compression != COMPRESSION_NONE and sample_entropy(sample) > MAX_COMPRESSIBLE_ENTROPY:
+            header = header._replace(compression=COMPRESSION_NONE)
+        self._cipher = SegmentCipher(header, self._key)
+        return self._cipher.header_bytes
+
+    def update(self, chunk: bytes) -> bytes:
+        out = [] if self._cipher else [self._start(chunk)]
+        data = self._carry + chunk if self._carry else chunk
+        view, size = memoryview(data), self._header.segment_size
+        pos = 0
+        # The last segment is held back: only finalize() knows it is final
+        while len(data) - pos > size:
+            out.append(self._cipher.seal(view[pos:pos + size], self._index, False))
+            self._index += 1
+            pos += size
+        self._total += pos
+        self._carry = bytes(view[pos:])
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        out = [] if self._cipher else [self._start(self._carry)]
+        total = self._total + len(self._carry)
+        out.append(self._cipher.seal(self._carry, self._index, True, total))
+        out.append(TRAILER.pack(total))
+        self._carry = b""
+        return b"".join(out)
+
+
+class Record(NamedTuple):
+    body: bytes
+    index: int
+    final: bool
+    total: int
+
+
+class RecordReader:
+    """
+    Splits a container, fed in chunks, into its header and records without
+    decrypting them; the structure (record lengths, a final record
+    followed by exactly the trailer) is checked as it goes.
+    """
+
+    def __init__(self):
+        self.header: Optional[Header] = None
+        self._buffer = bytearray()
+        self._index = 0
+        self._done = False
+
+    def feed(self, chunk) -> List[Record]:
+        buffer = self._buffer
+        buffer += chunk
+        records, pos = [], 0
+        if self.header is None:
+            if len(buffer) < HEADER.size:
+                return records
+            self.header = Header.parse(buffer)
+            self._limit = self.header.record_size() + 1 - RECORD.size
+            pos = HEADER.size
+        while len(buffer) - pos >= RECORD.size:
+            if self._done:
+                raise ValueError("Unexpected data after the final segment")
+            (prefix,) = RECORD.unpack_from(buffer, pos)
+            final, length = bool(prefix & FINAL_FLAG), prefix & ~FINAL_FLAG
+            end = pos + RECORD.size + length
+            if length > self._limit:
+                raise ValueError(ERROR_MESSAGE)
+            if len(buffer) < end + (TRAILER.size if final else 0):
+                break
+            total = TRAILER.unpack_from(buffer, end)[0] if final else 0
+            records.append(Record(bytes(buffer[pos + RECORD.size:end]), self._index, final, total))
+            self._index += 1
+            pos = end
+            if final:
+                pos += TRAILER.size
+                self._done = True
+        del buffer[:pos]
+        return records
+
+    def finish(self) -> None:
+        """Raises ValueError unless everything up to the trailer was fed."""
+        if not self._done or self._buffer:
+            raise ValueError(ERROR_MESSAGE)
+
+
+class SegmentDecryptor(StreamTransform):
+    """
+    Reads the container record by record, authenticating each segment
+    before returning it. key_for(header) supplies the key once the header
+    is known. Input without the magic is handed to legacy, a transform
+    for the single-message format.
+    """
+    accepts_views = True
+
+    def __init__(self, key_for: Callable[[Header], bytes], legacy: StreamTransform):
+        self._key_for = key_for
+        self._legacy = legacy
+        self._delegate = None
+        self._reader = RecordReader()
+        self._cipher = None
+        self._head = b""
+
+    def _open(self, chunk) -> bytes:
+        records = self._reader.feed(chunk)
+        if self._cipher is None and self._reader.header is not None:
+            self._cipher = SegmentCipher(self._reader.header, self._key_for(self._reader.header))
+        return b"".join(self._cipher.open(*record) for record in records)
+
+    def update(self, chunk: bytes) -> bytes:
+        if self._delegate is not None:
+            return self._delegate.update(chunk if self._delegate.accepts_views else bytes(chunk))
+        if len(self._head) < len(MAGIC):
+            # Sniff the magic before committing to either format
+            self._head += bytes(chunk)
+            if len(self._head) < len(MAGIC):
+                return b""
+            if not self._head.startswith(MAGIC):
+                self._delegate = self._legacy
+                return self._delegate.update(self._head)
+            chunk = self._head
+        return self._open(chunk)
+
+    def finalize(self) -> bytes:
+        if self._delegate is None and not self._head.startswith(MAGIC[:len(self._head)]):
+            self._delegate = self._legacy
+            self._delegate.update(self._head)
+        if self._delegate is not None:
+            return self._delegate.finalize()
+        self._reader.finish()
+        return b""
+
+
+class ContainerInfo(NamedTuple):
+    header: Header
+    total: int
+    segments: int
+    file_size: int
+
+
+def read_info(src: BinaryIO) -> ContainerInfo:
+    """
+    Header and trailer of a container in a seekable file: no key is
+    derived and nothing is decrypted. The total length comes from the
+    trailer and is only authenticated by verify_container or decryption.
+    """
+    src.seek(0)
+    header = Header.parse(_read_segment(src, HEADER.size))
+    file_size = src.seek(0, os.SEEK_END)
+    if file_size < HEADER.size + RECORD.size + TRAILER.size:
+        raise ValueError("Truncated container")
+    src.seek(file_size - TRAILER.size)
+    (total,) = TRAILER.unpack(_read_segment(src, TRAILER.size))
+    return ContainerInfo(header, total, max(1, -(-total // header.segment_size)), file_size)
+
+
+def _open_records(cipher: SegmentCipher, records: List[Record]) -> None:
+    for record in records:
+        cipher.open(*record)
+
+
+def verify_container(src: BinaryIO, key_for: Callable[[Header], bytes], workers: Optional[int] = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> ContainerInfo:
+    """
+    Authenticates every segment of the container read from src and
+    discards the plaintext; raises ValueError on the first bad segment.
+    src is read sequentially while batches of records are authenticated
+    on workers threads (default: one per CPU), at most two batches per
+    thread ahead of the reader.
+    """
+    workers = workers or os.cpu_count() or 1
+    reader, cipher = RecordReader(), None
+    pending, batch, batch_size, size, count, total = deque(), [], 0, 0, 0, 0
+    with ThreadPoolExecutor(workers) as pool:
+        try:
+            while True:
+                chunk = src.read(chunk_size)
+                size += len(chunk)
+                for record in reader.feed(chunk) if chunk else ():
+                    if cipher is None:
+                        cipher = SegmentCipher(reader.header, key_for(reader.header))
+                    batch.append(record)
+                    batch_size += len(record.body)
+                    count, total = count + 1, record.total
+                    if batch_size >= VERIFY_BATCH:
+                        pending.append(pool.submit(_open_records, cipher, batch))
+                        batch, batch_size = [], 0
+                while len(pending) > 2 * workers or (pending and pending[0].done()):
+                    pending.popleft().result()
+                if not chunk:
+                    break
+            reader.finish()
+            if batch:
+                pending.append(pool.submit(_open_records, cipher, batch))
+            while pending:
+                pending.popleft().result()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    return ContainerInfo(reader.header, total, count, size)
+
+
+class SegmentedFile:
+    """
+    Random access to the plaintext of a container in a seekable file:
+    segment(i) reads and authenticates only that segment's record. In an
+    uncompressed file records sit at fixed offsets, and the final segment
+    is authenticated up front so the length is trusted. A compressed file
+    has records of varying length; their offsets are found by walking the
+    length prefixes from the start (4 bytes read per record) as far as a
+    read needs, and the length is checked when the end is reached.
+    """
+
+    def __init__(self, src: BinaryIO, key_for: Callable[[Header], bytes]):
+        self._src = src
+        src.seek(0)
+        header = Header.parse(_read_segment(src, HEADER.size))
+        self.cipher = SegmentCipher(header, key_for(header))
+        self.segment_size = header.segment_size
+        self._record_size = header.record_size()
+        self._overhead = RECORD.size + AEADS[header.aead].nonce_size + TAG_SIZE
+        file_size = src.seek(0, os.SEEK_END)
+        if file_size < HEADER.size + self._overhead + TRAILER.size:
+            raise ValueError(ERROR_MESSAGE)
+        src.seek(file_size - TRAILER.size)
+        (self.size,) = TRAILER.unpack(_read_segment(src, TRAILER.size))
+        self.count = max(1, -(-self.size // self.segment_size))
+        self._end = file_size - TRAILER.size
+        self._offsets: List[int] = [HEADER.size]
+        self._fixed = header.compression == COMPRESSION_NONE
+        if self._fixed:
+            last = self.size - (self.count - 1) * self.segment_size
+            if self._end != self._offset(self.count - 1) + self._overhead + last:
+                raise ValueError(ERROR_MESSAGE)
+            self.segment(self.count - 1)
+
+    def _offset(self, index: int) -> int:
+        if self._fixed:
+            return HEADER.size + index * self._record_size
+        offsets = self._offsets
+        while len(offsets) <= index:
+            self._src.seek(offsets[-1])
+            prefix = _read_segment(self._src, RECORD.size)
+            if len(prefix) < RECORD.size or RECORD.unpack(prefix)[0] & FINAL_FLAG:
+                raise ValueError(ERROR_MESSAGE)
+            offsets.append(offsets[-1] + RECORD.size + RECORD.unpack(prefix)[0])
+        return offsets[index]
+
+    def segment(self, index: int) -> bytes:
+        """Plaintext of segment index (0 <= index < count); raises ValueError."""
+        if not 0 <= index < self.count:
+            raise IndexError("segment index out of range")
+        final = index == self.count - 1
+        self._src.seek(self._offset(index))
+        prefix = _read_segment(self._src, RECORD.size)
+        if len(prefix) < RECORD.size:
+            raise ValueError(ERROR_MESSAGE)
+        (prefix,) = RECORD.unpack(prefix)
+        length = prefix & ~FINAL_FLAG
+        if bool(prefix & FINAL_FLAG) != final or length > self._record_size + 1 - RECORD.size:
+            raise ValueError(ERROR_MESSAGE)
+        body = _read_segment(self._src, length)
+        if len(body) != length or (final and self._src.tell() != self._end):
+            raise ValueError(ERROR_MESSAGE)
+        return self.cipher.open(body, index, final, self.size if final else 0)
+
+    def read_range(self, start: int, end: Optional[int] = None) -> Iterator[bytes]:
+        """The plaintext bytes [start, end), clamped to the file, segment by segment."""
+        start, end = max(0, start), self.size if end is None else min(end, self.size)
+        while start < end:
+            index, skip = divmod(start, self.segment_size)
+            data = self.segment(index)[skip:skip + end - start]
+            yield data
+            start += len(data)
+
+
+def _read_segment(src: BinaryIO, size: int) -> bytes:
+    data = src.read(size)
+    while data and len(data) < size:
+        more = src.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def update_container(src: BinaryIO, dst: BinaryIO, key_for: Callable[[Header], bytes],
+                     index: Optional[bytes] = None) -> bytes:
+    """
+    Re-encrypts dst, an uncompressed container opened for reading and
+    writing, in place so that it holds src. Uncompressed records sit at
+    fixed offsets, so only segments whose plaintext changed are sealed
+    again (with fresh nonces) and written; the file is then cut or
+    extended to the new length. Unchanged segments are found with index,
+    the sealed digests returned by the previous update (each checked
+    against the tag of the record now in the file), or else by
+    decrypting the old segment. Returns the index of the new contents.
+    """
+    header_bytes = _read_segment(dst, HEADER.size)
+    header = Header.parse(header_bytes)
+    if header.compression != COMPRESSION_NONE:
+        raise ValueError("Only uncompressed files can be updated in place")
+    cipher = SegmentCipher(header, key_for(header))
+    nonce_size, size = AEADS[header.aead].nonce_size, header.segment_size
+    record_size = header.record_size()
+    file_size = dst.seek(0, os.SEEK_END)
+
+    def old_record(position: int, final: bool, length: int) -> Optional[bytes]:
+        # Body of the old record at a position, if it has this shape
+        offset = HEADER.size + position * record_size
+        if offset + RECORD.size + length > file_size:
+            return None
+        dst.seek(offset)
+        record = _read_segment(dst, RECORD.size + length)
+        (prefix,) = RECORD.unpack_from(record)
+        return record[RECORD.size:] if prefix == (length | FINAL_FLAG if final else length) else None
+
+    # The first record authenticates the password before anything is written
+    dst.seek(HEADER.size)
+    (prefix,) = RECORD.unpack_from(_read_segment(dst, RECORD.size) or bytes(RECORD.size))
+    first_final = bool(prefix & FINAL_FLAG)
+    first_total = 0
+    if first_final and file_size >= TRAILER.size:
+        dst.seek(file_size - TRAILER.size)
+        (first_total,) = TRAILER.unpack(_read_segment(dst, TRAILER.size))
+    body = old_record(0, first_final, prefix & ~FINAL_FLAG)
+    if body is None:
+        raise ValueError(ERROR_MESSAGE)
+    cipher.open(body, 0, first_final, first_total)
+
+    old = cipher.open_index(index) if index else None
+    old_total, old_entries = old if old else (None, b"")
+    old_count = len(old_entries) // INDEX_ENTRY_SIZE
+
+    def old_tag(position: int, length: int) -> bytes:
+        # Tag of the record at a position, read without the rest of it
+        end = HEADER.size + position * record_size + RECORD.size + length
+        if end > file_size:
+            return b""
+        dst.seek(end - TAG_SIZE)
+        return _read_segment(dst, TAG_SIZE)
+
+    def unchanged(position: int, segment: bytes, digest: bytes, final: bool, total: int) -> Optional[bytes]:
+        """The tag of the old record if it already holds segment, else None."""
+        length = nonce_size + len(segment) + TAG_SIZE
+        if old is not None:
+            entry = old_entries[position * INDEX_ENTRY_SIZE:(position + 1) * INDEX_ENTRY_SIZE]
+            if not (position < old_count and final == (position == old_count - 1)
+                    and (not final or total == old_total)
+                    and hmac.compare_digest(entry[:DIGEST_SIZE], digest)):
+                return None
+            tag = old_tag(position, length)
+            return tag if hmac.compare_digest(entry[DIGEST_SIZE:], tag) else None
+        body = old_record(position, final, length)
+        if body is None:
+            return None
+        try:
+            return body[-TAG_SIZE:] if cipher.open(body, position, final, total) == segment else None
+        except ValueError:
+            return None
+
+    entries = []
+    position, total = 0, 0
+    segment = _read_segment(src, size)
+    while True:
+        following = _read_segment(src, size)
+        final = not following
+        total += len(segment)
+        digest = cipher.digest(segment)
+        tag = unchanged(position, segment, digest, final, total)
+        if tag is None:
+            record = cipher.seal(segment, position, final, total)
+            dst.seek(HEADER.size + position * record_size)
+            dst.write(record)
+            tag = record[-TAG_SIZE:]
+        entries.append(digest + tag)
+        if final:
+            break
+        segment = following
+        position += 1
+    end = HEADER.size + position * record_size + RECORD.size + nonce_size + len(segment) + TAG_SIZE
+    dst.seek(end)
+    dst.write(TRAILER.pack(total))
+    dst.truncate(end + TRAILER.size)
+    return cipher.seal_index(b"".join(entries), total)
@@ -1,9 +1,122 @@
-from logics.base import EncryptionLogic
+from logics.base import EncryptionLogic, StreamTransform
 import base64
+import binascii
+import string
 import urllib.parse
+from logics.bootstring import SegmentedDecoder, SegmentedEncoder
+from logics.tokens import ASCII_WHITESPACE, TokenCodec, TokenCodecLogic
+
+
+def _complement(alphabet: bytes) -> bytes:
+    """All byte values that are not in alphabet (for bytes.translate deletion)."""
+    return bytes(b for b in range(256) if b not in alphabet)
+
+
+class _BlockEncoder(StreamTransform):
+    """
+    Encodes whole codec blocks as they arrive and carries the remainder to
+    the next chunk, so memory stays bounded by the chunk size. Output is
+    optionally wrapped into newline-terminated lines of a fixed width.
+    """
+
+    def __init__(self, encode, block: int, wrap: int = 0):
+        self._encode = encode
+        self._block = block
+        self._wrap = wrap
+        self._column = 0
+        self._carry = b""
+
+    def _wrap_lines(self, out: bytes) -> bytes:
+        if not self._wrap or not out:
+            return out
+        lines = []
+        pos, room = 0, self._wrap - self._column
+        while len(out) - pos >= room:
+            lines.append(out[pos:pos + room])
+            lines.append(b"\n")
+            pos, room = pos + room, self._wrap
+        lines.append(out[pos:])
+        self._column = self._wrap - room + len(out) - pos
+        return b"".join(lines)
+
+    def update(self, chunk: bytes) -> bytes:
+        data = self._carry + chunk if self._carry else bytes(chunk)
+        cut = len(data) - len(data) % self._block
+        self._carry = data[cut:]
+        return self._wrap_lines(self._encode(memoryview(data)[:cut]))
+
+    def finalize(self) -> bytes:
+        out = self._wrap_lines(self._encode(self._carry))
+        self._carry = b""
+        if self._column:
+            out += b"\n"
+            self._column = 0
+        return out
+
+
+class _BlockDecoder(StreamTransform):
+    """
+    Decodes whole codec blocks as they arrive. Ignored bytes (whitespace or
+    anything outside the alphabet) are removed first and the incomplete
+    tail is carried to the next chunk.
+    """
+
+    def __init__(self, decode, boundary, ignore: bytes):
+        self._decode = decode
+        self._boundary = boundary
+        self._ignore = ignore
+        self._carry = b""
+
+    def update(self, chunk: bytes) -> bytes:
+        data = self._carry + bytes(chunk).translate(None, self._ignore)
+        cut = self._boundary(data)
+        self._carry = data[cut:]
+        return self._decode(data[:cut])
+
+    def finalize(self) -> bytes:
+        carry, self._carry = self._carry, b""
+        return self._decode(carry)
+
+
+class _BlockCodecLogic(EncryptionLogic):
+    """
+    Base class for block encodings (Base64, Base32, Ascii85, Hex) that
+    stream in chunks aligned to the codec's input block size.
+    Subclasses set ENCODE/DECODE functions, the BLOCK size in bytes and the
+    IGNORE bytes skipped when decoding. The password is not used; set
+    line_width (e.g. 76) to wrap the encoded output.
+    """
+    line_width = 0
+    BLOCK = 1
+    GROUP = 1
+    IGNORE = ASCII_WHITESPACE
+    ENCODE = None
+    DECODE = None
+
+    def _boundary(self, data: bytes) -> int:
+        """Length of the longest prefix of data made of whole encoded groups."""
+        return len(data) - len(data) % self.GROUP
+
+    def encryptor(self, password: str) -> StreamTransform:
+        return _BlockEncoder(self.ENCODE, self.BLOCK, self.line_width)
+
+    def decryptor(self, password: str) -> StreamTransform:
+        return _BlockDecoder(self.DECODE, self._boundary, self.IGNORE)
 
+    def encrypt(self, data: bytes, password: str) -> bytes:
+        enc = self.encryptor(password)
+        return enc.update(data) + enc.finalize()
+
+    def decrypt(self, data: bytes, password: str) -> bytes:
+        dec = self.decryptor(password)
+        return dec.update(data) + dec.finalize()
+
+
+class Base32Logic(_BlockCodecLogic):
+    BLOCK, GROUP = 5, 8
+    ENCODE = staticmethod(base64.b32encode)
+    DECODE = staticmethod(base64.b32decode)
 
-class Base32Logic(EncryptionLogic):
     @property
     def name(self) -> str:
         return "base32"
@@ -12,14 +125,14 @@ class Base32Logic(EncryptionLogic):
     def description(self) -> str:
         return "Base32 encoding"
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
-        return base64.b32encode(data)
-
-    def decrypt(self, data: bytes, password: str) -> bytes:
-        return base64.b32decode(data)
 
+class Base64Logic(_BlockCodecLogic):
+    BLOCK, GROUP = 3, 4
+    ENCODE = staticmethod(base64.b64encode)
+    DECODE = staticmethod(base64.b64decode)
+    # Like b64decode, silently discard anything outside the alphabet
+    IGNORE = _complement((string.ascii_letters + string.digits + '+/=').encode('ascii'))
 
-class Base64Logic(EncryptionLogic):
     @property
     def name(self) -> str:
         return "base64"
@@ -28,14 +141,17 @@ class Base64Logic(EncryptionLogic):
     def description(self) -> str:
         return "Base64 encoding"
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
-        return base64.b64encode(data)
 
-    def decrypt(self, data: bytes, password: str) -> bytes:
-        return base64.b64decode(data)
+class Ascii85Logic(_BlockCodecLogic):
+    BLOCK, GROUP = 4, 5
+    ENCODE = staticmethod(base64.a85encode)
+    DECODE = staticmethod(base64.a85decode)
 
+    def _boundary(self, data: bytes) -> int:
+        # 'z' abbreviates a whole zero group, so groups restart after it
+        start = data.rfind(b'z') + 1
+        return start + (len(data) - start) // self.GROUP * self.GROUP
 
-class Ascii85Logic(EncryptionLogic):
     @property
     def name(self) -> str:
         return "ascii85"
@@ -44,12 +160,6 @@ class Ascii85Logic(EncryptionLogic):
     def description(self) -> str:
         return "ASCII85 (Base85) encoding"
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
-        return base64.a85encode(data)
-
-    def decrypt(self, data: bytes, password: str) -> bytes:
-        return base64.a85decode(data)
-
 
 class UrlEncodingLogic(EncryptionLogic):
     @property
@@ -67,7 +177,27 @@ class UrlEncodingLogic(EncryptionLogic):
         return urllib.parse.unquote(data.decode('utf-8', errors='replace')).encode('utf-8')
 
 
-class UnicodeCodePointsLogic(EncryptionLogic):
+def _parse_code_point(token: bytes) -> bytes:
+    """Decodes a U+XXXX token missing from the table; anything else is kept as is."""
+    if token.startswith(b'U+'):
+        try:
+            return chr(int(token[2:], 16)).encode('utf-8')
+        except (ValueError, OverflowError):
+            pass
+    return token
+
+
+def _parse_decimal(token: bytes) -> bytes:
+    """Decodes a non-canonical decimal token (e.g. '065'); non-digits are skipped."""
+    return bytes([int(token)]) if token.isdigit() else b''
+
+
+class UnicodeCodePointsLogic(TokenCodecLogic):
+    # Tables cover U+0000-U+07FF; other code points are formatted/parsed on demand
+    CODEC = TokenCodec({chr(i): f'U+{i:04X}' for i in range(0x800)}, fold_case=False,
+                       encode_unknown=lambda c: f'U+{ord(c):04X}', delimiter=None,
+                       decode_unknown=_parse_code_point)
+
     @property
     def name(self) -> str:
         return "unicode"
@@ -76,25 +206,11 @@ class UnicodeCodePointsLogic(EncryptionLogic):
     def description(self) -> str:
         return "Unicode code points (U+XXXX)"
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace')
-        return ' '.join(f'U+{ord(c):04X}' for c in text).encode('utf-8')
-
-    def decrypt(self, data: bytes, password: str) -> bytes:
-        parts = data.decode('utf-8', errors='replace').split()
-        result = []
-        for p in parts:
-            if p.startswith('U+'):
-                try:
-                    result.append(chr(int(p[2:], 16)))
-                except ValueError:
-                    result.append(p)
-            else:
-                result.append(p)
-        return ''.join(result).encode('utf-8')
 
+class IntegerEncodingLogic(TokenCodecLogic):
+    CODEC = TokenCodec({chr(b): str(b) for b in range(256)}, binary=True,
+                       delimiter=None, decode_unknown=_parse_decimal)
 
-class IntegerEncodingLogic(EncryptionLogic):
     @property
     def name(self) -> str:
         return "integer"
@@ -103,15 +219,12 @@ class IntegerEncodingLogic(EncryptionLogic):
     def description(self) -> str:
         return "Decimal byte values"
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
-        return ' '.join(str(b) for b in data).encode('utf-8')
-
-    def decrypt(self, data: bytes, password: str) -> bytes:
-        parts = data.decode('utf-8', errors='replace').split()
-        return bytes(int(p) for p in parts if p.isdigit())
 
+class HexEncodingLogic(_BlockCodecLogic):
+    BLOCK, GROUP = 1, 2
+    ENCODE = staticmethod(binascii.hexlify)
+    DECODE = staticmethod(binascii.unhexlify)
 
-class HexEncodingLogic(EncryptionLogic):
     @property
     def name(self) -> str:
         return "hex"
@@ -120,14 +233,8 @@ class HexEncodingLogic(EncryptionLogic):
     def description(self) -> str:
         return "Hexadecimal encoding"
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
-        return data.hex().encode('utf-8')
-
-    def decrypt(self, data: bytes, password: str) -> bytes:
-        return bytes.fromhex(data.decode('utf-8', errors='replace'))
-
 
-class BaudotCodeLogic(EncryptionLogic):
+class BaudotCodeLogic(TokenCodecLogic):
     ITA2 = {
         'A': '11000', 'B': '10011', 'C': '01110', 'D': '10010', 'E': '10000',
         'F': '10110', 'G': '01011', 'H': '00101', 'I': '01100', 'J': '11010',
@@ -137,6 +244,8 @@ class BaudotCodeLogic(EncryptionLogic):
         'Z': '10001', ' ': '00100', '\r': '00010', '\n': '00010'
     }
     ITA2_REV = {v: k for k, v in ITA2.items()}
+    # Simple handling: only map known chars, ignore others
+    CODEC = TokenCodec(ITA2, delimiter=None)
 
     @property
     def name(self) -> str:
@@ -146,28 +255,15 @@ class BaudotCodeLogic(EncryptionLogic):
     def description(self) -> str:
         return "Baudot code (ITA2) binary strings"
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace').upper()
-        res = []
-        for c in text:
-            # Simple handling: only map known chars, ignore others
-            code = self.ITA2.get(c)
-            if code:
-                res.append(code)
-        return ' '.join(res).encode('utf-8')
-
-    def decrypt(self, data: bytes, password: str) -> bytes:
-        bits = data.decode('utf-8', errors='replace').split()
-        res = []
-        for b in bits:
-             c = self.ITA2_REV.get(b)
-             if c: res.append(c)
-        return ''.join(res).encode('utf-8')
-
-
-import codecs
 
 class PunycodeLogic(EncryptionLogic):
+    """
+    Punycode of UTF-8 text, encoded in bounded line segments (see
+    logics/bootstring.py) so large inputs stream in linear time. A
+    single-line input gives the plain 'punycode' codec output; unmarked
+    input, including multi-line output of earlier versions, is decoded whole.
+    """
+
     @property
     def name(self) -> str:
         return "punycode"
@@ -176,42 +272,26 @@ class PunycodeLogic(EncryptionLogic):
     def description(self) -> str:
         return "Punycode (IDNA) encoding"
 
+    def encryptor(self, password: str) -> StreamTransform:
+        return SegmentedEncoder()
+
+    def decryptor(self, password: str) -> StreamTransform:
+        return SegmentedDecoder()
+
     def encrypt(self, data: bytes, password: str) -> bytes:
-        try:
-             text = data.decode('utf-8')
-             return text.encode('punycode')
-        except Exception:
-             return b""
+        enc = self.encryptor(password)
+        return enc.update(data) + enc.finalize()
 
     def decrypt(self, data: bytes, password: str) -> bytes:
-        try:
-            # data is bytes, punycode decode returns str
-            decoded_str = codecs.decode(data, 'punycode')
-            return decoded_str.encode('utf-8')
-        except Exception:
-             return b""
-
-
-class BootstringLogic(EncryptionLogic):
-     @property
-     def name(self) -> str:
-         return "bootstring"
-
-     @property
-     def description(self) -> str:
-         return "Bootstring encoding (Same as Punycode)"
-
-     def encrypt(self, data: bytes, password: str) -> bytes:
-         try:
-             text = data.decode('utf-8')
-             return text.encode('punycode')
-         except:
-             return b""
-
-     def decrypt(self, data: bytes, password: str) -> bytes:
-         try:
-             decoded_str = codecs.decode(data, 'punycode')
-             return decoded_str.encode('utf-8')
-         except:
-             return b""
+        dec = self.decryptor(password)
+        return dec.update(data) + dec.finalize()
+
 
+class BootstringLogic(PunycodeLogic):
+    @property
+    def name(self) -> str:
+        return "bootstring"
+
+    @property
+    def description(self) -> str:
+        return "Bootstring encoding (Same as Punycode)"
@@ -1,4 +1,8 @@
 from logics.base import EncryptionLogic
+from functools import lru_cache
+from itertools import repeat
+from operator import add
+import sys
 
 
 class PolybiusSquareLogic(EncryptionLogic):
@@ -13,29 +17,12 @@ class PolybiusSquareLogic(EncryptionLogic):
         return "Polybius square cipher (5x5 grid)"
 
     def encrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace').upper().replace('J', 'I')
-        result = []
-        for c in text:
-            if c in self.SQUARE:
-                idx = self.SQUARE.index(c)
-                result.append(f"{idx // 5 + 1}{idx % 5 + 1}")
-            else:
-                result.append(c)
-        return ' '.join(result).encode('utf-8')
+        fold, tokens, _ = _polybius_tables(self.SQUARE)
+        return b' '.join(map(tokens.__getitem__, bytes(data).translate(fold)))
 
     def decrypt(self, data: bytes, password: str) -> bytes:
-        parts = data.decode('utf-8', errors='replace').split()
-        result = []
-        for p in parts:
-            if len(p) == 2 and p.isdigit():
-                row, col = int(p[0]) - 1, int(p[1]) - 1
-                if 0 <= row < 5 and 0 <= col < 5:
-                    result.append(self.SQUARE[row * 5 + col])
-                else:
-                    result.append(p)
-            else:
-                result.append(p)
-        return ''.join(result).encode('utf-8')
+        _, _, letters = _polybius_tables(self.SQUARE)
+        return b''.join([letters.get(p, p) for p in bytes(data).split()])
 
 
 class TapCodeLogic(EncryptionLogic):
@@ -50,34 +37,27 @@ class TapCodeLogic(EncryptionLogic):
         return "Tap code (Prisoners' cipher)"
 
     def encrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace').upper().replace('K', 'C').replace('J', 'I')
-        result = []
-        for c in text:
-            if c in self.GRID:
-                idx = self.GRID.index(c)
-                row, col = idx // 5 + 1, idx % 5 + 1
-                result.append('.' * row + ' ' + '.' * col)
-            elif c == ' ':
-                result.append('/')
-        return ' '.join(result).encode('utf-8')
+        fold, strip, tokens = _tap_tables(self.GRID)
+        return b' '.join(map(tokens.__getitem__, bytes(data).translate(fold, strip)))
 
     def decrypt(self, data: bytes, password: str) -> bytes:
-        parts = data.decode('utf-8', errors='replace').split(' ')
-        result = []
+        parts = bytes(data).split(b' ')
+        grid = self.GRID.encode('ascii')
+        result = bytearray()
         i = 0
         while i < len(parts):
-            if parts[i] == '/':
-                result.append(' ')
+            if parts[i] == b'/':
+                result += b' '
                 i += 1
-            elif i + 1 < len(parts) and parts[i].replace('.', '') == '' and parts[i + 1].replace('.', '') == '':
+            elif i + 1 < len(parts) and not parts[i].strip(b'.') and not parts[i + 1].strip(b'.'):
                 row = len(parts[i]) - 1
                 col = len(parts[i + 1]) - 1
                 if 0 <= row < 5 and 0 <= col < 5:
-                    result.append(self.GRID[row * 5 + col])
+                    result.append(grid[row * 5 + col])
                 i += 2
             else:
                 i += 1
-        return ''.join(result).encode('utf-8')
+        return bytes(result)
 
 
 class BifidCipherLogic(EncryptionLogic):
@@ -92,34 +72,20 @@ class BifidCipherLogic(EncryptionLogic):
         return "Bifid cipher (fractionation)"
 
     def encrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace').upper().replace('J', 'I')
-        text = ''.join(c for c in text if c in self.SQUARE)
-        rows, cols = [], []
-        for c in text:
-            idx = self.SQUARE.index(c)
-            rows.append(idx // 5)
-            cols.append(idx % 5)
-        combined = rows + cols
-        result = []
-        for i in range(0, len(combined), 2):
-            if i + 1 < len(combined):
-                result.append(self.SQUARE[combined[i] * 5 + combined[i + 1]])
-        return ''.join(result).encode('utf-8')
+        fold, strip, coords, letters = _grid_tables(self.SQUARE, 5, 'JI')
+        text = bytes(data).translate(fold, strip)
+        # All row coordinates then all column coordinates, read in pairs
+        combined = text.translate(coords[0]) + text.translate(coords[1])
+        return _from_coords(letters, 5, combined[0::2], combined[1::2])
 
     def decrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace').upper()
-        text = ''.join(c for c in text if c in self.SQUARE)
-        coords = []
-        for c in text:
-            idx = self.SQUARE.index(c)
-            coords.append(idx // 5)
-            coords.append(idx % 5)
-        mid = len(coords) // 2
-        rows, cols = coords[:mid], coords[mid:]
-        result = []
-        for r, c in zip(rows, cols):
-            result.append(self.SQUARE[r * 5 + c])
-        return ''.join(result).encode('utf-8')
+        fold, strip, coords, letters = _grid_tables(self.SQUARE, 5, '')
+        text = bytes(data).translate(fold, strip)
+        pairs = bytearray(2 * len(text))
+        pairs[0::2] = text.translate(coords[0])
+        pairs[1::2] = text.translate(coords[1])
+        mid = len(text)
+        return _from_coords(letters, 5, pairs[:mid], pairs[mid:])
 
 
 class TrifidCipherLogic(EncryptionLogic):
@@ -134,50 +100,150 @@ class TrifidCipherLogic(EncryptionLogic):
         return "Trifid cipher (3D fractionation)"
 
     def encrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace').upper()
+        fold, strip, coords, letters = _grid_tables(self.CUBE, 3, '')
         # Keep only chars in CUBE
-        text = ''.join(c for c in text if c in self.CUBE)
-        if not text:
-            return b""
-            
-        layers, rows, cols = [], [], []
-        for c in text:
-            idx = self.CUBE.index(c)
-            layers.append(idx // 9)
-            rows.append((idx % 9) // 3)
-            cols.append(idx % 3)
-            
-        # Fractionation: Concatenate layers, rows, cols
-        combined = layers + rows + cols
-        
-        result = []
-        for i in range(0, len(combined), 3):
-            # Map triplets back to chars
-            idx = combined[i] * 9 + combined[i+1] * 3 + combined[i+2]
-            result.append(self.CUBE[idx])
-            
-        return ''.join(result).encode('utf-8')
+        text = bytes(data).translate(fold, strip)
+        # Fractionation: Concatenate layers, rows, cols, then read triplets
+        combined = b''.join(text.translate(table) for table in coords)
+        return _from_coords(letters, 3, combined[0::3], combined[1::3], combined[2::3])
 
     def decrypt(self, data: bytes, password: str) -> bytes:
-        text = data.decode('utf-8', errors='replace').upper()
-        text = ''.join(c for c in text if c in self.CUBE)
-        coords = []
-        for c in text:
-            idx = self.CUBE.index(c)
-            coords.extend([idx // 9, (idx % 9) // 3, idx % 3])
+        fold, strip, coords, letters = _grid_tables(self.CUBE, 3, '')
+        text = bytes(data).translate(fold, strip)
         n = len(text)
-        layers = coords[:n]
-        rows = coords[n:2 * n]
-        cols = coords[2 * n:3 * n]
-        result = []
-        for l, r, c in zip(layers, rows, cols):
-            result.append(self.CUBE[l * 9 + r * 3 + c])
-        return ''.join(result).encode('utf-8')
+        triplets = bytearray(3 * n)
+        for i, table in enumerate(coords):
+            triplets[i::3] = text.translate(table)
+        return _from_coords(letters, 3, triplets[:n], triplets[n:2 * n], triplets[2 * n:])
+
+
+@lru_cache(maxsize=None)
+def _polybius_tables(square: str):
+    """
+    Builds the Polybius square tables: `fold` upper-cases and writes J as
+    I, `tokens` maps every byte to its coordinate pair ('11'-'55') or to
+    itself, and `letters` maps coordinate pairs back to letters.
+    """
+    fold, _, rows, cols, _ = _fractionation_tables(square, '12345', 'JI')
+    tokens = [bytes([b]) for b in range(256)]
+    letters = {}
+    for char in square.encode('ascii'):
+        pair = bytes([rows[char], cols[char]])
+        tokens[char] = pair
+        letters[pair] = bytes([char])
+    return fold, tuple(tokens), letters
+
+
+@lru_cache(maxsize=None)
+def _tap_tables(grid: str):
+    """
+    Builds the tap code tables: `fold` upper-cases and writes K as C and J
+    as I, `strip` lists the bytes that are dropped (everything but grid
+    letters and spaces), and `tokens` maps a kept byte to its dot groups.
+    """
+    fold, _, _, _, _ = _fractionation_tables(grid, '12345', 'JI')
+    fold = bytearray(fold)
+    fold[ord('K')] = fold[ord('k')] = ord('C')
+    fold = bytes(fold)
+    grid_bytes = grid.encode('ascii')
+    strip = bytes(b for b in range(256) if fold[b] not in grid_bytes and fold[b] != ord(' '))
+    tokens = [b''] * 256
+    tokens[ord(' ')] = b'/'
+    for idx, char in enumerate(grid_bytes):
+        tokens[char] = b'.' * (idx // 5 + 1) + b' ' + b'.' * (idx % 5 + 1)
+    return fold, strip, tuple(tokens)
+
+
+@lru_cache(maxsize=None)
+def _grid_tables(alphabet: str, size: int, merge: str):
+    """
+    Builds the byte-level tables for a fractionating cipher over a square
+    (size 5) or cube (size 3) of letters.
+
+    Returns a (fold, strip, coords, letters) tuple: `fold` and `strip`
+    normalise text to alphabet bytes, `coords` holds one table per axis
+    mapping an alphabet byte to its coordinate (most significant axis
+    first), and `letters` maps a flat index back to its alphabet byte.
+    """
+    fold = bytearray(range(256))
+    fold[ord('a'):ord('z') + 1] = bytes(range(ord('A'), ord('Z') + 1))
+    if merge:
+        fold[ord(merge[0])] = fold[ord(merge[0].lower())] = ord(merge[1])
+    fold = bytes(fold)
+    alphabet_bytes = alphabet.encode('ascii')
+    strip = bytes(b for b in range(256) if fold[b] not in alphabet_bytes)
+    axes = 2 if size == 5 else 3
+    coords = [bytearray(256) for _ in range(axes)]
+    for idx, char in enumerate(alphabet_bytes):
+        for axis in range(axes):
+            coords[axis][char] = idx // size ** (axes - 1 - axis) % size
+    letters = alphabet_bytes + bytes(256 - len(alphabet_bytes))
+    return fold, strip, tuple(bytes(table) for table in coords), letters
+
+
+def _from_coords(letters: bytes, size: int, *axes: bytes) -> bytes:
+    """Letters at the coordinates given per axis (most significant first)."""
+    index = axes[0]
+    for axis in axes[1:]:
+        index = bytes(map(add, map(size.__mul__, index), axis))
+    return bytes(index).translate(letters)
+
+
+@lru_cache(maxsize=64)
+def _column_layout(key: str, length: int):
+    """
+    Computes the columnar transposition layout for a key and message length.
+
+    Returns the column read order (stable sort of the key characters) and,
+    for every original column index, its (start, end) slice in the ciphertext.
+    """
+    width = len(key)
+    order = tuple(sorted(range(width), key=lambda k: key[k]))
+    num, rem = divmod(length, width)
+    spans = [None] * width
+    start = 0
+    for col in order:
+        end = start + num + (1 if col < rem else 0)
+        spans[col] = (start, end)
+        start = end
+    return order, tuple(spans)
+
+
+@lru_cache(maxsize=None)
+def _fractionation_tables(square: str, labels: str, merge: str):
+    """
+    Builds the byte-level lookup tables for an ADFGX-style Polybius square.
+
+    Returns a (fold, strip, rows, cols, pairs) tuple where `fold` upper-cases
+    and applies letter merges, `strip` lists every byte that is not in the
+    square, `rows`/`cols` map a square byte to its row/column label and
+    `pairs` maps a native-endian 16-bit label pair back to its square byte
+    (0 for pairs that are not valid labels).
+    """
+    size = len(labels)
+    fold = bytearray(range(256))
+    fold[ord('a'):ord('z') + 1] = bytes(range(ord('A'), ord('Z') + 1))
+    if merge:
+        fold[ord(merge[0])] = fold[ord(merge[0].lower())] = ord(merge[1])
+    fold = bytes(fold)
+    square_bytes = square.encode('ascii')
+    strip = bytes(b for b in range(256) if fold[b] not in square_bytes)
+
+    rows = bytearray(range(256))
+    cols = bytearray(range(256))
+    pairs = bytearray(1 << 16)
+    for idx, char in enumerate(square_bytes):
+        row_label, col_label = labels[idx // size], labels[idx % size]
+        rows[char], cols[char] = ord(row_label), ord(col_label)
+        pair = (row_label + col_label).encode('ascii')
+        pairs[int.from_bytes(pair, sys.byteorder)] = char
+    return fold, strip, bytes(rows), bytes(cols), bytes(pairs)
 
 
 class ADFGXCipherLogic(EncryptionLogic):
     SQUARE = 'ABCDEFGHIKLMNOPQRSTUVWXYZ' # I/J combined
     LABELS = 'ADFGX'
+    MERGE = 'JI' # J is written as I
 
     @property
     def name(self) -> str:
@@ -187,111 +253,106 @@ class ADFGXCipherLogic(EncryptionLogic):
     def description(self) -> str:
         return "ADFGX cipher (Polybius + Transposition)"
 
+    def _tables(self):
+        return _fractionation_tables(self.SQUARE, self.LABELS, self.MERGE)
+
     def encrypt(self, data: bytes, password: str) -> bytes:
         if not password:
-             raise ValueError("Password is required for ADFGX")
-        
-        # 1. Polybius Substitution
-        text = data.decode('utf-8', errors='replace').upper().replace('J', 'I')
-        fractionated = []
-        for c in text:
-            if c in self.SQUARE:
-                idx = self.SQUARE.index(c)
-                row, col = idx // 5, idx % 5
-                fractionated.append(self.LABELS[row] + self.LABELS[col])
-        
-        fractionated_str = ''.join(fractionated)
-        if not fractionated_str:
+             raise ValueError(f"Password is required for {self.name.upper()}")
+
+        # 1. Polybius Substitution: every square letter becomes a label pair.
+        fold, strip, rows, cols, _ = self._tables()
+        text = bytes(data).translate(fold, strip)
+        if not text:
             return b""
+        fractionated = bytearray(2 * len(text))
+        fractionated[0::2] = text.translate(rows)
+        fractionated[1::2] = text.translate(cols)
 
-        # 2. Columnar Transposition
+        # 2. Columnar Transposition: column i of a grid of width len(key) is
+        # simply every len(key)-th label starting at i, read off in key order.
         key = password.upper()
-        # Remove duplicates from key for column ordering? Standard ADFGX usually implies unique key chars or standard sort logic.
-        # We'll use standard columnar transposition logic:
-        # Create grid with width = len(key)
-        
-        # Sort key to determine column read order
-        # If key has duplicates, we keep original order of occurrence or sort? 
-        # Standard: sort key chars. If duplicates, use standard stable sort.
-        key_indices = sorted(range(len(key)), key=lambda k: key[k])
-        
-        cols = [''] * len(key)
-        for i, char in enumerate(fractionated_str):
-            col_idx = i % len(key)
-            cols[col_idx] += char
-            
-        # Read off columns in sorted key order
-        result = []
-        for i in key_indices:
-            result.append(cols[i])
-            
-        return ' '.join(result).encode('utf-8') # Space separated for readability? Or combined. Standard is grouped. I'll group by space.
+        order, _ = _column_layout(key, len(fractionated))
+        width = len(key)
+        return b' '.join(fractionated[i::width] for i in order) # Columns grouped by space.
 
     def decrypt(self, data: bytes, password: str) -> bytes:
         if not password:
             raise ValueError("Password is required")
-            
-        ciphertext = data.decode('utf-8', errors='replace').replace(' ', '')
+
+        ciphertext = bytes(data).translate(None, b' \t\r\n\x0b\x0c')
         key = password.upper()
-        L = len(ciphertext)
-        K = len(key)
-        
-        # Calculate column lengths
-        # N full columns, M remainder
-        num, rem = divmod(L, K)
-        
-        # Determine column lengths based on key index
-        # Columns 0..rem-1 get num+1 chars, others get num chars?
-        # Only if we filled 0..K. We filled row by row.
-        # So yes, first 'rem' columns in the original grid (0..rem-1) have num+1.
-        
-        col_lengths = [num + 1 if i < rem else num for i in range(K)]
-        
-        # But we must associate these lengths with the SORTED key columns.
-        # Wait. When encrypting, we filled col 0, 1, 2... sequentially row by row.
-        # Then we read out based on sorted key.
-        # So if key is encryption order, say key="BAC":
-        # Indices: B(0), A(1), C(2). Sorted: A(1), B(0), C(2).
-        # We read col 1, then col 0, then col 2.
-        # To decrypt, we have the ciphertext which is col 1 + col 0 + col 2.
-        # We need to cut it into chunks.
-        # The length of col 1 depends on its original index (1).
-        # The length of col 0 depends on its original index (0).
-        
-        key_indices = sorted(range(K), key=lambda k: key[k])
-        
-        # Reconstruct columns
-        cols = [''] * K
-        start = 0
-        for k_idx in key_indices:
-            # How long is this column? It corresponds to original index k_idx
-            length = col_lengths[k_idx]
-            cols[k_idx] = ciphertext[start:start+length]
-            start += length
-            
-        # Read off row by row
-        plain_fragment = []
-        # Max length of any column is num+1
-        max_len = num + 1 if rem > 0 else num
-        for row in range(max_len):
-            for col_idx in range(K):
-                if row < len(cols[col_idx]):
-                    plain_fragment.append(cols[col_idx][row])
-                    
-        fractionated_str = ''.join(plain_fragment)
-        
-        # Reverse Polybius
-        result = []
-        for i in range(0, len(fractionated_str), 2):
-            if i+1 < len(fractionated_str):
-                r_char = fractionated_str[i]
-                c_char = fractionated_str[i+1]
-                if r_char in self.LABELS and c_char in self.LABELS:
-                    r = self.LABELS.index(r_char)
-                    c = self.LABELS.index(c_char)
-                    result.append(self.SQUARE[r*5 + c])
-                    
-        return ''.join(result).encode('utf-8')
+        width = len(key)
+        _, spans = _column_layout(key, len(ciphertext))
+
+        # Scatter each ciphertext column back to its grid positions.
+        fractionated = bytearray(len(ciphertext))
+        for col, (start, end) in enumerate(spans):
+            fractionated[col::width] = ciphertext[start:end]
+
+        # Reverse Polybius: look up label pairs, dropping invalid ones.
+        pairs = self._tables()[4]
+        even = len(fractionated) & ~1
+        coords = memoryview(fractionated)[:even].cast('H')
+        return bytes(map(pairs.__getitem__, coords)).translate(None, b'\x00')
+
+
+class ADFGVXCipherLogic(ADFGXCipherLogic):
+    SQUARE = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+    LABELS = 'ADFGVX'
+    MERGE = ''
+
+    @property
+    def name(self) -> str:
+        return "adfgvx"
+
+    @property
+    def description(self) -> str:
+        return "ADFGVX cipher (6x6 Polybius with digits + Transposition)"
+
+
+# Token values used while parsing the decimal format. Every valid cipher
+# value is at most 110, so both markers are free.
+NIHILIST_SKIP = 255     # Token is not an integer; dropped without output
+NIHILIST_INVALID = 254  # Integer outside the byte range; decodes to '?'
+NIHILIST_TOKENS = tuple(b'%d' % v for v in range(256))
+NIHILIST_VALUES = {token: v for v, token in enumerate(NIHILIST_TOKENS[:NIHILIST_INVALID])}
+
+
+@lru_cache(maxsize=None)
+def _nihilist_tables(square: str):
+    """
+    Builds the byte-level tables for the Nihilist cipher.
+
+    Returns a (fold, strip, coords) tuple: `fold` and `strip` normalise
+    text to square letters, `coords` maps a square byte to its Polybius
+    coordinate value (11-55).
+    """
+    fold, strip, _, _, _ = _fractionation_tables(square, '12345', 'JI')
+    coords = bytearray(256)
+    for idx, char in enumerate(square.encode('ascii')):
+        coords[char] = (idx // 5 + 1) * 10 + (idx % 5 + 1)
+    return fold, strip, bytes(coords)
+
+
+@lru_cache(maxsize=None)
+def _nihilist_add_table(key_val: int) -> bytes:
+    """Translation table adding one key coordinate to a plaintext coordinate."""
+    return bytes((v + key_val) & 0xFF for v in range(256))
+
+
+@lru_cache(maxsize=None)
+def _nihilist_sub_table(square: str, key_val: int) -> bytes:
+    """
+    Translation table mapping a cipher value back to its square letter for
+    one key coordinate. Values without a letter become '?', and the
+    NIHILIST_SKIP marker becomes 0 so it can be deleted afterwards.
+    """
+    rev_square = {(idx // 5 + 1) * 10 + (idx % 5 + 1): ord(char)
+                  for idx, char in enumerate(square)}
+    table = bytearray(rev_square.get(v - key_val, ord('?')) for v in range(256))
+    table[NIHILIST_SKIP] = 0
+    return bytes(table)
 
 
 class NihilistCipherLogic(EncryptionLogic):
@@ -305,75 +366,83 @@ class NihilistCipherLogic(EncryptionLogic):
     def description(self) -> str:
         return "Nihilist cipher (Polybius + Key addition)"
 
-    def _get_coords(self, text: str):
-        coords = []
-        for c in text:
-            if c in self.SQUARE:
-                idx = self.SQUARE.index(c)
-                # Polybius 11-55
-                val = (idx // 5 + 1) * 10 + (idx % 5 + 1)
-                coords.append(val)
-        return coords
+    def _get_coords(self, text: bytes) -> bytes:
+        """Polybius coordinates (11-55) of the square letters in text, one per byte."""
+        fold, strip, coords = _nihilist_tables(self.SQUARE)
+        return bytes(text).translate(fold, strip).translate(coords)
+
+    def _key_coords(self, password: str) -> bytes:
+        key_coords = self._get_coords(password.encode('utf-8'))
+        # Fallback key if invalid chars
+        return key_coords or bytes([11])
+
+    def _format(self, values: bytes) -> bytes:
+        """Serialises the additive stage: space separated decimal numbers."""
+        return b' '.join(map(NIHILIST_TOKENS.__getitem__, values))
+
+    def _parse(self, data: bytes) -> bytes:
+        """Parses the additive stage back into one value byte per token."""
+        parts = bytes(data).split()
+        values = bytes(map(NIHILIST_VALUES.get, parts, repeat(NIHILIST_INVALID)))
+        if NIHILIST_INVALID not in values:
+            return values
+        # Slow path for non-canonical tokens (e.g. '011', '+5' or words)
+        parsed = bytearray(values)
+        for i, p in enumerate(parts):
+            if parsed[i] != NIHILIST_INVALID or p in NIHILIST_VALUES:
+                continue
+            try:
+                val = int(p)
+            except ValueError:
+                parsed[i] = NIHILIST_SKIP
+                continue
+            parsed[i] = val if 0 <= val < NIHILIST_INVALID else NIHILIST_INVALID
+        return bytes(parsed)
 
     def encrypt(self, data: bytes, password: str) -> bytes:
         if not password:
              raise ValueError("Password required")
-        
-        text = data.decode('utf-8', errors='replace').upper().replace('J', 'I')
-        # Get coordinates for plaintext
-        plain_coords = self._get_coords(text)
-        
-        # Get coordinates for key
-        key = password.upper().replace('J','I')
-        key_coords = self._get_coords(key)
-        if not key_coords:
-             # Fallback key if invalid chars
-             key_coords = [11] 
-             
-        # Add them
-        result = []
+
+        plain_coords = self._get_coords(data)
+        key_coords = self._key_coords(password)
+
+        # Add the key coordinate for each key position with one translate
+        # over the matching strided slice of the plaintext coordinates.
         k_len = len(key_coords)
-        for i, val in enumerate(plain_coords):
-             k_val = key_coords[i % k_len]
-             result.append(str(val + k_val))
-             
-        return ' '.join(result).encode('utf-8')
+        result = bytearray(len(plain_coords))
+        for i, k_val in enumerate(key_coords):
+            result[i::k_len] = plain_coords[i::k_len].translate(_nihilist_add_table(k_val))
+        return self._format(result)
 
     def decrypt(self, data: bytes, password: str) -> bytes:
         if not password:
              raise ValueError("Password required")
-             
-        parts = data.decode('utf-8', errors='replace').split()
-        key = password.upper().replace('J','I')
-        key_coords = self._get_coords(key)
-        if not key_coords:
-             key_coords = [11]
-             
+
+        values = self._parse(data)
+        key_coords = self._key_coords(password)
+
+        # Cipher value = plain + key, so subtract per key position
         k_len = len(key_coords)
-        result = []
-        
-        # Reverse mapping for coords to char
-        # e.g. 11 -> A
-        rev_square = {}
-        for idx, char in enumerate(self.SQUARE):
-             val = (idx // 5 + 1) * 10 + (idx % 5 + 1)
-             rev_square[val] = char
-             
-        for i, p in enumerate(parts):
-            try:
-                # Cipher value = plain + key
-                # plain = cipher - key
-                c_val = int(p)
-                k_val = key_coords[i % k_len]
-                plain_val = c_val - k_val
-                
-                if plain_val in rev_square:
-                    result.append(rev_square[plain_val])
-                else:
-                    # Should not happen in valid cipher, maybe output '?' or raw
-                    result.append('?') 
-            except ValueError:
-                pass
-                
-        return ''.join(result).encode('utf-8')
+        result = bytearray(len(values))
+        for i, k_val in enumerate(key_coords):
+            result[i::k_len] = values[i::k_len].translate(_nihilist_sub_table(self.SQUARE, k_val))
+        return bytes(result).translate(None, b'\x00')
+
+
+class NihilistPackedCipherLogic(NihilistCipherLogic):
+    """Nihilist cipher storing each additive value as a single byte."""
+
+    @property
+    def name(self) -> str:
+        return "nihilistpacked"
+
+    @property
+    def description(self) -> str:
+        return "Nihilist cipher with packed binary output (1 byte per letter)"
+
+    def _format(self, values: bytes) -> bytes:
+        return bytes(values)
 
+    def _parse(self, data: bytes) -> bytes:
+        # Every byte is a value; the markers cannot appear in valid output
+        return bytes(data).replace(bytes([NIHILIST_SKIP]), bytes([NIHILIST_INVALID]))
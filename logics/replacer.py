@@ -0,0 +1,170 @@
+import hashlib
+import os
+import re
+from typing import Dict, Iterable, Optional
+from config import CACHE_DIR
+from logics.base import StreamTransform
+
+# Compiled rule sets, one file per rules-file digest and direction.
+REPLACE_CACHE_DIR = os.path.join(CACHE_DIR, 'replace')
+PATTERN_MAGIC = b"CFR1"
+
+
+def parse_rules(text: bytes) -> Dict[bytes, bytes]:
+    """
+    Rules file -> {pattern: replacement}: one 'old:new' rule per line
+    (split at the first ':', or at a tab when the line has one, for
+    patterns containing ':'). Blank lines are skipped; a later rule for the
+    same pattern wins.
+    """
+    rules = {}
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        separator = b"\t" if b"\t" in line else b":"
+        if separator not in line:
+            raise ValueError(f"Rule on line {number} has no ':' separator")
+        old, new = line.split(separator, 1)
+        if not old:
+            raise ValueError(f"Rule on line {number} has an empty pattern")
+        rules[old] = new
+    return rules
+
+
+def reverse_rules(rules: Dict[bytes, bytes]) -> Dict[bytes, bytes]:
+    """Rules undoing rules; deletions (empty replacements) cannot be undone and are dropped."""
+    return {new: old for old, new in rules.items() if new}
+
+
+def _node_pattern(node: dict) -> bytes:
+    # Chains of single children become one literal run
+    run = bytearray()
+    while len(node) == 1 and None not in node:
+        ((byte, node),) = node.items()
+        run.append(byte)
+    prefix = re.escape(bytes(run))
+    branches = [re.escape(bytes([byte])) + _node_pattern(child)
+                for byte, child in sorted(item for item in node.items() if item[0] is not None)]
+    if not branches:
+        return prefix
+    if len(branches) == 1 and None not in node:
+        return prefix + branches[0]
+    group = b"(?:" + b"|".join(branches) + b")"
+    # Greedy: a longer pattern wins, the one ending here is the fallback
+    return prefix + group + (b"?" if None in node else b"")
+
+
+def trie_pattern(patterns: Iterable[bytes]) -> bytes:
+    """
+    Regular expression matching any of patterns, leftmost-longest, shaped
+    as their trie: at each position the engine follows one path of byte
+    comparisons instead of trying every pattern in turn.
+    """
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for byte in pattern:
+            node = node.setdefault(byte, {})
+        node[None] = {}
+    return _node_pattern(trie)
+
+
+class Replacer:
+    """Replaces every occurrence of many literal patterns in one pass."""
+
+    def __init__(self, rules: Dict[bytes, bytes], source: Optional[bytes] = None):
+        self.rules = rules
+        # Bytes of lookahead a streaming pass must keep to see any match whole
+        self.longest = max(map(len, rules), default=0)
+        self.regex = None
+        if rules:
+            self.regex = re.compile(trie_pattern(rules) if source is None else source)
+
+    def _replacement(self, match) -> bytes:
+        return self.rules[match.group()]
+
+    def sub(self, data: bytes) -> bytes:
+        return self.regex.sub(self._replacement, data) if self.regex else bytes(data)
+
+
+def _read_pattern(path: str) -> Optional[bytes]:
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    return data[len(PATTERN_MAGIC):] if data.startswith(PATTERN_MAGIC) else None
+
+
+def _write_pattern(path: str, source: bytes) -> None:
+    """Atomic, like the quadgram table: readers see the old file or the new one."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(PATTERN_MAGIC)
+        f.write(source)
+    os.replace(tmp_path, path)
+
+
+def load_replacer(path: str, reverse: bool = False, cache_dir: Optional[str] = None) -> Replacer:
+    """
+    Replacer for a rules file (reversed for decryption). The compiled
+    pattern is cached in cache_dir (default REPLACE_CACHE_DIR) under the
+    SHA-256 of the file, so an unchanged rules file is only turned into a
+    trie once.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Rules file not found: {path}")
+    with open(path, 'rb') as f:
+        text = f.read()
+    rules = parse_rules(text)
+    if reverse:
+        rules = reverse_rules(rules)
+    if not rules:
+        return Replacer(rules)
+    digest = hashlib.sha256(text).hexdigest()
+    cache_path = os.path.join(cache_dir or REPLACE_CACHE_DIR, f"{digest}{'-reverse' if reverse else ''}.re")
+    source = _read_pattern(cache_path)
+    if source is None:
+        source = trie_pattern(rules)
+        _write_pattern(cache_path, source)
+    return Replacer(rules, source)
+
+
+class ReplaceTransform(StreamTransform):
+    """
+    Streams input through a Replacer. The last longest-1 bytes of each
+    chunk are carried over, so matches spanning chunk boundaries are
+    found; output is identical to one sub() over the whole input.
+    """
+
+    def __init__(self, replacer: Replacer):
+        self._replacer = replacer
+        self._carry = b""
+
+    def update(self, chunk: bytes) -> bytes:
+        data = self._carry + chunk if self._carry else bytes(chunk)
+        regex, rules = self._replacer.regex, self._replacer.rules
+        if regex is None:
+            return data
+        # A match starting before cut lies entirely inside data, so the
+        # longest one at that position is already known
+        cut = len(data) - self._replacer.longest + 1
+        if cut <= 0:
+            self._carry = data
+            return b""
+        out, pos = [], 0
+        for match in regex.finditer(data):
+            if match.start() >= cut:
+                break
+            out.append(data[pos:match.start()])
+            out.append(rules[match.group()])
+            pos = match.end()
+        end = max(pos, cut)
+        out.append(data[pos:end])
+        self._carry = data[end:]
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        carry, self._carry = self._carry, b""
+        return self._replacer.sub(carry)
@@ -0,0 +1,205 @@
+import codecs
+import re
+from typing import Callable, Dict, Optional
+from logics.base import EncryptionLogic, StreamTransform
+
+ASCII_WHITESPACE = b' \t\n\r\x0b\x0c'
+
+
+def keep_token(token: bytes) -> bytes:
+    """decode_unknown policy that passes unknown tokens through unchanged."""
+    return token
+
+
+class TokenCodec:
+    """
+    Table-driven codec between characters and delimited code tokens
+    (Morse, NATO, Baudot, Bacon, ...).
+
+    The character->token table is compiled once into a 256-entry
+    byte->token list for encoding and a token->bytes dict for decoding, so
+    both directions run as C-level map/join over bytes instead of a Python
+    loop per character. Only non-ASCII input takes the slower UTF-8 path.
+
+    Args:
+        table: Mapping of single characters to their code tokens.
+        separator: Joins the tokens of the encoded output.
+        fold_case: Upper-cases input characters before lookup.
+        encode_unknown: Called with a character missing from the table and
+            returns its token; unknown characters are dropped if None.
+        delimiter: Exact token delimiter for decoding, or None to split on
+            any run of whitespace.
+        width: Decode fixed-width groups (whitespace ignored) instead of
+            delimited tokens.
+        fold_tokens: Matches tokens case-insensitively when decoding.
+        decode_unknown: Called with a token missing from the table and
+            returns its replacement; unknown tokens are dropped if None.
+        binary: The table covers all 256 byte values (keyed by chr(byte))
+            and input is encoded byte by byte instead of as UTF-8 text.
+    """
+
+    def __init__(self, table: Dict[str, str], separator: str = ' ',
+                 fold_case: bool = True,
+                 encode_unknown: Optional[Callable[[str], str]] = None,
+                 delimiter: Optional[str] = ' ', width: Optional[int] = None,
+                 fold_tokens: bool = False,
+                 decode_unknown: Optional[Callable[[bytes], bytes]] = None,
+                 binary: bool = False):
+        self.table = table
+        self.separator = separator.encode('utf-8')
+        self.fold_case = fold_case
+        self.encode_unknown = encode_unknown
+        self.delimiter = delimiter.encode('utf-8') if delimiter is not None else None
+        self.width = width
+        self.fold_tokens = fold_tokens
+        self.decode_unknown = decode_unknown
+        self.binary = binary
+
+        # Encoding: separator + token for every ASCII byte value, in the
+        # form codecs.charmap_encode expects. In text mode bytes >= 0x80
+        # start UTF-8 sequences and are handled per character instead.
+        self._encode_table = {b: self._encode_char(chr(b)) for b in range(256 if binary else 0x80)}
+        self._value_encoding = 'latin-1' if binary else 'utf-8'
+
+        # Decoding: later table entries win, like a {v: k} comprehension.
+        # Case-insensitive tables also hold the exact, upper and lower case
+        # spellings so the common cases never need folding.
+        self._decode_table = {}
+        for char, token in table.items():
+            value = char.encode(self._value_encoding)
+            spellings = (token, token.upper(), token.lower()) if fold_tokens else (token,)
+            for key in spellings:
+                self._decode_table[key.encode('utf-8')] = value
+        if binary:
+            self._byte_values = {key: value[0] for key, value in self._decode_table.items()}
+        if width:
+            self._groups = re.compile(b'.{%d}' % width, re.S)
+
+    def _encode_char(self, char: str) -> bytes:
+        """Separator + token for one character, or b'' if it is dropped."""
+        if self.fold_case and not self.binary:
+            char = char.upper()
+        token = self.table.get(char)
+        if token is None and self.encode_unknown is not None:
+            token = self.encode_unknown(char)
+        return self.separator + token.encode('utf-8') if token else b''
+
+    def encoder(self) -> StreamTransform:
+        return _TokenEncoder(self)
+
+    def decoder(self) -> StreamTransform:
+        return _TokenDecoder(self)
+
+    def encode(self, data: bytes) -> bytes:
+        enc = self.encoder()
+        return enc.update(data) + enc.finalize()
+
+    def decode(self, data: bytes) -> bytes:
+        dec = self.decoder()
+        return dec.update(data) + dec.finalize()
+
+    def _decode_tokens(self, tokens) -> bytes:
+        table = self._decode_table
+        if self.decode_unknown is keep_token and not self.fold_tokens:
+            return b''.join(map(table.get, tokens, tokens))
+        try:
+            # Fast path: every token is in the table
+            if self.binary:
+                return bytes(map(self._byte_values.__getitem__, tokens))
+            return b''.join(map(table.__getitem__, tokens))
+        except KeyError:
+            pass
+        unknown = self.decode_unknown or (lambda token: b'')
+        values = []
+        for token in tokens:
+            key = token if token in table or not self.fold_tokens else token.upper()
+            values.append(table[key] if key in table else unknown(token))
+        return b''.join(values)
+
+
+class _TokenEncoder(StreamTransform):
+    def __init__(self, codec: TokenCodec):
+        self._codec = codec
+        self._text = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._started = False
+
+    def _encode(self, chunk: bytes, final: bool = False) -> bytes:
+        """Encodes a chunk to tokens, each preceded by the separator."""
+        codec = self._codec
+        if codec.binary or (chunk.isascii() and not self._text.getstate()[0]):
+            # Fast path: every byte maps straight through the table
+            return codecs.charmap_encode(chunk.decode('latin-1'), 'strict', codec._encode_table)[0]
+        # Non-ASCII text: decode (carrying partial UTF-8 sequences across
+        # chunks) and look characters up one by one.
+        text = self._text.decode(chunk, final)
+        if codec.fold_case:
+            text = text.upper()
+        table = codec._encode_table
+        return b''.join([table[ord(c)] if c < '\x80' else codec._encode_char(c) for c in text])
+
+    def _emit(self, out: bytes) -> bytes:
+        # Drop the separator in front of the very first token
+        if out and not self._started:
+            self._started = True
+            return out[len(self._codec.separator):]
+        return out
+
+    def update(self, chunk: bytes) -> bytes:
+        return self._emit(self._encode(bytes(chunk)))
+
+    def finalize(self) -> bytes:
+        if not self._text.getstate()[0]:
+            return b""
+        return self._emit(self._encode(b"", final=True))
+
+
+class _TokenDecoder(StreamTransform):
+    def __init__(self, codec: TokenCodec):
+        self._codec = codec
+        self._carry = b""
+
+    def update(self, chunk: bytes) -> bytes:
+        codec = self._codec
+        data = self._carry + bytes(chunk)
+        if codec.width:
+            # Fixed-width groups: keep the incomplete tail for the next chunk
+            data = data.translate(None, ASCII_WHITESPACE)
+            cut = len(data) - len(data) % codec.width
+            self._carry = data[cut:]
+            return codec._decode_tokens(codec._groups.findall(data, 0, cut))
+        if codec.delimiter is None:
+            tokens = data.split()
+            self._carry = tokens.pop() if tokens and not data[-1:].isspace() else b""
+        else:
+            tokens = data.split(codec.delimiter)
+            self._carry = tokens.pop()
+        return codec._decode_tokens(tokens)
+
+    def finalize(self) -> bytes:
+        codec = self._codec
+        carry, self._carry = self._carry, b""
+        if codec.width:
+            return b""  # A trailing partial group carries no symbol
+        if codec.delimiter is None and not carry:
+            return b""
+        return codec._decode_tokens([carry])
+
+
+class TokenCodecLogic(EncryptionLogic):
+    """
+    Base class for logics that are a plain TokenCodec: subclasses provide
+    name, description and a CODEC class attribute.
+    """
+    CODEC: TokenCodec = None
+
+    def encrypt(self, data: bytes, password: str) -> bytes:
+        return self.CODEC.encode(data)
+
+    def decrypt(self, data: bytes, password: str) -> bytes:
+        return self.CODEC.decode(data)
+
+    def encryptor(self, password: str) -> StreamTransform:
+        return self.CODEC.encoder()
+
+    def decryptor(self, password: str) -> StreamTransform:
+        return self.CODEC.decoder()
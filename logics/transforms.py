@@ -1,4 +1,11 @@
-from logics.base import EncryptionLogic
+import os
+from typing import BinaryIO
+from logics.base import DEFAULT_CHUNK_SIZE, EncryptionLogic, StreamTransform
+from logics.replacer import (Replacer, ReplaceTransform, load_replacer, parse_rules,
+                             reverse_rules)
+from logics.tokens import TokenCodec
+from functools import lru_cache
+import string
 
 class ReverseLogic(EncryptionLogic):
     @property
@@ -15,6 +22,41 @@ class ReverseLogic(EncryptionLogic):
     def decrypt(self, data: bytes, password: str) -> bytes:
         return data[::-1]
 
+    def encrypt_stream(self, src: BinaryIO, dst: BinaryIO, password: str,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """
+        Seekable input is read backwards one block at a time into a single
+        reused buffer, reversed in place and written forwards, so memory
+        stays at one block. Other streams are buffered whole.
+        """
+        try:
+            start = src.tell()
+            end = src.seek(0, os.SEEK_END)
+        except (AttributeError, OSError, ValueError):
+            super().encrypt_stream(src, dst, password, chunk_size)
+            return
+        buffer = bytearray(min(chunk_size, end - start))
+        view = memoryview(buffer)
+        position = end
+        while position > start:
+            size = min(len(buffer), position - start)
+            position -= size
+            src.seek(position)
+            # Only the block at the start of the input is shorter
+            block = view if size == len(buffer) else memoryview(bytearray(size))
+            done = 0
+            while done < size:
+                read = src.readinto(block[done:])
+                if not read:
+                    raise ValueError("Input file shrank while being reversed")
+                done += read
+            block.obj.reverse()
+            dst.write(block)
+
+    def decrypt_stream(self, src: BinaryIO, dst: BinaryIO, password: str,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self.encrypt_stream(src, dst, password, chunk_size)
+
 
 class CaseTransformLogic(EncryptionLogic):
     @property
@@ -50,29 +92,84 @@ class BitwiseXorLogic(EncryptionLogic):
 
 
 class ReplaceLogic(EncryptionLogic):
+    """
+    Literal find-and-replace. The password is one 'old:new' rule, or
+    '@path' naming a rules file of such lines (see logics/replacer.py);
+    all rules are applied in a single streaming pass, longest match first.
+    A value starting with '@' is only read as a path when that file
+    exists, so inline rules such as '@user:X' keep working.
+    Decryption applies the rules in reverse (new -> old), which is only
+    exact when no replacement also occurs in the original text.
+    """
+
     @property
     def name(self) -> str:
         return "replace"
 
     @property
     def description(self) -> str:
-        return "Replaces text (format: 'old:new' in password)"
+        return "Replaces text (password: 'old:new' or '@rules-file')"
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
+    def _replacer(self, password: str, reverse: bool) -> Replacer:
+        if password.startswith('@') and (os.path.exists(password[1:]) or ':' not in password):
+            return load_replacer(password[1:], reverse)
         if ':' not in password:
-            return data
-        old, new = password.split(':', 1)
-        text = data.decode('utf-8', errors='replace')
-        return text.replace(old, new).encode('utf-8')
+            return Replacer({})
+        rules = parse_rules(password.encode('utf-8'))
+        return Replacer(reverse_rules(rules) if reverse else rules)
+
+    def encryptor(self, password: str) -> StreamTransform:
+        return ReplaceTransform(self._replacer(password, reverse=False))
+
+    def decryptor(self, password: str) -> StreamTransform:
+        return ReplaceTransform(self._replacer(password, reverse=True))
+
+    def encrypt(self, data: bytes, password: str) -> bytes:
+        return self._replacer(password, reverse=False).sub(data)
 
     def decrypt(self, data: bytes, password: str) -> bytes:
-        if ':' not in password:
-            return data
-        old, new = password.split(':', 1)
-        text = data.decode('utf-8', errors='replace')
-        # To decrypt, we reverse the replacement (new -> old)
-        # Note: This is not perfect if 'new' contains 'old' or overlaps occur
-        return text.replace(new, old).encode('utf-8')
+        return self._replacer(password, reverse=True).sub(data)
+
+
+DIGITS = string.digits + string.ascii_lowercase
+# Fixed token widths for the standard computer bases
+NUMERAL_WIDTHS = {2: 8, 8: 3, 16: 2}
+
+
+def _base_repr(number: int, base: int) -> str:
+    """Helper to convert int to string in given base (2-36)."""
+    if number == 0:
+        return '0'
+    digits = []
+    while number:
+        number, digit = divmod(number, base)
+        digits.append(DIGITS[digit])
+    return ''.join(digits[::-1])
+
+
+@lru_cache(maxsize=None)
+def _numeral_codec(base: int) -> TokenCodec:
+    """
+    Token tables for one base: each byte value has a precomputed token.
+    Tokens are space separated; hex is read back in fixed-width pairs so
+    both '41 42' and '4142' decode.
+    """
+    width = NUMERAL_WIDTHS.get(base, 0)
+    table = {chr(b): _base_repr(b, base).rjust(width, '0') for b in range(256)}
+
+    def parse(token: bytes) -> bytes:
+        # Non-canonical tokens (e.g. upper case or extra zeros); invalid ones are skipped
+        try:
+            val = int(token, base)
+        except ValueError:
+            return b''
+        return bytes([val]) if 0 <= val < 256 else b''
+
+    if base == 16:
+        return TokenCodec(table, binary=True, width=2,
+                          fold_tokens=True, decode_unknown=parse)
+    return TokenCodec(table, binary=True, delimiter=None,
+                      fold_tokens=base > 10, decode_unknown=parse)
 
 
 class NumeralSystemLogic(EncryptionLogic):
@@ -82,68 +179,25 @@ class NumeralSystemLogic(EncryptionLogic):
 
     @property
     def description(self) -> str:
-        return "Convert to base N string (password=base, e.g. 2, 8, 16)"
+        return "Convert to base N string (password=base 2-36, e.g. 2, 8, 16)"
 
-    def encrypt(self, data: bytes, password: str) -> bytes:
+    def _codec(self, password: str) -> TokenCodec:
         try:
             base = int(password)
         except ValueError:
             base = 2  # Default to binary
-            
-        if base not in (2, 8, 10, 16):
-            # Fallback for unsupported bases or implement generic if needed
-            # For now, support standard computer bases
-            if base == 16:
-                return data.hex().encode('utf-8')
-            elif base == 10:
-                 return ' '.join(str(b) for b in data).encode('utf-8')
-        
-        result = []
-        for byte in data:
-            if base == 2:
-                result.append(f"{byte:08b}")
-            elif base == 8:
-                result.append(f"{byte:03o}")
-            elif base == 16: # explicit handling
-                result.append(f"{byte:02x}")
-            else:
-                # Generic base conversion (simple)
-                result.append(self._base_repr(byte, base))
-                
-        return ' '.join(result).encode('utf-8')
+        if not 2 <= base <= 36:
+            raise ValueError("Base must be between 2 and 36")
+        return _numeral_codec(base)
+
+    def encrypt(self, data: bytes, password: str) -> bytes:
+        return self._codec(password).encode(data)
 
     def decrypt(self, data: bytes, password: str) -> bytes:
-        try:
-            base = int(password)
-        except ValueError:
-            base = 2
-
-        text = data.decode('utf-8', errors='replace')
-        parts = text.split() if ' ' in text else [text[i:i+2] for i in range(0, len(text), 2)] if base==16 else text.split()
-        
-        # If split failed (e.g. no spaces in hex), handle hex specifically or assume spaces
-        if base == 16 and ' ' not in text:
-             try:
-                 return bytes.fromhex(text)
-             except:
-                 pass
-                 
-        result = bytearray()
-        for p in parts:
-            try:
-                val = int(p, base)
-                result.append(val)
-            except ValueError:
-                pass 
-        return bytes(result)
-
-    def _base_repr(self, number: int, base: int) -> str:
-        """Helper to convert int to string in given base."""
-        if number == 0:
-            return '0'
-        digits = []
-        while number:
-            digits.append(str(number % base))
-            number //= base
-        return ''.join(digits[::-1])
+        return self._codec(password).decode(data)
+
+    def encryptor(self, password: str) -> StreamTransform:
+        return self._codec(password).encoder()
 
+    def decryptor(self, password: str) -> StreamTransform:
+        return self._codec(password).decoder()
@@ -1,5 +1,9 @@
+import io
+import os
 import unittest
-from logics.aes import AESLogic
+from unittest import mock
+from logics import container
+from logics.aes import AESLogic, KeyCache
 
 class TestAESLogic(unittest.TestCase):
     def setUp(self):
@@ -34,6 +38,155 @@ class TestAESLogic(unittest.TestCase):
         corrupted = encrypted[:-5] + b"XXXXX"
         with self.assertRaises(ValueError):
             self.logic.decrypt(corrupted, self.password)
+    def test_key_cache(self):
+        """A cached logic derives each password's key once."""
+        self.logic.key_cache = KeyCache()
+        with mock.patch.object(AESLogic, "_derive_key", wraps=self.logic._derive_key) as derive:
+            first = self.logic.encrypt(self.data, self.password)
+            second = self.logic.encrypt(self.data, self.password)
+            self.assertEqual(self.logic.decrypt(first, self.password), self.data)
+            self.assertEqual(self.logic.decrypt(second, self.password), self.data)
+            self.assertEqual(derive.call_count, 1)
+        # Same session salt (in the header), fresh nonce (after the first record's length)
+        self.assertEqual(first[12:28], second[12:28])
+        self.assertNotEqual(first[36:48], second[36:48])
+        # Interoperable with an uncached instance
+        self.assertEqual(AESLogic().decrypt(first, self.password), self.data)
+        with self.assertRaises(ValueError):
+            self.logic.decrypt(first, "wrong_password")
+
+    def _stream(self, transform, data: bytes, size: int) -> bytes:
+        chunks = [transform.update(data[i:i + size]) for i in range(0, len(data), size)]
+        return b"".join(chunks) + transform.finalize()
+
+    def test_compression(self):
+        """Compression is recorded in the header and undone transparently."""
+        data = b'{"level": "info", "message": "request served"}\n' * 5000
+        for codec in ("zlib", "lzma"):
+            self.logic.compression = codec
+            encrypted = self.logic.encrypt(data, self.password)
+            header = container.Header.parse(encrypted)
+            self.assertEqual(header.compression, container.compression_id(codec))
+            self.assertLess(len(encrypted), len(data) // 10)
+            # Decryption needs no setting: the header says how
+            self.assertEqual(AESLogic().decrypt(encrypted, self.password), data)
+        # Incompressible input is stored as is
+        noise = os.urandom(200000)
+        encrypted = self.logic.encrypt(noise, self.password)
+        self.assertEqual(container.Header.parse(encrypted).compression, container.COMPRESSION_NONE)
+        self.assertEqual(self.logic.decrypt(encrypted, self.password), noise)
+        with self.assertRaises(ValueError):
+            self.logic.compression = "brotli"
+            self.logic.encrypt(data, self.password)
+
+    def test_segmented_stream(self):
+        """Output and decryption do not depend on how the input was chunked."""
+        self.logic.segment_size = 1000
+        self.logic.compression = "zlib"
+        data = (b"line of text %d\n" * 700) % tuple(range(700))
+        for size in (1, 999, 1000, 1001, len(data)):
+            encrypted = self._stream(self.logic.encryptor(self.password), data, size)
+            self.assertEqual(self._stream(self.logic.decryptor(self.password), encrypted, 7), data)
+        src, dst = io.BytesIO(data), io.BytesIO()
+        self.logic.encrypt_stream(src, dst, self.password, chunk_size=4096)
+        self.assertEqual(self.logic.decrypt(dst.getvalue(), self.password), data)
+
+    def test_segment_tampering(self):
+        """Reordered, dropped or truncated segments fail authentication."""
+        self.logic.segment_size = 100
+        data = bytes(range(256)) * 2
+        encrypted = self.logic.encrypt(data, self.password)
+        start = container.HEADER.size
+        record = container.RECORD.size + 12 + 100 + container.TAG_SIZE
+        first, second = encrypted[start:start + record], encrypted[start + record:start + 2 * record]
+        swapped = encrypted[:start] + second + first + encrypted[start + 2 * record:]
+        dropped = encrypted[:start] + encrypted[start + record:]
+        for bad in (swapped, dropped, encrypted[:-1], encrypted[:start + record], encrypted + b"x"):
+            with self.assertRaises(ValueError):
+                self.logic.decrypt(bad, self.password)
+
+    def test_legacy_format(self):
+        """Ciphertexts from before the container still decrypt."""
+        message = self.logic.batch_encryptor(self.password)(self.data)
+        self.assertEqual(self.logic.decrypt(message, self.password), self.data)
+        self.assertEqual(self._stream(self.logic.decryptor(self.password), message, 3), self.data)
+        encrypted = self.logic.encrypt(self.data, self.password)
+        self.assertEqual(self.logic.batch_decryptor(self.password)(encrypted), self.data)
+
+    def test_update_in_place(self):
+        """Only changed segments are rewritten; the result is a normal container."""
+        class Counting(io.BytesIO):
+            written = 0
+            def write(self, data):
+                self.written += len(data)
+                return super().write(data)
+
+        self.logic.segment_size = 1000
+        data = bytearray(os.urandom(50000))
+        dst = Counting()
+        index = self.logic.update_stream(io.BytesIO(data), dst, self.password)
+        self.assertEqual(self.logic.decrypt(dst.getvalue(), self.password), data)
+        record = container.RECORD.size + 12 + 1000 + container.TAG_SIZE
+        for use_index in (True, False):
+            data[20500:20510] = os.urandom(10)
+            dst.written = 0
+            index = self.logic.update_stream(io.BytesIO(data), dst, self.password,
+                                             index if use_index else None)
+            self.assertEqual(self.logic.decrypt(dst.getvalue(), self.password), data)
+            # The changed segment and the trailer
+            self.assertEqual(dst.written, record + container.TRAILER.size)
+        for new in (data + b"more", data[:12345], b"", bytes(data)):
+            index = self.logic.update_stream(io.BytesIO(new), dst, self.password, index)
+            self.assertEqual(self.logic.decrypt(dst.getvalue(), self.password), new)
+        before = dst.getvalue()
+        with self.assertRaises(ValueError):
+            self.logic.update_stream(io.BytesIO(b"other"), dst, "wrong_password")
+        self.assertEqual(dst.getvalue(), before)
+        with self.assertRaises(ValueError):
+            compressed = AESLogic()
+            compressed.compression = "zlib"
+            compressed.update_stream(io.BytesIO(data), io.BytesIO(), self.password)
+
+    def test_update_with_stale_index(self):
+        """An index newer than the file (rolled back) is not trusted."""
+        self.logic.segment_size = 1000
+        v1 = os.urandom(10000)
+        v2 = v1[:3000] + os.urandom(1000) + v1[4000:]
+        dst = io.BytesIO()
+        self.logic.update_stream(io.BytesIO(v1), dst, self.password)
+        old_file = dst.getvalue()
+        index = self.logic.update_stream(io.BytesIO(v2), dst, self.password)
+        # Roll the file back to v1, keep the v2 index, and update to v2 again
+        dst = io.BytesIO(old_file)
+        self.logic.update_stream(io.BytesIO(v2), dst, self.password, index)
+        self.assertEqual(self.logic.decrypt(dst.getvalue(), self.password), v2)
+
+    def test_inspect_and_verify(self):
+        """Header info needs no password; verify authenticates every segment."""
+        self.logic.segment_size = 1000
+        self.logic.compression = "lzma"
+        data = b"audit record\n" * 3000
+        encrypted = self.logic.encrypt(data, self.password)
+        info = container.read_info(io.BytesIO(encrypted))
+        self.assertEqual((info.header.compression, info.header.segment_size, info.total, info.segments),
+                         (container.compression_id("lzma"), 1000, len(data), 39))
+        self.assertEqual(info.header.iterations, container.PBKDF2_ITERATIONS)
+        for workers in (1, 3):
+            verified = self.logic.verify_stream(io.BytesIO(encrypted), self.password, workers)
+            self.assertEqual((verified.total, verified.segments, verified.file_size),
+                             (len(data), 39, len(encrypted)))
+        middle = len(encrypted) // 2
+        for bad in (encrypted[:middle] + bytes([encrypted[middle] ^ 1]) + encrypted[middle + 1:],
+                    encrypted[:-1], encrypted + b"x"):
+            with self.assertRaises(ValueError):
+                self.logic.verify_stream(io.BytesIO(bad), self.password)
+        with self.assertRaises(ValueError):
+            self.logic.verify_stream(io.BytesIO(encrypted), "wrong_password")
+        # Single-message files are checked whole
+        message = self.logic.batch_encryptor(self.password)(self.data)
+        self.assertIsNone(self.logic.verify_stream(io.BytesIO(message), self.password))
+        with self.assertRaises(ValueError):
+            container.read_info(io.BytesIO(message))
 
 if __name__ == "__main__":
     unittest.main()
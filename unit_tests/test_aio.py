@@ -0,0 +1,68 @@
+import asyncio
+import os
+import tempfile
+import unittest
+import cryptforge
+from cryptforge.aio import AsyncRunner
+
+
+class TestAsyncAPI(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.temp_dir.name, "plain.txt")
+        self.enc = os.path.join(self.temp_dir.name, "plain.txt.enc")
+        self.out = os.path.join(self.temp_dir.name, "plain.out")
+        with open(self.src, 'wb') as f:
+            f.write(b"Attack at dawn. " * 100000)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_bytes_round_trip(self):
+        messages = [f"message {i}".encode() for i in range(200)]
+        async with AsyncRunner(workers=2, max_concurrency=8) as runner:
+            encrypted = await asyncio.gather(*(runner.encrypt_bytes(m, "aes", "pw") for m in messages))
+            decrypted = await asyncio.gather(*(runner.decrypt_bytes(c, "aes", "pw") for c in encrypted))
+        self.assertEqual(list(decrypted), messages)
+        self.assertEqual(await cryptforge.adecrypt_bytes(
+            await cryptforge.aencrypt_bytes(b"hello", "caesar", "3"), "caesar", "3"), b"hello")
+
+    async def test_file_round_trip(self):
+        await cryptforge.aencrypt_file(self.src, self.enc, "vigenere", "KEY")
+        await cryptforge.adecrypt_file(self.enc, self.out, "vigenere", "KEY")
+        with open(self.src, 'rb') as a, open(self.out, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+        with self.assertRaises(FileExistsError):
+            await cryptforge.aencrypt_file(self.src, self.enc, "vigenere", "KEY")
+
+    async def test_errors_remove_output(self):
+        await cryptforge.aencrypt_file(self.src, self.enc, "aes", "pw")
+        with self.assertRaises(ValueError):
+            await cryptforge.adecrypt_file(self.enc, self.out, "aes", "wrong")
+        self.assertFalse(os.path.exists(self.out))
+
+    async def test_cancel_removes_output(self):
+        """However far the job got, a cancelled call leaves no output behind."""
+        runner = AsyncRunner(workers=1)
+        for delay in (0, 0.001, 0.01, 0.05):
+            task = asyncio.ensure_future(runner.encrypt_file(self.src, self.enc, "enigma", "AAA"))
+            await asyncio.sleep(delay)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await asyncio.get_running_loop().run_in_executor(None, runner.close)
+            self.assertFalse(os.path.exists(self.enc))
+            runner = AsyncRunner(workers=1)
+        runner.close()
+
+    async def test_process_executor(self):
+        async with AsyncRunner(workers=2, processes=True) as runner:
+            encrypted = await runner.encrypt_bytes(b"across processes", "aes", "pw")
+            self.assertEqual(await runner.decrypt_bytes(encrypted, "aes", "pw"), b"across processes")
+            await runner.encrypt_file(self.src, self.enc, "caesar", "3")
+        with open(self.enc, 'rb') as f:
+            self.assertEqual(cryptforge.decrypt(f.read(16), "caesar", "3"), b"Attack at dawn. ")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,271 @@
+import os
+import string
+import tempfile
+import unittest
+from unittest import mock
+from analysis import CRACKERS
+from analysis import frequency
+from analysis.frequency import letter_counts, file_letter_counts, column_counts
+from analysis.vigenere import rank_periods
+from analysis.enigma import crib_offsets, search_positions, position_name
+from analysis.base import shortest_repeat
+from analysis.xor import hamming_distance, solve_key
+from analysis.ngrams import build_quadgram_table, load_quadgram_table
+from analysis.substitution import _QuadgramScorer, key_password
+from analysis.identify import REGION_SIZE, identify_file, read_regions, trial_decode
+from utils.plugin_loader import load_logics
+from logics.ciphers import (
+    CaesarCipherLogic, ROT13Logic, AffineCipherLogic, VigenereCipherLogic, EnigmaMachineLogic,
+    SubstitutionCipherLogic
+)
+from logics.xor import XorLogic
+from logics.transforms import BitwiseXorLogic
+
+PLAINTEXT = (
+    b"It was the best of times, it was the worst of times, it was the age of "
+    b"wisdom, it was the age of foolishness, it was the epoch of belief, it "
+    b"was the epoch of incredulity, it was the season of Light, it was the "
+    b"season of Darkness, it was the spring of hope, it was the winter of "
+    b"despair, we had everything before us, we had nothing before us."
+)
+
+# Non-repetitive text long enough for the quadgram solver.
+PROSE = (
+    b"When the committee finally met in the narrow room above the harbour "
+    b"office, nobody wanted to speak first. The reports had arrived late, the "
+    b"figures did not agree with one another, and the weather had kept half of "
+    b"the members at home. Margaret opened the folder and read the first page "
+    b"aloud, slowly, as if the words might change their meaning if she gave "
+    b"them enough time. Outside, the gulls quarrelled over something on the "
+    b"quay, and a lorry reversed with a long complaining whistle. By the time "
+    b"she reached the last paragraph, the tea had gone cold and the chairman "
+    b"was looking at his watch."
+)
+
+
+class TestAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, data: bytes) -> str:
+        path = os.path.join(self.tmpdir.name, "cipher.txt")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_letter_counts(self):
+        counts = letter_counts(b"aAb-Z\xc3\xa9 z")
+        self.assertEqual(counts[0], 2)
+        self.assertEqual(counts[1], 1)
+        self.assertEqual(counts[25], 2)
+        self.assertEqual(sum(counts), 5)
+
+    def test_file_letter_counts_parallel(self):
+        path = self._write(PLAINTEXT * 50)
+        expected = letter_counts(PLAINTEXT * 50)
+        self.assertEqual(file_letter_counts(path, workers=1), expected)
+        with mock.patch.object(frequency, "PARALLEL_THRESHOLD", 0):
+            self.assertEqual(file_letter_counts(path, workers=3), expected)
+
+    def test_crack_caesar(self):
+        path = self._write(CaesarCipherLogic().encrypt(PLAINTEXT, "secret"))
+        for metric in ("chi2", "loglik"):
+            best = CRACKERS["caesar"](path, top=3, metric=metric)
+            self.assertEqual(len(best), 3)
+            self.assertTrue(best[0].key.startswith("shift 6 "))
+            self.assertEqual(best[0].preview, PLAINTEXT[:len(best[0].preview)])
+
+    def test_crack_rot13(self):
+        path = self._write(ROT13Logic().encrypt(PLAINTEXT, ""))
+        best = CRACKERS["rot13"](path)
+        self.assertEqual(len(best), 1)
+        self.assertTrue(PLAINTEXT.startswith(best[0].preview))
+
+    def test_crack_affine(self):
+        path = self._write(AffineCipherLogic().encrypt(PLAINTEXT, "x" * 11))
+        best = CRACKERS["affine"](path, top=1)
+        self.assertEqual(best[0].key, "a=5 b=11 (password length 11 mod 26)")
+        self.assertTrue(PLAINTEXT.startswith(best[0].preview))
+
+    def test_column_counts(self):
+        letters = b"ABCABCA"
+        self.assertEqual(column_counts(letters, 3)[0][0], 3)
+        self.assertEqual(column_counts(letters, 3, phase=1)[1][0], 3)
+        with mock.patch.object(frequency, "numpy", None):
+            self.assertEqual(column_counts(letters, 3, phase=2)[2][0], 3)
+            self.assertEqual(column_counts(letters, 3, phase=2)[0], [0, 2, 0] + [0] * 23)
+
+    def test_crack_vigenere(self):
+        data = VigenereCipherLogic().encrypt(PLAINTEXT, "lemon")
+        path = self._write(data)
+        best = CRACKERS["vigenere"](path, top=2)
+        self.assertTrue(best[0].key.startswith("LEMON (period 5"))
+        self.assertTrue(PLAINTEXT.startswith(best[0].preview))
+        # Multiples of the key length (10, 20) solve to LEMON again and are listed once
+        keys = [candidate.key.split()[0] for candidate in CRACKERS["vigenere"](path, top=5)]
+        self.assertEqual(len(keys), 5)
+        self.assertEqual(len(set(keys)), 5)
+
+    def test_rank_periods_parallel(self):
+        letters = frequency.fold_letters(VigenereCipherLogic().encrypt(PLAINTEXT, "lemon"))
+        serial = rank_periods(letters, workers=1)
+        self.assertEqual(serial[0][0], 5)
+        with mock.patch("analysis.vigenere.PARALLEL_SAMPLE", 0):
+            self.assertEqual(rank_periods(letters, workers=2), serial)
+
+    def test_crib_offsets(self):
+        # Enigma never maps a letter to itself
+        self.assertEqual(crib_offsets(b"ABCD", b"BA"), [0, 2])
+        self.assertEqual(crib_offsets(b"AAAA", b"A"), [])
+
+    def test_crack_enigma(self):
+        path = self._write(EnigmaMachineLogic().encrypt(PLAINTEXT, "KEY"))
+        best = CRACKERS["enigma"](path, top=1)
+        self.assertEqual(best[0].key, "KEY (start position)")
+        self.assertTrue(PLAINTEXT.upper().startswith(best[0].preview))
+        with_crib = CRACKERS["enigma"](path, crib="season of light")
+        self.assertEqual([c.key for c in with_crib], ["KEY (start position)"])
+
+    def test_search_positions_wraps(self):
+        letters = frequency.fold_letters(EnigmaMachineLogic().encrypt(PLAINTEXT, "ZZX"))
+        serial = search_positions(letters, b"best of times", workers=1)
+        self.assertEqual([position_name(p) for _, p in serial], ["ZZX"])
+        self.assertEqual(search_positions(letters, b"best of times", workers=2), serial)
+
+    def test_shortest_repeat(self):
+        self.assertEqual(shortest_repeat("ABAB"), "AB")
+        self.assertEqual(shortest_repeat(b"keykeykey"), b"key")
+        self.assertEqual(shortest_repeat("ABA"), "ABA")
+
+    def test_hamming_distance(self):
+        self.assertEqual(hamming_distance(b"\x00\xff\x00\xff", 1), 8.0)
+        self.assertEqual(hamming_distance(b"\x00\xff\x00\xff", 2), 0.0)
+        self.assertEqual(hamming_distance(b"ab", 2), 8.0)
+
+    def test_crack_xor(self):
+        data = XorLogic().encrypt(PLAINTEXT * 3, "s3cr\u00e9t")
+        key, _ = solve_key(data, len("s3cr\u00e9t".encode('utf-8')))
+        self.assertEqual(key, "s3cr\u00e9t".encode('utf-8'))
+        best = CRACKERS["xor"](self._write(data), top=2, workers=1)
+        self.assertEqual(best[0].key, "password 's3cr\u00e9t' (length 7)")
+        self.assertTrue(PLAINTEXT.startswith(best[0].preview))
+
+    def test_crack_bitwise_parallel(self):
+        data = BitwiseXorLogic().encrypt(PLAINTEXT * 3, "key")
+        best = CRACKERS["bitwise"](self._write(data), top=1, workers=2)
+        self.assertEqual(best[0].key, "password 'key' (length 3)")
+
+    def test_quadgram_table(self):
+        path = os.path.join(self.tmpdir.name, "quadgrams.bin")
+        build_quadgram_table(path, [b"abcd abcd", b"ABCE"])
+        table = load_quadgram_table(path)
+        self.assertEqual(len(table), 26 ** 4)
+        abcd, abce = table[0 * 17576 + 1 * 676 + 2 * 26 + 3], table[0 * 17576 + 1 * 676 + 2 * 26 + 4]
+        self.assertGreater(abcd, abce)
+        self.assertGreater(abce, table[0])
+        with open(path, "r+b") as f:
+            f.write(b"XXXX")
+        with self.assertRaises(ValueError):
+            load_quadgram_table.__wrapped__(path)
+
+    def test_incremental_swap_score(self):
+        path = os.path.join(self.tmpdir.name, "quadgrams.bin")
+        build_quadgram_table(path, [PLAINTEXT])
+        letters = frequency.fold_letters(PLAINTEXT)
+        scorer = _QuadgramScorer(letters, load_quadgram_table(path))
+        key = list(range(26))
+        before = scorer.reset(key)
+        delta, rescored = scorer.swap_delta(key, 4, 19)
+        key[4], key[19] = key[19], key[4]
+        scorer.commit(rescored)
+        self.assertAlmostEqual(before + delta, scorer.reset(key), places=3)
+
+    def test_key_password(self):
+        logic = SubstitutionCipherLogic()
+        password = "QWERTYUIOPASDFGHJKLZXCVBNM"
+        # Decryption key: cipher letter -> plain letter
+        key = [password.index(c) for c in string.ascii_uppercase]
+        self.assertEqual(key_password(key), password)
+        self.assertEqual(logic.decrypt(logic.encrypt(PLAINTEXT, key_password(key)), password), PLAINTEXT)
+
+    def test_crack_substitution(self):
+        password = "QWERTYUIOPASDFGHJKLZXCVBNM"
+        path = self._write(SubstitutionCipherLogic().encrypt(PROSE, password))
+        best = CRACKERS["substitution"](path, top=1, workers=2)
+        self.assertEqual(best[0].preview, PROSE[:len(best[0].preview)])
+
+    def test_identify(self):
+        logics = load_logics()
+        for name, password in (("morse", ""), ("baudot", ""), ("base64", ""), ("polybius", ""),
+                               ("caesar", "secret"), ("vigenere", "LEMON"), ("aes", "pw"),
+                               ("chacha20", "pw")):
+            with self.subTest(logic=name):
+                path = self._write(logics[name]().encrypt(PROSE, password))
+                guesses = identify_file(path)
+                self.assertEqual(guesses[0].logic, name)
+                if name not in ("aes", "chacha20"):
+                    _, preview = trial_decode(path, guesses[0], logics[name]())
+                    # Some codes drop case, spaces or punctuation
+                    self.assertTrue(frequency.fold_letters(PROSE).startswith(frequency.fold_letters(preview)))
+
+    def test_identify_printable_xor(self):
+        """XOR with a letter key is mostly printable but still found by its period."""
+        for key in ("KEY", "Lemon"):
+            with self.subTest(key=key):
+                path = self._write(XorLogic().encrypt(PROSE, key))
+                self.assertEqual(identify_file(path)[0].logic, "xor")
+        # Plain prose has no period
+        self.assertNotIn("xor", [guess.logic for guess in identify_file(self._write(PROSE))])
+
+    def test_trial_decode_bounded(self):
+        """Trial decodes read a bounded sample, however big the file."""
+        logics = load_logics()
+        real_open = open
+        read = []
+
+        class CountingFile:
+            def __init__(self, f):
+                self._f = f
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self._f.close()
+
+            def read(self, size=-1):
+                data = self._f.read(size)
+                read.append(len(data))
+                return data
+
+            def __getattr__(self, name):
+                return getattr(self._f, name)
+
+        def counting_open(file, *args, **kwargs):
+            f = real_open(file, *args, **kwargs)
+            return CountingFile(f) if file == path else f
+
+        for name, password in (("vigenere", "LEMON"), ("xor", "KEY"), ("caesar", "x" * 13)):
+            with self.subTest(logic=name):
+                path = self._write(logics[name]().encrypt(PROSE * 2000, password))
+                guess = next(guess for guess in identify_file(path) if guess.logic == name)
+                read.clear()
+                with mock.patch("builtins.open", counting_open):
+                    key, preview = trial_decode(path, guess, logics[name]())
+                self.assertLess(sum(read), 1 << 20)
+                self.assertTrue(PROSE.startswith(preview))
+
+    def test_read_regions_bounded(self):
+        path = self._write(PROSE * 1000)
+        regions = read_regions(path)
+        self.assertEqual(len(regions), 3)
+        self.assertLessEqual(sum(map(len, regions)), 3 * REGION_SIZE)
+        self.assertEqual(regions[0], (PROSE * 1000)[:REGION_SIZE])
+        self.assertTrue(regions[2].endswith(PROSE[-20:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
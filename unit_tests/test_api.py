@@ -0,0 +1,141 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+import cryptforge
+from logics.aes import AESLogic
+
+
+class TestAPI(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "data.enc")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_encrypt_decrypt(self):
+        for logic in ("aes", "caesar", "base64"):
+            encrypted = cryptforge.encrypt(b"Hello, CryptForge!", logic, "3")
+            self.assertEqual(cryptforge.decrypt(encrypted, logic, "3"), b"Hello, CryptForge!")
+
+    def test_get_logic_shared(self):
+        self.assertIs(cryptforge.get_logic("aes"), cryptforge.get_logic("aes"))
+        self.assertIn("aes", cryptforge.available_logics())
+        with self.assertRaises(ValueError):
+            cryptforge.get_logic("no-such-logic")
+
+    def test_many_round_trip(self):
+        records = [f"record {i}".encode() * (i % 7) for i in range(500)]
+        for workers in (None, 4):
+            encrypted = cryptforge.encrypt_many(records, "aes", "batch-pass", workers=workers)
+            self.assertEqual(len(set(encrypted)), len(records))  # Fresh nonce per record
+            self.assertEqual(cryptforge.decrypt_many(encrypted, "aes", "batch-pass", workers=workers),
+                             records)
+        # Non-AES logics use the default per-message batch functions
+        encrypted = cryptforge.encrypt_many(records, "vigenere", "KEY", workers=4)
+        self.assertEqual(cryptforge.decrypt_many(encrypted, "vigenere", "KEY"), records)
+        with self.assertRaises(ValueError):
+            cryptforge.decrypt_many(encrypted[:1], "aes", "batch-pass")
+
+    def test_many_derives_once(self):
+        """A batch derives the key once, not once per record."""
+        logic = AESLogic()
+        records = [b"x" * 16] * 100
+        with mock.patch.object(AESLogic, '_derive_key', wraps=logic._derive_key) as derive:
+            encrypt = logic.batch_encryptor("pw")
+            encrypted = [encrypt(record) for record in records]
+            decrypt = logic.batch_decryptor("pw")
+            self.assertEqual([decrypt(data) for data in encrypted], records)
+        self.assertEqual(derive.call_count, 2)
+
+    def test_open_encrypted(self):
+        with cryptforge.open_encrypted(self.path, "wb", "aes", "pw") as f:
+            for _ in range(1000):
+                f.write(b"0123456789")
+        with open(self.path, 'rb') as f:
+            self.assertEqual(cryptforge.decrypt(f.read(), "aes", "pw"), b"0123456789" * 1000)
+        with cryptforge.open_encrypted(self.path, "rb", "aes", "pw") as f:
+            self.assertEqual(f.read(5), b"01234")
+            self.assertEqual(f.read(), b"56789" + b"0123456789" * 999)
+
+        with cryptforge.open_encrypted(self.path, "w", "caesar", "3") as f:
+            f.write("line one\nline two\n")
+        with cryptforge.open_encrypted(self.path, "r", "caesar", "3") as f:
+            self.assertEqual(f.readlines(), ["line one\n", "line two\n"])
+
+        with self.assertRaises(FileExistsError):
+            cryptforge.open_encrypted(self.path, "xb", "aes", "pw")
+        with self.assertRaises(ValueError):
+            cryptforge.open_encrypted(self.path, "ab", "aes", "pw")
+
+    def test_open_encrypted_removes_partial_file(self):
+        with self.assertRaises(RuntimeError):
+            with cryptforge.open_encrypted(self.path, "wb", "aes", "pw") as f:
+                f.write(b"partial")
+                raise RuntimeError("interrupted")
+        self.assertFalse(os.path.exists(self.path))
+
+    def _write_segmented(self, data: bytes, compression=None) -> None:
+        logic = AESLogic()
+        logic.segment_size, logic.compression = 1000, compression
+        with open(self.path, 'wb') as f:
+            logic.encrypt_stream(io.BytesIO(data), f, "pw")
+
+    def test_seekable_reader(self):
+        data = bytes(range(256)) * 200 + b"end"
+        for compression in (None, "zlib"):
+            self._write_segmented(data, compression)
+            with cryptforge.SeekableDecryptedReader(self.path, "aes", "pw", cache_segments=2) as raw:
+                self.assertEqual(raw.size, len(data))
+                for start, size in ((0, 10), (25000, 3000), (999, 2), (len(data) - 5, 100), (0, 0)):
+                    raw.seek(start)
+                    self.assertEqual(raw.read(size), data[start:start + size])
+                self.assertEqual(raw.seek(-3, io.SEEK_END), len(data) - 3)
+                self.assertEqual(raw.read(), b"end")
+                self.assertEqual(raw.read(10), b"")
+                reader = io.BufferedReader(raw)
+                reader.seek(4096)
+                self.assertEqual(reader.read(), data[4096:])
+
+    def test_seekable_reader_reads_only_needed_segments(self):
+        class Counting(io.BytesIO):
+            consumed = 0
+            def read(self, size=-1):
+                data = super().read(size)
+                self.consumed += len(data)
+                return data
+
+        data = os.urandom(100000)
+        self._write_segmented(data)
+        with open(self.path, 'rb') as f:
+            source = Counting(f.read())
+        raw = cryptforge.SeekableDecryptedReader(source, "aes", "pw")
+        source.consumed = 0
+        raw.seek(50500)
+        self.assertEqual(raw.read(2000), data[50500:52500])
+        # Segments 50, 51 and 52: about 1 KiB of ciphertext each
+        self.assertLess(source.consumed, 3 * 1100)
+        raw.close()
+        self.assertFalse(source.closed)
+
+    def test_seekable_reader_detects_tampering(self):
+        data = os.urandom(10000)
+        self._write_segmented(data)
+        with open(self.path, 'r+b') as f:
+            f.seek(5000)
+            f.write(b"\0" * 4)
+        with cryptforge.SeekableDecryptedReader(self.path, "aes", "pw") as raw:
+            self.assertEqual(raw.read(1000), data[:1000])
+            raw.seek(4900)
+            with self.assertRaises(ValueError):
+                raw.read(200)
+        with self.assertRaises(ValueError):
+            cryptforge.SeekableDecryptedReader(self.path, "aes", "wrong")
+        with self.assertRaises(ValueError):
+            cryptforge.SeekableDecryptedReader(self.path, "caesar", "3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from logics import aead, container
+from logics.aead import AutoLogic, KeyCache, fastest_aead
+from logics.aes import AESLogic
+from logics.chacha import ChaCha20Logic
+
+
+class TestXChaCha20Poly1305(unittest.TestCase):
+    def test_hchacha20_vector(self):
+        # draft-irtf-cfrg-xchacha, section 2.2.1
+        subkey = container.hchacha20(bytes(range(32)), bytes.fromhex("000000090000004a0000000031415927"))
+        self.assertEqual(subkey.hex(), "82413b4227b27bfed30e42508a877d73a0f9e4d58a74a853c12ec41326d3ecdc")
+
+    def test_aead_vector(self):
+        # draft-irtf-cfrg-xchacha, appendix A.3.1
+        cipher = container.XChaCha20Poly1305(bytes(range(0x80, 0xa0)))
+        nonce = bytes(range(0x40, 0x58))
+        aad = bytes.fromhex("50515253c0c1c2c3c4c5c6c7")
+        plaintext = (b"Ladies and Gentlemen of the class of '99: If I could offer you only one tip "
+                     b"for the future, sunscreen would be it.")
+        sealed = cipher.encrypt(nonce, plaintext, aad)
+        self.assertEqual(sealed[:16].hex(), "bd6d179d3e83d43b9576579493c0e939")
+        self.assertEqual(sealed[-16:].hex(), "c0875924c1c7987947deafd8780acf49")
+        self.assertEqual(cipher.decrypt(nonce, sealed, aad), plaintext)
+        with self.assertRaises(container.InvalidTag):
+            cipher.decrypt(nonce, sealed, b"")
+
+
+class TestChaCha20Logic(unittest.TestCase):
+    def setUp(self):
+        self.logic = ChaCha20Logic()
+        self.password = "strong_password_123"
+        self.data = os.urandom(200000)
+
+    def test_round_trip(self):
+        encrypted = self.logic.encrypt(self.data, self.password)
+        self.assertEqual(container.Header.parse(encrypted).aead, container.AEAD_XCHACHA20_POLY1305)
+        self.assertEqual(self.logic.decrypt(encrypted, self.password), self.data)
+        with self.assertRaises(ValueError):
+            self.logic.decrypt(encrypted, "wrong_password")
+        # The header says which AEAD to use, so any AEAD logic decrypts it
+        self.assertEqual(AESLogic().decrypt(encrypted, self.password), self.data)
+        self.assertEqual(self.logic.decrypt(AESLogic().encrypt(self.data, self.password), self.password),
+                         self.data)
+
+    def test_messages(self):
+        self.logic.key_cache = KeyCache()
+        encrypt = self.logic.batch_encryptor(self.password)
+        messages = [encrypt(b"record %d" % i) for i in range(3)]
+        # salt + 24-byte nonce + ciphertext and tag
+        self.assertEqual(len(messages[0]), 16 + 24 + len(b"record 0") + 16)
+        decrypt = self.logic.batch_decryptor(self.password)
+        self.assertEqual([decrypt(m) for m in messages], [b"record %d" % i for i in range(3)])
+        # Session salts are kept apart from AES, which shares the cache
+        aes = AESLogic()
+        aes.key_cache = self.logic.key_cache
+        self.assertNotEqual(aes.batch_encryptor(self.password)(b"")[:16], messages[0][:16])
+
+    def test_stream_verify_and_update(self):
+        self.logic.segment_size = 4096
+        encrypted = self.logic.encrypt(self.data, self.password)
+        self.assertEqual(self.logic.verify_stream(io.BytesIO(encrypted), self.password).total, len(self.data))
+        dst = io.BytesIO(encrypted)
+        changed = self.data[:5000] + b"X" + self.data[5001:]
+        self.logic.update_stream(io.BytesIO(changed), dst, self.password)
+        self.assertEqual(self.logic.decrypt(dst.getvalue(), self.password), changed)
+
+
+class TestAutoLogic(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "aead-benchmark.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_benchmark_cached(self):
+        results = {container.AEAD_AES_GCM: 100.0, container.AEAD_XCHACHA20_POLY1305: 300.0}
+        with mock.patch.object(aead, "benchmark_aeads", return_value=results) as benchmark:
+            self.assertEqual(fastest_aead(self.path), container.AEAD_XCHACHA20_POLY1305)
+            self.assertEqual(fastest_aead(self.path), container.AEAD_XCHACHA20_POLY1305)
+            # A new process reads the file instead of measuring again
+            aead._fastest.pop(self.path)
+            self.assertEqual(fastest_aead(self.path), container.AEAD_XCHACHA20_POLY1305)
+            self.assertEqual(benchmark.call_count, 1)
+        with open(self.path) as f:
+            self.assertEqual(list(json.load(f).values()), [{"1": 100.0, "2": 300.0}])
+
+    def test_benchmark(self):
+        results = aead.benchmark_aeads(seconds=0.001)
+        self.assertEqual(set(results), set(container.AEADS))
+        self.assertTrue(all(speed > 0 for speed in results.values()))
+
+    def test_choice_recorded_in_header(self):
+        logic = AutoLogic()
+        data = b"payload" * 1000
+        for choice in container.AEADS:
+            with mock.patch.object(aead, "fastest_aead", return_value=choice):
+                encrypted = logic.encrypt(data, "pw")
+                messages = logic.batch_encryptor("pw")(data)
+            with self.subTest(aead=choice):
+                self.assertEqual(container.Header.parse(encrypted).aead, choice)
+                # Decrypting reads the header, whatever this machine would pick
+                self.assertEqual(logic.decrypt(encrypted, "pw"), data)
+                self.assertEqual(ChaCha20Logic().decrypt(encrypted, "pw"), data)
+                self.assertEqual(logic.batch_decryptor("pw")(messages), data)
+        with self.assertRaises(ValueError):
+            logic.decrypt(AESLogic().batch_encryptor("pw")(data), "pw")
+
+
+if __name__ == '__main__':
+    unittest.main()
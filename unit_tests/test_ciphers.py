@@ -1,3 +1,4 @@
+import io
 import unittest
 from logics.ciphers import (
     CaesarCipherLogic, ROT13Logic, A1Z26Logic, 
@@ -53,5 +54,29 @@ class TestCiphers(unittest.TestCase):
         logic = EnigmaMachineLogic()
         self._test_logic(logic, b"HELLO WORLD", "AAA")
 
+    def test_binary_round_trip(self):
+        # Non-letter bytes (including invalid UTF-8) pass through untouched
+        data = bytes(range(256)) + "Straße, naïve café".encode('utf-8') + b"\xff\xfe"
+        for logic in (CaesarCipherLogic(), ROT13Logic(), VigenereCipherLogic(),
+                      AffineCipherLogic(), RailFenceCipherLogic(), SubstitutionCipherLogic()):
+            with self.subTest(logic=logic.name):
+                encrypted = logic.encrypt(data, "Secret")
+                self.assertEqual(logic.decrypt(encrypted, "Secret"), data)
+        self.assertEqual(CaesarCipherLogic().encrypt(b"\xc3\xa9Abz!", "abc"), b"\xc3\xa9Dec!")
+
+    def test_known_ciphertexts(self):
+        self.assertEqual(VigenereCipherLogic().encrypt(b"Attack at dawn!", "LEMON"), b"Lxfopv ef rnhr!")
+        self.assertEqual(RailFenceCipherLogic().encrypt(b"WEAREDISCOVERED", "a"), b"WECRERDSOEEAIVD")
+        self.assertEqual(EnigmaMachineLogic().encrypt(b"hello, world", "AAA"), b"ILBDA, AMTAZ")
+
+    def test_streaming_matches_one_shot(self):
+        data = b"The quick brown fox, 123 jumps over the lazy dog. " * 40
+        for logic in (CaesarCipherLogic(), ROT13Logic(), VigenereCipherLogic(),
+                      AffineCipherLogic(), SubstitutionCipherLogic(), EnigmaMachineLogic()):
+            with self.subTest(logic=logic.name):
+                out = io.BytesIO()
+                logic.encrypt_stream(io.BytesIO(data), out, "KEY", chunk_size=7)
+                self.assertEqual(out.getvalue(), logic.encrypt(data, "KEY"))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from utils.daemon import forward_file, ping, unix_sockets_supported
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@unittest.skipUnless(unix_sockets_supported(), "needs Unix domain sockets")
+class TestDaemon(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.socket_path = os.path.join(cls.tmpdir.name, "cf.sock")
+        cls.server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "main.py"), "serve", "--socket", cls.socket_path],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 20
+        while ping(cls.socket_path) is None:
+            if time.time() > deadline or cls.server.poll() is not None:
+                cls.server.kill()
+                raise RuntimeError("daemon did not start")
+            time.sleep(0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.terminate()
+        cls.server.wait(10)
+        cls.tmpdir.cleanup()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_ping(self):
+        self.assertIn("aes", ping(self.socket_path))
+        self.assertIsNone(ping(self._path("missing.sock")))
+
+    def test_round_trip(self):
+        data = os.urandom(3 << 20) + b"tail"
+        with open(self._path("plain.bin"), "wb") as f:
+            f.write(data)
+        for logic in ("aes", "caesar", "base64"):
+            with self.subTest(logic=logic):
+                enc, dec = self._path(f"{logic}.enc"), self._path(f"{logic}.dec")
+                forward_file("encrypt", logic, self._path("plain.bin"), enc, "pw", socket_path=self.socket_path)
+                forward_file("decrypt", logic, enc, dec, "pw", socket_path=self.socket_path)
+                with open(dec, "rb") as f:
+                    self.assertEqual(f.read(), data)
+
+    def test_errors_remove_output(self):
+        with open(self._path("msg.txt"), "wb") as f:
+            f.write(b"secret message")
+        forward_file("encrypt", "aes", self._path("msg.txt"), self._path("msg.enc"), "pw",
+                     socket_path=self.socket_path)
+        with self.assertRaises(ValueError):
+            forward_file("decrypt", "aes", self._path("msg.enc"), self._path("msg.out"), "wrong",
+                         socket_path=self.socket_path)
+        self.assertFalse(os.path.exists(self._path("msg.out")))
+        with self.assertRaises(ValueError):
+            forward_file("encrypt", "nosuch", self._path("msg.txt"), self._path("msg.x"), "pw",
+                         socket_path=self.socket_path)
+        self.assertFalse(os.path.exists(self._path("msg.x")))
+
+
+if __name__ == "__main__":
+    unittest.main()
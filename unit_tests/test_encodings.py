@@ -4,6 +4,7 @@ from logics.encodings import (
     UrlEncodingLogic, UnicodeCodePointsLogic, IntegerEncodingLogic,
     HexEncodingLogic, BaudotCodeLogic, PunycodeLogic, BootstringLogic
 )
+from logics import bootstring
 
 class TestEncodings(unittest.TestCase):
     def _test_logic(self, logic, data):
@@ -20,14 +21,49 @@ class TestEncodings(unittest.TestCase):
     def test_ascii85(self):
         self._test_logic(Ascii85Logic(), b"hello world")
 
+    def test_block_codecs_streaming(self):
+        data = bytes(range(256)) + b"\x00" * 9
+        for logic in (Base32Logic(), Base64Logic(), Ascii85Logic(), HexEncodingLogic()):
+            encrypted = logic.encrypt(data, "")
+            for size in (1, 2, 5, 7):
+                enc = logic.encryptor("")
+                chunks = [enc.update(data[i:i + size]) for i in range(0, len(data), size)]
+                self.assertEqual(b"".join(chunks) + enc.finalize(), encrypted,
+                                 f"Logic {logic.name} failed at chunk size {size}.")
+                dec = logic.decryptor("")
+                chunks = [dec.update(encrypted[i:i + size]) for i in range(0, len(encrypted), size)]
+                self.assertEqual(b"".join(chunks) + dec.finalize(), data)
+
+    def test_block_codecs_line_wrapping(self):
+        data = b"hello world" * 20
+        for logic in (Base32Logic(), Base64Logic(), Ascii85Logic(), HexEncodingLogic()):
+            # A numeric password does not change the output
+            self.assertEqual(logic.encrypt(data, "5"), logic.encrypt(data, ""))
+            logic.line_width = 76
+            wrapped = logic.encrypt(data, "")
+            lines = wrapped.split(b"\n")
+            self.assertEqual(lines[-1], b"")
+            self.assertTrue(all(0 < len(line) <= 76 for line in lines[:-1]))
+            # Decoding tolerates the newlines
+            self.assertEqual(logic.decrypt(wrapped, ""), data)
+
     def test_url(self):
         self._test_logic(UrlEncodingLogic(), b"hello world & spaces")
 
     def test_unicode(self):
         self._test_logic(UnicodeCodePointsLogic(), b"hello world")
 
+    def test_unicode_non_ascii(self):
+        data = "héllo € 😀".encode('utf-8')
+        self._test_logic(UnicodeCodePointsLogic(), data)
+        self.assertEqual(UnicodeCodePointsLogic().encrypt("é😀".encode('utf-8'), ""), b"U+00E9 U+1F600")
+        # Tokens that are not code points are kept as they are
+        self.assertEqual(UnicodeCodePointsLogic().decrypt(b"U+0041 foo U+ZZ", ""), b"AfooU+ZZ")
+
     def test_integer(self):
         self._test_logic(IntegerEncodingLogic(), b"hello world")
+        self._test_logic(IntegerEncodingLogic(), bytes(range(256)))
+        self.assertEqual(IntegerEncodingLogic().decrypt(b"065 x 66", ""), b"AB")
 
     def test_hex(self):
         self._test_logic(HexEncodingLogic(), b"hello world")
@@ -42,5 +78,46 @@ class TestEncodings(unittest.TestCase):
     def test_bootstring(self):
         self._test_logic(BootstringLogic(), b"hello-world")
 
+    def test_punycode_segments(self):
+        logic = PunycodeLogic()
+        # One segment is the plain codec output
+        self.assertEqual(logic.encrypt("bücher".encode('utf-8'), ""), b"bcher-kva")
+        self.assertEqual(bootstring.encode("Ελληνικά 中文 ü" * 20), ("Ελληνικά 中文 ü" * 20).encode('punycode'))
+        line = ("münchen.köln straße " * 40).encode('utf-8')
+        data = line + b"\n\n" + "東京".encode('utf-8') * 300
+        encrypted = logic.encrypt(data, "")
+        self.assertEqual(logic.decrypt(encrypted, ""), data)
+        self.assertTrue(all(len(segment) < 2 * bootstring.SEGMENT_CHARS
+                            for segment in encrypted.split(b"\n")))
+        for size in (1, 7, 100):
+            enc, dec = logic.encryptor(""), logic.decryptor("")
+            chunks = [enc.update(data[i:i + size]) for i in range(0, len(data), size)]
+            self.assertEqual(b"".join(chunks) + enc.finalize(), encrypted)
+            chunks = [dec.update(encrypted[i:i + size]) for i in range(0, len(encrypted), size)]
+            self.assertEqual(b"".join(chunks) + dec.finalize(), data)
+
+    def test_punycode_errors(self):
+        logic = PunycodeLogic()
+        with self.assertRaises(ValueError):
+            logic.encrypt(b"\xff\xfe", "")
+        for bad in (b"abc-!!", "ü".encode('utf-8')):
+            with self.assertRaises(ValueError):
+                logic.decrypt(bad, "")
+
+    def test_punycode_legacy_multiline(self):
+        """Output of the old whole-input encoding still decodes."""
+        logic = PunycodeLogic()
+        for text in ("Line1\nLine2\n", "Grüße,\nWörld\n", "abc\ndef\nñ", "Grüße\nhi", "a\nb"):
+            legacy = text.encode('punycode')
+            self.assertEqual(logic.decrypt(legacy, ""), text.encode('utf-8'))
+            dec = logic.decryptor("")
+            chunks = [dec.update(legacy[i:i + 4]) for i in range(0, len(legacy), 4)]
+            self.assertEqual(b"".join(chunks) + dec.finalize(), text.encode('utf-8'))
+        self.assertEqual(logic.decrypt(b"Line1\nLine2\n-", ""), b"Line1\nLine2\n")
+        self.assertEqual(logic.decrypt(b"hello\nwrld\n-xfb", ""), "hello\nwörld\n".encode('utf-8'))
+        # Segmented output is marked, so it is not mistaken for the old format
+        self.assertEqual(logic.encrypt(b"a\nb", ""), bootstring.SEGMENTED_MARKER + b"a-\nb-")
+        self.assertEqual(logic.decrypt(logic.encrypt(b"a-\nb", ""), ""), b"a-\nb")
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,79 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+from logics.aes import AESLogic
+from logics.base import StreamTransform, pump
+from logics.ciphers import VigenereCipherLogic
+from logics.transforms import ReverseLogic
+from utils.file_ops import process_file
+from utils.pipeline import run_pipeline
+
+
+class _FailingWriter(io.BytesIO):
+    def write(self, data):
+        raise IOError("disk full")
+
+
+class _FailingTransform(StreamTransform):
+    def __init__(self):
+        self.chunks = 0
+
+    def update(self, chunk: bytes) -> bytes:
+        self.chunks += 1
+        if self.chunks == 3:
+            raise ValueError("bad chunk")
+        return bytes(chunk)
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.data = os.urandom(300000)
+
+    def _run(self, transform, chunk_size: int, buffers: int) -> bytes:
+        dst = io.BytesIO()
+        run_pipeline(transform, io.BytesIO(self.data), dst, chunk_size, buffers)
+        return dst.getvalue()
+
+    def test_same_output_as_pump(self):
+        logic = VigenereCipherLogic()
+        expected = io.BytesIO()
+        pump(logic.encryptor("LEMON"), io.BytesIO(self.data), expected)
+        for chunk_size, buffers in ((1000, 1), (4096, 2), (65536, 4), (1 << 20, 3)):
+            with self.subTest(chunk_size=chunk_size, buffers=buffers):
+                self.assertEqual(self._run(logic.encryptor("LEMON"), chunk_size, buffers), expected.getvalue())
+        # Transforms taking views of the reused buffers
+        aes = AESLogic()
+        aes.segment_size = 4096
+        for chunk_size in (1000, 10000):
+            encrypted = self._run(aes.encryptor("pw"), chunk_size, 2)
+            self.assertEqual(aes.decrypt(encrypted, "pw"), self.data)
+
+    def test_errors_stop_every_stage(self):
+        threads = threading.active_count()
+        with self.assertRaises(ValueError):
+            self._run(_FailingTransform(), 1000, 2)
+        with self.assertRaises(IOError):
+            run_pipeline(VigenereCipherLogic().encryptor("KEY"), io.BytesIO(self.data), _FailingWriter(), 1000, 2)
+        with self.assertRaises(ValueError):
+            self._run(AESLogic().decryptor("pw"), 1000, 2)
+        self.assertEqual(threading.active_count(), threads)
+
+    def test_process_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            src = os.path.join(temp_dir, "plain")
+            with open(src, 'wb') as f:
+                f.write(self.data)
+            # buffers=0 runs sequentially; reverse keeps its own decrypt_stream
+            for logic, buffers in ((AESLogic(), 3), (AESLogic(), 0), (ReverseLogic(), 2)):
+                with self.subTest(logic=logic.name, buffers=buffers):
+                    enc, out = os.path.join(temp_dir, "enc"), os.path.join(temp_dir, "out")
+                    process_file(logic, "encrypt", src, enc, "pw", overwrite=True, chunk_size=4096, buffers=buffers)
+                    process_file(logic, "decrypt", enc, out, "pw", overwrite=True, chunk_size=4096, buffers=buffers)
+                    with open(out, 'rb') as f:
+                        self.assertEqual(f.read(), self.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
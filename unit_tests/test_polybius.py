@@ -1,7 +1,8 @@
 import unittest
 from logics.polybius import (
     PolybiusSquareLogic, TapCodeLogic, BifidCipherLogic,
-    TrifidCipherLogic, ADFGXCipherLogic, NihilistCipherLogic
+    TrifidCipherLogic, ADFGXCipherLogic, ADFGVXCipherLogic,
+    NihilistCipherLogic, NihilistPackedCipherLogic
 )
 
 class TestPolybius(unittest.TestCase):
@@ -30,15 +31,51 @@ class TestPolybius(unittest.TestCase):
         # Trifid uses CUBE with '+'
         self._test_logic(TrifidCipherLogic(), b"HELLOWORLD", "")
 
+    def test_known_ciphertexts(self):
+        self.assertEqual(PolybiusSquareLogic().encrypt(b"Hi!", ""), b"23 24 !")
+        self.assertEqual(TapCodeLogic().encrypt(b"Ok go", ""), b"... .... . ... / .. .. ... ....")
+        self.assertEqual(BifidCipherLogic().encrypt(b"HELLO", ""), b"FNNVD")
+        self.assertEqual(BifidCipherLogic().decrypt(b"FNNVD", ""), b"HELLO")
+        self.assertEqual(TrifidCipherLogic().encrypt(b"HELLO", ""), b"BOJN+")
+        self.assertEqual(TrifidCipherLogic().decrypt(b"BOJN+", ""), b"HELLO")
+
+    def test_polybius_passes_other_bytes(self):
+        logic = PolybiusSquareLogic()
+        data = "Café".encode('utf-8')
+        self.assertEqual(logic.decrypt(logic.encrypt(data, ""), ""), "CAFé".encode('utf-8'))
+
     def test_adfgx(self):
         self._test_logic(ADFGXCipherLogic(), b"HELLOWORLD", "PHALANX")
         with self.assertRaises(ValueError):
             ADFGXCipherLogic().encrypt(b"HELLO", "")
 
+    def test_adfgx_known_ciphertext(self):
+        # Columns are read off in key order, grouped by space
+        self.assertEqual(ADFGXCipherLogic().encrypt(b"HELLO", "BA"), b"FXAAG DAFFF")
+
+    def test_adfgvx(self):
+        logic = ADFGVXCipherLogic()
+        encrypted = logic.encrypt(b"ATTACK AT 1200AM", "PRIVACY")
+        self.assertEqual(logic.decrypt(encrypted, "PRIVACY"), b"ATTACKAT1200AM")
+        with self.assertRaises(ValueError):
+            logic.encrypt(b"HELLO", "")
+
     def test_nihilist(self):
         self._test_logic(NihilistCipherLogic(), b"HELLOWORLD", "KEY")
         with self.assertRaises(ValueError):
             NihilistCipherLogic().encrypt(b"HELLO", "")
 
+    def test_nihilist_known_ciphertext(self):
+        encrypted = NihilistCipherLogic().encrypt(b"HELLO", "KEY")
+        self.assertEqual(encrypted, b"48 30 85 56 49")
+        # Skipped tokens still consume a key position; unmappable values give "?"
+        self.assertEqual(NihilistCipherLogic().decrypt(b"48 x 37 999", "KEY"), b"H??")
+
+    def test_nihilist_packed(self):
+        logic = NihilistPackedCipherLogic()
+        encrypted = logic.encrypt(b"HELLO", "KEY")
+        self.assertEqual(encrypted, bytes([48, 30, 85, 56, 49]))
+        self.assertEqual(logic.decrypt(encrypted, "KEY"), b"HELLO")
+
 if __name__ == "__main__":
     unittest.main()
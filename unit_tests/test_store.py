@@ -0,0 +1,150 @@
+import io
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+from utils.chunker import Chunker
+from utils.store import ChunkStore
+
+
+class TestChunker(unittest.TestCase):
+    def setUp(self):
+        self.data = random.Random(7).randbytes(3 << 20)
+
+    def test_chunks_independent_of_reads(self):
+        chunker = Chunker(b"key")
+        chunks = list(chunker.chunks(io.BytesIO(self.data)))
+        self.assertEqual(b"".join(chunks), self.data)
+        self.assertTrue(all(chunker.min_size <= len(c) <= chunker.max_size for c in chunks[:-1]))
+        for read_size in (1000, 65537, 1 << 22):
+            self.assertEqual(list(chunker.chunks(io.BytesIO(self.data), read_size)), chunks)
+        self.assertEqual(list(chunker.chunks(io.BytesIO(b""))), [])
+
+    def test_boundaries_resynchronise(self):
+        chunker = Chunker(b"key")
+        chunks = set(chunker.chunks(io.BytesIO(self.data)))
+        edited = self.data[:1 << 20] + b"inserted" + self.data[1 << 20:]
+        self.assertLessEqual(len(set(chunker.chunks(io.BytesIO(edited))) - chunks), 2)
+        # Boundaries depend on the key
+        self.assertNotEqual(set(Chunker(b"other").chunks(io.BytesIO(self.data))), chunks)
+
+
+class TestChunkStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.temp_dir.name, "snapshot")
+        self.store_path = os.path.join(self.temp_dir.name, "store")
+        os.makedirs(os.path.join(self.source, "sub"))
+        rng = random.Random(1)
+        self._write("sub/blob.bin", rng.randbytes(1 << 20))
+        self._write("log.txt", b"".join(b"%d request served\n" % i for i in range(50000)))
+        self._write("empty", b"")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, name: str, data: bytes) -> None:
+        with open(os.path.join(self.source, name), 'wb') as f:
+            f.write(data)
+
+    def _read_tree(self, root: str) -> dict:
+        tree = {}
+        for dirpath, _, files in os.walk(root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                with open(path, 'rb') as f:
+                    tree[os.path.relpath(path, root)] = f.read()
+        return tree
+
+    def test_second_save_writes_only_new_chunks(self):
+        with ChunkStore(self.store_path, "pw", compression="zlib") as store:
+            first = store.save(self.source, "night1")
+            self.assertEqual(first.new_chunks, first.chunks)
+            self.assertLess(first.new_size, first.size)
+            # Unchanged files, even when re-read after a touch, add nothing
+            os.utime(os.path.join(self.source, "sub/blob.bin"))
+            second = store.save(self.source, "night2")
+            self.assertEqual((second.new_chunks, second.new_size), (0, 0))
+            # An edit in the middle of a file adds the chunks around it
+            with open(os.path.join(self.source, "sub/blob.bin"), 'r+b') as f:
+                f.seek(500000)
+                f.write(b"changed")
+            third = store.save(self.source)
+            self.assertGreater(third.new_chunks, 0)
+            self.assertLessEqual(third.new_chunks, 2)
+            self.assertEqual([s.name for s in store.snapshots()][:2], ["night1", "night2"])
+        self.assertEqual(len(os.listdir(os.path.join(self.store_path, "packs"))), 2)
+
+    def test_orphan_pack(self):
+        """A pack left by a save killed before its commit does not block later saves."""
+        expected = self._read_tree(self.source)
+        with ChunkStore(self.store_path, "pw") as store:
+            with open(os.path.join(self.store_path, "packs", "1.pack"), 'wb') as f:
+                f.write(b"partial write")
+            store.save(self.source)
+            store.save(self.source)
+        dest = os.path.join(self.temp_dir.name, "restored")
+        with ChunkStore(self.store_path, "pw") as store:
+            store.restore(dest)
+        self.assertEqual(self._read_tree(dest), expected)
+
+    def test_restore(self):
+        expected = self._read_tree(self.source)
+        with ChunkStore(self.store_path, "pw") as store:
+            store.save(self.source, "night1")
+            self._write("log.txt", b"replaced")
+            store.save(self.source)
+        dest = os.path.join(self.temp_dir.name, "restored")
+        with ChunkStore(self.store_path, "pw") as store:
+            self.assertEqual(store.restore(dest, "night1"), 3)
+            self.assertEqual(self._read_tree(dest), expected)
+            with self.assertRaises(FileExistsError):
+                store.restore(dest, "night1")
+            with self.assertRaises(ValueError):
+                store.restore(dest, "missing")
+
+    def test_wrong_password_and_tampering(self):
+        with ChunkStore(self.store_path, "pw") as store:
+            store.save(self.source)
+        with self.assertRaises(ValueError):
+            ChunkStore(self.store_path, "wrong")
+        pack = os.path.join(self.store_path, "packs", "1.pack")
+        with open(pack, 'r+b') as f:
+            f.seek(100)
+            byte = f.read(1)
+            f.seek(100)
+            f.write(bytes([byte[0] ^ 1]))
+        with ChunkStore(self.store_path, "pw") as store:
+            with self.assertRaises(ValueError):
+                store.restore(os.path.join(self.temp_dir.name, "restored"))
+
+    def test_index_tampering(self):
+        expected = self._read_tree(self.source)
+        with ChunkStore(self.store_path, "pw") as store:
+            store.save(self.source)
+        db = sqlite3.connect(os.path.join(self.store_path, "index.db"))
+        first, second = db.execute("SELECT ref, id, pack, offset, length FROM chunks LIMIT 2").fetchall()
+
+        # The index is not authenticated. Swapping whole rows between refs
+        # changes nothing, as manifests name chunks by id
+        db.execute("UPDATE chunks SET id = ? WHERE ref = ?", (os.urandom(32), first[0]))
+        db.execute("UPDATE chunks SET id = ?, pack = ?, offset = ?, length = ? WHERE ref = ?",
+                   (first[1], *first[2:], second[0]))
+        db.execute("UPDATE chunks SET id = ?, pack = ?, offset = ?, length = ? WHERE ref = ?",
+                   (second[1], *second[2:], first[0]))
+        db.commit()
+        dest = os.path.join(self.temp_dir.name, "restored")
+        with ChunkStore(self.store_path, "pw") as store:
+            store.restore(dest)
+        self.assertEqual(self._read_tree(dest), expected)
+        # Pointing an id at another chunk's record fails to authenticate
+        db.execute("UPDATE chunks SET pack = ?, offset = ?, length = ? WHERE id = ?", (*second[2:], first[1]))
+        db.commit()
+        db.close()
+        with ChunkStore(self.store_path, "pw") as store:
+            with self.assertRaises(ValueError):
+                store.restore(os.path.join(self.temp_dir.name, "restored2"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from logics.alphabets import MorseCodeLogic, SpellingAlphabetLogic
+from logics.ciphers import BaconCipherLogic
+from logics.encodings import BaudotCodeLogic
+from logics.tokens import TokenCodec
+
+
+def run_chunked(transform, data, size):
+    """Feeds data through a StreamTransform in fixed-size chunks."""
+    out = [transform.update(data[i:i + size]) for i in range(0, len(data), size)]
+    out.append(transform.finalize())
+    return b''.join(out)
+
+
+class TestTokenCodec(unittest.TestCase):
+    def test_streaming_matches_one_shot(self):
+        data = "Hello World, ünïcode & 123\nsecond line".encode('utf-8')
+        for logic in (MorseCodeLogic(), SpellingAlphabetLogic(), BaudotCodeLogic(), BaconCipherLogic()):
+            encrypted = logic.encrypt(data, "")
+            decrypted = logic.decrypt(encrypted, "")
+            for size in (1, 2, 3, 7):
+                self.assertEqual(run_chunked(logic.encryptor(""), data, size), encrypted,
+                                 f"Logic {logic.name} encoder failed at chunk size {size}.")
+                self.assertEqual(run_chunked(logic.decryptor(""), encrypted, size), decrypted,
+                                 f"Logic {logic.name} decoder failed at chunk size {size}.")
+
+    def test_unknown_characters(self):
+        # Morse keeps unknown characters (including multi-byte ones) intact
+        self.assertEqual(MorseCodeLogic().encrypt("e#é".encode('utf-8'), ""), ". # É".encode('utf-8'))
+        # Baudot drops them
+        self.assertEqual(BaudotCodeLogic().encrypt("e#é".encode('utf-8'), ""), b"10000")
+
+    def test_fixed_width_decoding(self):
+        logic = BaconCipherLogic()
+        # Whitespace is ignored, unknown groups become '?', a partial group is dropped
+        self.assertEqual(logic.decrypt(b"AABBB AAB\nAA BBBBB AA", ""), b"HE?")
+
+    def test_custom_codec(self):
+        codec = TokenCodec({'A': '1', 'B': '2'}, separator='-', delimiter='-', fold_case=False)
+        self.assertEqual(codec.encode(b"ABaB"), b"1-2-2")
+        self.assertEqual(codec.decode(b"1-2-2"), b"ABB")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,9 @@
+import io
+import os
+import tempfile
 import unittest
+from unittest import mock
+from logics import replacer
 from logics.transforms import (
     ReverseLogic, CaseTransformLogic, BitwiseXorLogic,
     ReplaceLogic, NumeralSystemLogic
@@ -11,6 +16,27 @@ class TestTransforms(unittest.TestCase):
         self.assertEqual(logic.decrypt(logic.encrypt(data, ""), ""), data)
         self.assertEqual(logic.encrypt(data, ""), b"dlrow olleh")
 
+    def test_reverse_stream(self):
+        logic = ReverseLogic()
+        data = bytes(range(256)) * 40 + b"tail"
+        for size in (1, 100, 256, len(data), 1 << 20):
+            src, dst = io.BytesIO(b"skip" + data), io.BytesIO()
+            src.read(4)  # Starts from the current position
+            logic.encrypt_stream(src, dst, "", chunk_size=size)
+            self.assertEqual(dst.getvalue(), data[::-1])
+
+        class Pipe(io.RawIOBase):
+            """Readable but not seekable: reversed by buffering the input."""
+            def __init__(self, data):
+                self._src = io.BytesIO(data)
+            def readable(self):
+                return True
+            def readinto(self, buffer):
+                return self._src.readinto(buffer)
+        dst = io.BytesIO()
+        logic.decrypt_stream(Pipe(data), dst, "", chunk_size=100)
+        self.assertEqual(dst.getvalue(), data[::-1])
+
     def test_case_swap(self):
         logic = CaseTransformLogic()
         data = b"Hello World"
@@ -32,6 +58,41 @@ class TestTransforms(unittest.TestCase):
         decrypted = logic.decrypt(encrypted, password)
         self.assertEqual(decrypted, data)
 
+    def test_replace_rules_file(self):
+        logic = ReplaceLogic()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            rules_path = os.path.join(temp_dir, "rules.txt")
+            with open(rules_path, 'wb') as f:
+                f.write(b"he:[A]\nhello:[B]\n\nworld:[C]\nkey: value\t[D]\nbye:\n")
+            password = "@" + rules_path
+            data = b"hello world, he said; key: value. bye" * 50
+            expected = b"[B] [C], [A] said; [D]. " * 50
+            with mock.patch.object(replacer, 'REPLACE_CACHE_DIR', os.path.join(temp_dir, "cache")):
+                # Longest match wins at each position
+                self.assertEqual(logic.encrypt(data, password), expected)
+                self.assertEqual(len(os.listdir(os.path.join(temp_dir, "cache"))), 1)
+                for size in (1, 4, 7, 64):
+                    enc = logic.encryptor(password)
+                    chunks = [enc.update(data[i:i + size]) for i in range(0, len(data), size)]
+                    self.assertEqual(b"".join(chunks) + enc.finalize(), expected)
+                # Deleted text ("bye") cannot be restored
+                self.assertEqual(logic.decrypt(expected, password), data.replace(b"bye", b""))
+                self.assertEqual(logic.encrypt(data, password), expected)  # From the cache
+
+            with open(rules_path, 'wb') as f:
+                f.write(b"no separator\n")
+            with self.assertRaises(ValueError):
+                logic.encrypt(data, password)
+        with self.assertRaises(FileNotFoundError):
+            logic.encrypt(data, password)
+
+    def test_replace_inline_at_rule(self):
+        """An '@' rule is inline unless it names an existing file."""
+        logic = ReplaceLogic()
+        data = b"mail @user today"
+        self.assertEqual(logic.encrypt(data, "@user:X"), b"mail X today")
+        self.assertEqual(logic.decrypt(b"mail X today", "@user:X"), data)
+
     def test_numeral_system(self):
         logic = NumeralSystemLogic()
         data = b"ABC" # bytes [65, 66, 67]
@@ -41,7 +102,22 @@ class TestTransforms(unittest.TestCase):
         self.assertEqual(logic.decrypt(encrypted, "2"), data)
         # Hex (base 16)
         encrypted_hex = logic.encrypt(data, "16")
+        self.assertEqual(encrypted_hex, b"41 42 43")
         self.assertEqual(logic.decrypt(encrypted_hex, "16"), data)
+        self.assertEqual(logic.decrypt(b"414243", "16"), data)
+
+    def test_numeral_system_all_bases(self):
+        logic = NumeralSystemLogic()
+        data = bytes(range(256))
+        for base in range(2, 37):
+            encrypted = logic.encrypt(data, str(base))
+            self.assertEqual(logic.decrypt(encrypted, str(base)), data, f"Base {base} failed cycle.")
+        self.assertEqual(logic.encrypt(b"\xff", "36"), b"73")
+        # Invalid or out-of-range tokens are skipped, case is ignored
+        self.assertEqual(logic.decrypt(b"73 zz! 7g", "36"), b"\xff")
+        self.assertEqual(logic.decrypt(b"Ff fF", "16"), b"\xff\xff")
+        with self.assertRaises(ValueError):
+            logic.encrypt(data, "37")
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,87 @@
+import hashlib
+from typing import BinaryIO, Iterator, List
+
+# Chunk sizes of the content-defined chunker. A boundary is a position
+# where the window hash of two consecutive bytes is zero (probability
+# 2^-16), so chunks average about MIN_CHUNK + 64 KiB.
+MIN_CHUNK = 16 << 10
+MAX_CHUNK = 256 << 10
+# Bytes of content each position's hash depends on.
+WINDOW = 8
+BOUNDARY = b"\0\0"
+READ_SIZE = 1 << 20
+
+
+def window_tables(key: bytes) -> List[bytes]:
+    """WINDOW pseudorandom byte tables derived from key (one per window offset)."""
+    return [hashlib.shake_256(key + bytes([offset])).digest(256) for offset in range(WINDOW)]
+
+
+class Chunker:
+    """
+    Content-defined chunking with a keyed rolling hash. The hash at each
+    position is the XOR of WINDOW table lookups, one per byte of the
+    window, so a boundary depends only on the bytes just before it: an
+    insertion or deletion moves the boundaries around it and the chunks
+    after that resynchronise. The tables come from a key, so boundaries
+    say nothing about the content to anyone without it.
+
+    Rolling byte by byte in Python is slow; instead every offset's lookup
+    is done for a whole buffer with bytes.translate, and the window is
+    combined by XORing the results as one big integer, shifted a byte
+    per offset. Boundaries are then found with bytes.find.
+    """
+
+    def __init__(self, key: bytes, min_size: int = MIN_CHUNK, max_size: int = MAX_CHUNK):
+        if not WINDOW < min_size <= max_size:
+            raise ValueError("Invalid chunk size limits")
+        self._tables = window_tables(key)
+        self.min_size = min_size
+        self.max_size = max_size
+
+    def _hashes(self, data: bytes) -> bytes:
+        # Byte i of the result is T0[data[i]] ^ T1[data[i-1]] ^ ... ^ T7[data[i-7]]
+        size = len(data)
+        acc = 0
+        for offset, table in enumerate(self._tables):
+            acc ^= int.from_bytes(data.translate(table), 'little') << (8 * offset)
+        return (acc & ((1 << (8 * size)) - 1)).to_bytes(size, 'little')
+
+    def cuts(self, data: bytes, final: bool) -> List[int]:
+        """
+        Chunk end offsets in data, which starts at a chunk boundary. Unless
+        final, the bytes after the last offset may belong to a chunk that
+        continues in the next read and are not cut.
+        """
+        hashes = self._hashes(data)
+        cuts, start = [], 0
+        while start < len(data):
+            found = hashes.find(BOUNDARY, start + self.min_size - len(BOUNDARY), start + self.max_size)
+            if found >= 0:
+                end = found + len(BOUNDARY)
+            elif len(data) - start >= self.max_size:
+                end = start + self.max_size
+            elif final:
+                end = len(data)
+            else:
+                break
+            cuts.append(end)
+            start = end
+        return cuts
+
+    def chunks(self, src: BinaryIO, read_size: int = READ_SIZE) -> Iterator[bytes]:
+        """Yields the chunks of everything readable from src; independent of read_size."""
+        carry = b""
+        while True:
+            block = src.read(read_size)
+            data = carry + block if carry else block
+            if not data:
+                return
+            start = 0
+            with memoryview(data) as view:
+                for end in self.cuts(data, final=not block):
+                    yield bytes(view[start:end])
+                    start = end
+                carry = bytes(view[start:])
+            if not block:
+                return
@@ -0,0 +1,240 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from config import DAEMON_SOCKET
+from logics.base import DEFAULT_CHUNK_SIZE
+
+# Wire format: every message is a frame of a 4-byte big-endian length and
+# a payload. A request is a JSON header frame ({"op", "logic", "password"}),
+# then the input as data frames and an empty frame. The response is the
+# output as data frames, an empty frame and a JSON status frame
+# ({"ok": true} or {"ok": false, "error": ...}).
+FRAME_HEADER = struct.Struct(">I")
+# Largest frame either side accepts.
+MAX_FRAME = 16 << 20
+# Seconds the client waits for a daemon to answer a ping.
+PING_TIMEOUT = 0.5
+
+
+class DaemonError(ValueError):
+    """An operation the daemon reported as failed (e.g. a wrong password)."""
+
+
+def unix_sockets_supported() -> bool:
+    return hasattr(socket, 'AF_UNIX')
+
+
+# --- Server ----------------------------------------------------------------
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    (size,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    if size > MAX_FRAME:
+        raise ValueError(f"Frame of {size} bytes exceeds the {MAX_FRAME} byte limit")
+    return await reader.readexactly(size)
+
+
+async def _write_frame(writer: asyncio.StreamWriter, payload: bytes) -> None:
+    writer.write(FRAME_HEADER.pack(len(payload)))
+    writer.write(payload)
+    # Backpressure: wait while the client is not reading
+    await writer.drain()
+
+
+async def _write_data(writer: asyncio.StreamWriter, data: bytes) -> None:
+    view = memoryview(data)
+    for start in range(0, len(view), DEFAULT_CHUNK_SIZE):
+        await _write_frame(writer, view[start:start + DEFAULT_CHUNK_SIZE])
+
+
+class DaemonServer:
+    """
+    Serves encrypt/decrypt requests on a Unix socket. The shared logic
+    instances of cryptforge.api, including the AEAD logics with their
+    KeyCache, are kept for the life of the process. Connections are handled
+    concurrently by asyncio; the cipher work of each chunk runs in a
+    thread pool so the event loop only moves bytes.
+    """
+
+    def __init__(self, socket_path: str = DAEMON_SOCKET, workers: Optional[int] = None):
+        from cryptforge.api import available_logics, get_logic
+        self.socket_path = socket_path
+        self.logics = {name: get_logic(name) for name in available_logics()}
+        self._pool = ThreadPoolExecutor(workers or os.cpu_count() or 1,
+                                        thread_name_prefix="cryptforge-worker")
+
+    async def _process(self, request: dict, reader, writer) -> None:
+        logic = self.logics.get(request.get("logic"))
+        if logic is None:
+            raise ValueError(f"Logic '{request.get('logic')}' not found.")
+        operation = request.get("op")
+        if operation not in ("encrypt", "decrypt"):
+            raise ValueError(f"Unknown operation '{operation}'.")
+        password = request.get("password", "")
+        factory = logic.encryptor if operation == "encrypt" else logic.decryptor
+        loop = asyncio.get_running_loop()
+        transform = await loop.run_in_executor(self._pool, factory, password)
+        while True:
+            chunk = await _read_frame(reader)
+            if not chunk:
+                break
+            await _write_data(writer, await loop.run_in_executor(self._pool, transform.update, chunk))
+        await _write_data(writer, await loop.run_in_executor(self._pool, transform.finalize))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                request = json.loads(await _read_frame(reader))
+                if request.get("op") == "ping":
+                    status = {"ok": True, "logics": sorted(self.logics)}
+                else:
+                    await self._process(request, reader, writer)
+                    status = {"ok": True}
+            except (asyncio.IncompleteReadError, ConnectionError):
+                raise
+            except Exception as e:
+                # Reported to the client, which fails the same way a local run would
+                status = {"ok": False, "error": str(e) or type(e).__name__}
+            await _write_frame(writer, b"")
+            await _write_frame(writer, json.dumps(status).encode('utf-8'))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Client went away; nothing to report to
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        """Listens until SIGINT/SIGTERM, then removes the socket file."""
+        if os.path.exists(self.socket_path):
+            if ping(self.socket_path) is not None:
+                raise ValueError(f"A daemon is already listening on {self.socket_path}")
+            os.remove(self.socket_path)  # Stale socket from a crashed daemon
+        # Only the owner may connect: requests carry passwords
+        old_umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        finally:
+            os.umask(old_umask)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            self._pool.shutdown(wait=False)
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+
+def run_server(socket_path: str = DAEMON_SOCKET, workers: Optional[int] = None) -> None:
+    """Runs the daemon in the foreground (the `serve` command)."""
+    if not unix_sockets_supported():
+        raise ValueError("The daemon needs Unix domain sockets, which this platform lacks.")
+    asyncio.run(DaemonServer(socket_path, workers).serve())
+
+
+# --- Client ----------------------------------------------------------------
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        part = sock.recv(size - len(buf))
+        if not part:
+            raise ConnectionError("Daemon closed the connection")
+        buf += part
+    return bytes(buf)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (size,) = FRAME_HEADER.unpack(_recv_exactly(sock, FRAME_HEADER.size))
+    if size > MAX_FRAME:
+        raise ConnectionError(f"Frame of {size} bytes exceeds the {MAX_FRAME} byte limit")
+    return _recv_exactly(sock, size)
+
+
+def _send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def _connect(socket_path: str, timeout: Optional[float]) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def ping(socket_path: str = DAEMON_SOCKET) -> Optional[List[str]]:
+    """The daemon's logic names, or None when no daemon is listening."""
+    if not unix_sockets_supported() or not os.path.exists(socket_path):
+        return None
+    try:
+        with _connect(socket_path, PING_TIMEOUT) as sock:
+            _send_frame(sock, json.dumps({"op": "ping"}).encode('utf-8'))
+            _recv_frame(sock)  # End of (empty) output
+            return json.loads(_recv_frame(sock)).get("logics", [])
+    except (OSError, ValueError):
+        return None
+
+
+def forward_file(operation: str, logic_name: str, src_path: str, dst_path: str,
+                 password: str, overwrite: bool = False,
+                 socket_path: str = DAEMON_SOCKET) -> None:
+    """
+    process_file() through the daemon: src_path is streamed to it and the
+    result written to dst_path. A partially written output is removed if
+    the operation fails.
+    """
+    if not os.path.exists(src_path):
+        raise FileNotFoundError(f"File not found: {src_path}")
+    if os.path.exists(dst_path) and not overwrite:
+        raise FileExistsError(f"File already exists: {dst_path}")
+
+    request = {"op": operation, "logic": logic_name, "password": password}
+    with _connect(socket_path, None) as sock, open(src_path, 'rb') as src:
+        _send_frame(sock, json.dumps(request).encode('utf-8'))
+
+        # Send from a thread while reading the output here, so neither side
+        # blocks on a full socket buffer.
+        def send_input():
+            try:
+                while True:
+                    chunk = src.read(DEFAULT_CHUNK_SIZE)
+                    _send_frame(sock, chunk)
+                    if not chunk:
+                        break
+            except OSError:
+                pass  # The daemon stopped reading; its status says why
+
+        sender = threading.Thread(target=send_input, daemon=True)
+        sender.start()
+        with open(dst_path, 'wb' if overwrite else 'xb') as dst:
+            try:
+                while True:
+                    chunk = _recv_frame(sock)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                status = json.loads(_recv_frame(sock))
+                if not status.get("ok"):
+                    raise DaemonError(status.get("error", "Daemon request failed"))
+            except BaseException:
+                # Unblocks the sender if the daemon is still waiting for input
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                dst.close()
+                os.remove(dst_path)
+                raise
+            finally:
+                sender.join()
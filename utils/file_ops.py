@@ -1,4 +1,6 @@
 import os
+from logics.base import DEFAULT_CHUNK_SIZE, EncryptionLogic
+from utils.pipeline import DEFAULT_BUFFERS, run_pipeline
 
 def read_file(path: str) -> bytes:
     """Reads a file as bytes."""
@@ -15,3 +17,127 @@ def write_file(path: str, data: bytes, overwrite: bool = False) -> None:
         
     with open(path, 'wb') as f:
         f.write(data)
+
+class OperationCancelled(Exception):
+    """Raised by process_file() when its cancellation event is set."""
+
+class _CancellableReader:
+    """File wrapper whose reads raise OperationCancelled once the event is set."""
+
+    def __init__(self, file, cancelled):
+        self._file = file
+        self._cancelled = cancelled
+
+    def _check(self) -> None:
+        if self._cancelled.is_set():
+            raise OperationCancelled("Operation cancelled")
+
+    def read(self, size: int = -1) -> bytes:
+        self._check()
+        return self._file.read(size)
+
+    def readinto(self, buffer) -> int:
+        self._check()
+        return self._file.readinto(buffer)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+def process_file(logic, operation: str, src_path: str, dst_path: str,
+                 password: str, overwrite: bool = False, cancelled=None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, buffers: int = DEFAULT_BUFFERS) -> None:
+    """
+    Streams src_path through the logic's encrypt/decrypt stream into
+    dst_path without loading the whole file. A partially written output is
+    removed if the operation fails. cancelled is an optional
+    threading.Event: once set, the operation stops at its next read.
+    Chunks go through utils/pipeline.py, which overlaps reading and
+    writing with the cipher using `buffers` chunk_size buffers; with
+    buffers=0, or for logics with their own encrypt_stream/decrypt_stream,
+    the stream runs in this thread alone.
+    """
+    if not os.path.exists(src_path):
+        raise FileNotFoundError(f"File not found: {src_path}")
+    if os.path.exists(dst_path) and not overwrite:
+        raise FileExistsError(f"File already exists: {dst_path}")
+
+    stream = logic.encrypt_stream if operation == "encrypt" else logic.decrypt_stream
+    pipelined = buffers > 0 and getattr(type(logic), stream.__name__) is getattr(EncryptionLogic, stream.__name__)
+    with open(src_path, 'rb') as src, open(dst_path, 'wb' if overwrite else 'xb') as dst:
+        try:
+            if cancelled is not None:
+                src = _CancellableReader(src, cancelled)
+            if pipelined:
+                transform = logic.encryptor(password) if operation == "encrypt" else logic.decryptor(password)
+                run_pipeline(transform, src, dst, chunk_size, buffers)
+            else:
+                stream(src, dst, password, chunk_size)
+        except BaseException:
+            dst.close()
+            os.remove(dst_path)
+            raise
+
+# Suffix of the sealed segment index kept beside files updated in place.
+INDEX_SUFFIX = ".idx"
+
+def update_file(logic, src_path: str, dst_path: str, password: str) -> None:
+    """
+    Brings dst_path, the encryption of an earlier version of src_path, up
+    to date in place through the logic's update_stream, so only changed
+    segments are rewritten; dst_path is created if missing. The segment
+    index is kept in dst_path + INDEX_SUFFIX. It is removed before dst_path
+    is touched and written again afterwards, so an interrupted update
+    leaves no index and the next one compares the segments themselves.
+    """
+    update = getattr(logic, "update_stream", None)
+    if update is None:
+        raise ValueError(f"In-place updates are not supported for '{logic.name}'.")
+    if not os.path.exists(src_path):
+        raise FileNotFoundError(f"File not found: {src_path}")
+    index_path = dst_path + INDEX_SUFFIX
+    index = None
+    if os.path.exists(index_path):
+        with open(index_path, 'rb') as f:
+            index = f.read()
+        os.remove(index_path)
+    created = not os.path.exists(dst_path)
+    with open(src_path, 'rb') as src, open(dst_path, 'x+b' if created else 'r+b') as dst:
+        try:
+            index = update(src, dst, password, index)
+            dst.flush()
+            os.fsync(dst.fileno())
+        except BaseException:
+            if created:
+                dst.close()
+                os.remove(dst_path)
+            raise
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(index)
+    os.replace(tmp_path, index_path)
+
+
+def decrypt_range(logic, src_path: str, dst_path: str, password: str,
+                  start: int, end=None, overwrite: bool = False) -> None:
+    """
+    Writes the decrypted bytes [start, end) of src_path (to its end if end
+    is None) to dst_path, reading only the segments that hold them
+    (logics with random_access).
+    """
+    random_access = getattr(logic, "random_access", None)
+    if random_access is None:
+        raise ValueError(f"Range decryption is not supported for '{logic.name}'.")
+    if not os.path.exists(src_path):
+        raise FileNotFoundError(f"File not found: {src_path}")
+    if os.path.exists(dst_path) and not overwrite:
+        raise FileExistsError(f"File already exists: {dst_path}")
+    with open(src_path, 'rb') as src:
+        segments = random_access(src, password)
+        with open(dst_path, 'wb' if overwrite else 'xb') as dst:
+            try:
+                for data in segments.read_range(start, end):
+                    dst.write(data)
+            except BaseException:
+                dst.close()
+                os.remove(dst_path)
+                raise
@@ -2,7 +2,7 @@ import os
 import sys
 from utils.plugin_loader import load_logics
 from utils.security import get_secure_password
-from utils.file_ops import read_file, write_file
+from utils.file_ops import process_file
 from utils.logging import log_operation
 from utils.history import save_history_entry
 
@@ -88,17 +88,14 @@ def run_interactive_menu(banner=None):
                 logic = logic_cls()
                 print(f"\nExecuting {op} using {selected_name}...")
                 
-                data = read_file(file_path)
                 password = get_secure_password(f"Enter {op} password: ", confirm=(op == "encrypt"))
                 
-                result_data = logic.encrypt(data, password) if op == "encrypt" else logic.decrypt(data, password)
-                
                 if op == "encrypt":
                     output_path = f"{file_path}.enc"
                 else:
                     output_path = file_path[:-4] if file_path.endswith(".enc") else f"{file_path}.dec"
                 
-                write_file(output_path, result_data, overwrite=False)
+                process_file(logic, op, file_path, output_path, password, overwrite=False)
                 print(f"\n[SUCCESS] Result saved to: {output_path}")
                 
                 log_operation(op, file_path, selected_name, "success")
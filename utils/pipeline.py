@@ -0,0 +1,103 @@
+import queue
+import threading
+from typing import BinaryIO, List
+from logics.base import DEFAULT_CHUNK_SIZE, StreamTransform
+
+# Read buffers in the pool; 0 runs the plain single-threaded loop (base.pump).
+DEFAULT_BUFFERS = 4
+
+# Tells the writer thread that no more output follows.
+_END = object()
+
+
+def _read_into(src: BinaryIO, view: memoryview) -> int:
+    readinto = getattr(src, "readinto", None)
+    if readinto is not None:
+        return readinto(view) or 0
+    data = src.read(len(view))
+    view[:len(data)] = data
+    return len(data)
+
+
+def run_pipeline(transform: StreamTransform, src: BinaryIO, dst: BinaryIO,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, buffers: int = DEFAULT_BUFFERS) -> None:
+    """
+    Feeds src through transform into dst like base.pump(), but reading,
+    transforming and writing overlap, so a file is processed at about
+    the speed of its slowest stage rather than the sum of all three.
+
+    A reader thread fills a pool of `buffers` preallocated chunk_size
+    buffers and queues them; this thread runs the transform and returns
+    each buffer to the pool; a writer thread writes the output through a
+    queue of the same bound. Nothing is allocated per chunk on the read
+    side, and memory stays at about 2 * buffers * chunk_size. Transforms
+    with accepts_views get a view of the buffer itself, others a copy.
+    The first error of any stage stops the others and is raised here.
+    """
+    if buffers < 1 or chunk_size < 1:
+        raise ValueError("The pipeline needs at least one buffer of at least one byte")
+    free = queue.Queue()
+    for _ in range(buffers):
+        free.put(memoryview(bytearray(chunk_size)))
+    # Unbounded, but never holds more than the pool
+    filled = queue.Queue()
+    output = queue.Queue(maxsize=buffers)
+    write_errors: List[BaseException] = []
+    stopped = threading.Event()
+
+    def read() -> None:
+        try:
+            while not stopped.is_set():
+                view = free.get()
+                if view is None:
+                    return
+                size = _read_into(src, view)
+                filled.put((view, size))
+                if not size:
+                    return
+        except BaseException as e:
+            filled.put(e)
+
+    def write() -> None:
+        # After a failure keep draining, so the transform never blocks on output
+        while True:
+            data = output.get()
+            if data is _END:
+                return
+            if not write_errors:
+                try:
+                    dst.write(data)
+                except BaseException as e:
+                    write_errors.append(e)
+
+    def emit(data: bytes) -> None:
+        if write_errors:
+            raise write_errors[0]
+        if data:
+            output.put(data)
+
+    reader = threading.Thread(target=read, name="pipeline-reader", daemon=True)
+    writer = threading.Thread(target=write, name="pipeline-writer", daemon=True)
+    reader.start()
+    writer.start()
+    try:
+        views = transform.accepts_views
+        while True:
+            item = filled.get()
+            if isinstance(item, BaseException):
+                raise item
+            view, size = item
+            if not size:
+                break
+            data = transform.update(view[:size] if views else bytes(view[:size]))
+            free.put(view)
+            emit(data)
+        emit(transform.finalize())
+    finally:
+        stopped.set()
+        free.put(None)
+        output.put(_END)
+        writer.join()
+        reader.join()
+    if write_errors:
+        raise write_errors[0]
@@ -32,7 +32,7 @@ def load_logics() -> Dict[str, Type[EncryptionLogic]]:
             for name, obj in inspect.getmembers(module):
                 if (inspect.isclass(obj) and 
                     issubclass(obj, EncryptionLogic) and 
-                    obj is not EncryptionLogic):
+                    not inspect.isabstract(obj)):
                     
                     # Instantiate to get the name property (or check if it's a property)
                     # We expect the class to have a 'name' attribute or property.
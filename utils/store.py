@@ -0,0 +1,346 @@
+import base64
+import datetime
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import zlib
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDFExpand
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from logics.container import (
+    CODECS, COMPRESSED, COMPRESSION_NONE, MAX_COMPRESSIBLE_ENTROPY, PBKDF2_ITERATIONS, STORED,
+    compression_id, sample_entropy
+)
+from utils.chunker import Chunker
+
+# Layout of a store directory:
+#
+#   store.json   salt, KDF iterations, compression and a password check
+#   index.db     SQLite: chunk id -> pack, offset, length; snapshots
+#   packs/N.pack encrypted chunks appended by one save (numbered past any
+#                left by an interrupted save)
+#
+# Files are cut into content-defined chunks (utils/chunker.py). A chunk is
+# identified by an HMAC of its content under a key from the password, so
+# ids reveal nothing about the data, and is encrypted once; a snapshot is
+# an encrypted manifest of files, their sizes and chunk ids. The index only
+# says where a chunk is: it is not authenticated, so restore checks every
+# chunk against the id in the manifest (the chunk's associated data) and
+# every file against its size.
+STORE_VERSION = 2
+CONFIG_FILE = "store.json"
+INDEX_FILE = "index.db"
+PACK_DIR = "packs"
+NONCE_SIZE = 12
+CHUNK_ID_SIZE = 32
+# Associated data of the password check and the manifests.
+CHECK_AAD = b"cryptforge-store"
+MANIFEST_AAD = b"cryptforge-manifest"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    ref INTEGER PRIMARY KEY,
+    id BLOB UNIQUE NOT NULL,
+    pack INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    created TEXT NOT NULL,
+    manifest BLOB NOT NULL
+);
+"""
+
+
+class Snapshot(NamedTuple):
+    id: int
+    name: str
+    created: str
+
+
+class SaveStats(NamedTuple):
+    snapshot: int
+    files: int
+    size: int
+    chunks: int
+    new_chunks: int
+    new_size: int
+
+
+class StoreKeys(NamedTuple):
+    chunk_id: bytes
+    cipher: bytes
+    chunker: bytes
+
+
+def derive_keys(password: str, salt: bytes, iterations: int = PBKDF2_ITERATIONS) -> StoreKeys:
+    """Chunk-id, encryption and chunker keys, all from one PBKDF2 run."""
+    master = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt,
+                        iterations=iterations).derive(password.encode('utf-8'))
+    return StoreKeys(*(HKDFExpand(hashes.SHA256(), 32, label).derive(master)
+                       for label in (b"chunk-id", b"chunk-key", b"chunker")))
+
+
+def _walk(source: str) -> Iterator[Tuple[str, str]]:
+    """(relative '/'-separated path, full path) of the regular files under source, sorted."""
+    if os.path.isfile(source):
+        yield os.path.basename(source), source
+        return
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            if os.path.isfile(full) and not os.path.islink(full):
+                yield os.path.relpath(full, source).replace(os.sep, "/"), full
+
+
+def _safe_join(dest: str, path: str) -> str:
+    parts = path.split("/")
+    if path.startswith("/") or any(part in ("", ".", "..") for part in parts):
+        raise ValueError(f"Unsafe path in snapshot: {path!r}")
+    return os.path.join(dest, *parts)
+
+
+def _chunk_ids(entry: dict) -> List[bytes]:
+    """The chunk ids of a manifest entry, in file order."""
+    data = base64.b64decode(entry["chunks"])
+    if len(data) % CHUNK_ID_SIZE:
+        raise ValueError("Store data is corrupted.")
+    return [data[i:i + CHUNK_ID_SIZE] for i in range(0, len(data), CHUNK_ID_SIZE)]
+
+
+class ChunkStore:
+    """
+    Deduplicating encrypted snapshot store in a directory (created on
+    first use). Saving a snapshot writes only chunks the store does not
+    hold yet, and files whose size and modification time match the
+    previous snapshot are not read at all.
+    """
+
+    def __init__(self, path: str, password: str, compression: Optional[str] = None):
+        self.path = path
+        config_path = os.path.join(path, CONFIG_FILE)
+        if os.path.exists(config_path):
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            if config.get("version") != STORE_VERSION:
+                raise ValueError(f"Unsupported store version {config.get('version')}")
+        else:
+            config = {"version": STORE_VERSION, "salt": os.urandom(16).hex(),
+                      "iterations": PBKDF2_ITERATIONS, "compression": compression_id(compression)}
+        self._compression = config["compression"]
+        if self._compression not in CODECS:
+            raise ValueError(f"Unknown compression id {self._compression}")
+        self._keys = derive_keys(password, bytes.fromhex(config["salt"]), config["iterations"])
+        self._aead = AESGCM(self._keys.cipher)
+        self._chunker = Chunker(self._keys.chunker)
+        if "check" in config:
+            self._open(bytes.fromhex(config["check"]), CHECK_AAD, "Wrong password for this store.")
+        else:
+            config["check"] = self._seal(b"", CHECK_AAD).hex()
+            os.makedirs(os.path.join(path, PACK_DIR), exist_ok=True)
+            tmp_path = f"{config_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(config, f, indent=2)
+            os.replace(tmp_path, config_path)
+        self._db = sqlite3.connect(os.path.join(path, INDEX_FILE))
+        self._db.executescript(SCHEMA)
+        self._packs = {}
+
+    def __enter__(self) -> "ChunkStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for pack in self._packs.values():
+            pack.close()
+        self._packs.clear()
+        self._db.close()
+
+    def _seal(self, data: bytes, aad: bytes) -> bytes:
+        nonce = os.urandom(NONCE_SIZE)
+        return nonce + self._aead.encrypt(nonce, data, aad)
+
+    def _open(self, record: bytes, aad: bytes, message: str = "Store data is corrupted.") -> bytes:
+        try:
+            return self._aead.decrypt(record[:NONCE_SIZE], record[NONCE_SIZE:], aad)
+        except InvalidTag as e:
+            raise ValueError(message) from e
+
+    def _pack_path(self, number: int) -> str:
+        return os.path.join(self.path, PACK_DIR, f"{number}.pack")
+
+    def _next_pack(self) -> int:
+        """
+        Number for a new pack: past every pack the index uses and every
+        pack file on disk, as a save killed before its commit leaves a
+        pack the index does not know about.
+        """
+        numbers = [self._db.execute("SELECT MAX(pack) FROM chunks").fetchone()[0] or 0]
+        for entry in os.listdir(os.path.join(self.path, PACK_DIR)):
+            stem, ext = os.path.splitext(entry)
+            if ext == ".pack" and stem.isdigit():
+                numbers.append(int(stem))
+        return max(numbers) + 1
+
+    def chunk_id(self, chunk: bytes) -> bytes:
+        return hmac.new(self._keys.chunk_id, chunk, hashlib.sha256).digest()
+
+    def _seal_chunk(self, chunk: bytes, chunk_id: bytes) -> bytes:
+        # Same payload marker as the AES container's compressed segments
+        codec = CODECS[self._compression]
+        payload = chunk
+        if codec.compress is not None:
+            payload = bytes([STORED]) + chunk
+            if sample_entropy(chunk) <= MAX_COMPRESSIBLE_ENTROPY:
+                packed = codec.compress(chunk)
+                if len(packed) + 1 < len(payload):
+                    payload = bytes([COMPRESSED]) + packed
+        return self._seal(payload, chunk_id)
+
+    def _open_chunk(self, record: bytes, chunk_id: bytes) -> bytes:
+        payload = self._open(record, chunk_id)
+        if self._compression == COMPRESSION_NONE:
+            return payload
+        if payload[:1] == bytes([COMPRESSED]):
+            return CODECS[self._compression].decompress(payload[1:])
+        return payload[1:]
+
+    def _read_chunk(self, chunk_id: bytes) -> bytes:
+        # Opened under the manifest's id, so an index row pointing at
+        # another chunk fails to authenticate
+        row = self._db.execute("SELECT pack, offset, length FROM chunks WHERE id = ?",
+                               (chunk_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"Chunk {chunk_id.hex()[:16]} is missing from the store index.")
+        number, offset, length = row
+        pack = self._packs.get(number)
+        if pack is None:
+            pack = self._packs[number] = open(self._pack_path(number), 'rb')
+        pack.seek(offset)
+        record = pack.read(length)
+        if len(record) != length:
+            raise ValueError(f"Pack {number} is truncated.")
+        return self._open_chunk(record, chunk_id)
+
+    def snapshots(self) -> List[Snapshot]:
+        rows = self._db.execute("SELECT id, name, created FROM snapshots ORDER BY id")
+        return [Snapshot(*row) for row in rows]
+
+    def _snapshot_row(self, snapshot: Optional[str]) -> Tuple[int, dict]:
+        """(id, manifest) of a snapshot given by id or name (the latest with that name), or the latest."""
+        query = "SELECT id, manifest FROM snapshots"
+        if snapshot is None:
+            row = self._db.execute(query + " ORDER BY id DESC LIMIT 1").fetchone()
+        else:
+            row = self._db.execute(query + " WHERE name = ? OR CAST(id AS TEXT) = ? "
+                                   "ORDER BY name = ? DESC, id DESC LIMIT 1",
+                                   (snapshot, snapshot, snapshot)).fetchone()
+        if row is None:
+            raise ValueError(f"Snapshot not found: {snapshot}" if snapshot else "The store has no snapshots.")
+        return row[0], self._manifest(row[1])
+
+    def _manifest(self, record: bytes) -> dict:
+        return json.loads(zlib.decompress(self._open(record, MANIFEST_AAD)))
+
+    def _previous_files(self, source: str) -> Dict[str, dict]:
+        """Manifest entries by path of the latest snapshot of the same source."""
+        for (record,) in self._db.execute("SELECT manifest FROM snapshots ORDER BY id DESC"):
+            manifest = self._manifest(record)
+            if manifest["source"] == source:
+                return {entry["path"]: entry for entry in manifest["files"]}
+        return {}
+
+    def save(self, source: str, name: Optional[str] = None) -> SaveStats:
+        """Saves a file or directory tree as a new snapshot."""
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"File not found: {source}")
+        source = os.path.abspath(source)
+        previous = self._previous_files(source)
+        number = self._next_pack()
+        pack_path = self._pack_path(number)
+        pack = None
+        files, size, chunks, new_chunks, new_size = [], 0, 0, 0, 0
+        try:
+            for path, full in _walk(source):
+                st = os.stat(full)
+                entry = {"path": path, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                         "mode": st.st_mode & 0o777}
+                old = previous.get(path)
+                if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                    entry["chunks"] = old["chunks"]
+                else:
+                    ids, file_size = [], 0
+                    with open(full, 'rb') as f:
+                        for chunk in self._chunker.chunks(f):
+                            chunk_id = self.chunk_id(chunk)
+                            row = self._db.execute("SELECT ref FROM chunks WHERE id = ?",
+                                                   (chunk_id,)).fetchone()
+                            if row is None:
+                                if pack is None:
+                                    pack = open(pack_path, 'xb')
+                                record = self._seal_chunk(chunk, chunk_id)
+                                self._db.execute(
+                                    "INSERT INTO chunks (id, pack, offset, length) VALUES (?, ?, ?, ?)",
+                                    (chunk_id, number, pack.tell(), len(record)))
+                                pack.write(record)
+                                new_chunks += 1
+                                new_size += len(record)
+                            ids.append(chunk_id)
+                            file_size += len(chunk)
+                    # The size actually read (the file may have changed since stat)
+                    entry["size"] = file_size
+                    entry["chunks"] = base64.b64encode(b"".join(ids)).decode('ascii')
+                files.append(entry)
+                size += entry["size"]
+                chunks += len(_chunk_ids(entry))
+            if pack is not None:
+                pack.flush()
+                os.fsync(pack.fileno())
+                pack.close()
+            manifest = zlib.compress(json.dumps({"source": source,
+                                                 "files": files}).encode('utf-8'))
+            created = datetime.datetime.now().isoformat(timespec='seconds')
+            cursor = self._db.execute(
+                "INSERT INTO snapshots (name, created, manifest) VALUES (?, ?, ?)",
+                (name or created, created, self._seal(manifest, MANIFEST_AAD)))
+            self._db.commit()
+        except BaseException:
+            # The index never points into a pack that was not fully written
+            self._db.rollback()
+            if pack is not None:
+                pack.close()
+                os.remove(pack_path)
+            raise
+        return SaveStats(cursor.lastrowid, len(files), size, chunks, new_chunks, new_size)
+
+    def restore(self, dest: str, snapshot: Optional[str] = None) -> int:
+        """Writes a snapshot's files under dest; returns the number of files."""
+        _, manifest = self._snapshot_row(snapshot)
+        for entry in manifest["files"]:
+            target = _safe_join(dest, entry["path"])
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            with open(target, 'xb') as f:
+                try:
+                    written = 0
+                    for chunk_id in _chunk_ids(entry):
+                        written += f.write(self._read_chunk(chunk_id))
+                    if written != entry["size"]:
+                        raise ValueError(f"Restored size of {entry['path']} does not match the snapshot.")
+                except BaseException:
+                    f.close()
+                    os.remove(target)
+                    raise
+            os.chmod(target, entry["mode"])
+            os.utime(target, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+        return len(manifest["files"])
+